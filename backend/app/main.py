@@ -1,27 +1,63 @@
 import os
-import shutil
-import tempfile
+import re
+import json
+import asyncio
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 load_dotenv() # Load environment variables from .env file
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Body
+from fastapi import FastAPI, HTTPException, Body, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from typing import Optional
 
 from app.models import (
-    ResumeTextRequest, JobRequest, ChatRequest,
-    ATSResponse, AnalysisResponse, OptimizationResponse,
+    ResumeTextRequest, ResumeUploadRequest, JobRequest, ChatRequest, ChatSessionRequest, FullAnalysisRequest,
+    BatchATSRequest, BatchATSResult, CandidateSearchRequest, CandidateSearchResponse,
+    ATSResponse, AnalysisResponse, ChatResponse, FullAnalysisResponse, OptimizationResponse,
     JobSearchResponse
 )
 from app.services.available_tools import (
-    extract_text, rag_store_resume, rag_query,
-    ats_report, ats_ai_feedback, summarize_resume,
-    optimize_resume, latex_resume_preview, search_jobs
+    extract_text_from_file_async, rag_store_resume_async, rag_query_async, rag_stats, search_candidates_async,
+    create_chat_session, get_chat_session, delete_chat_session, chat_session_stats, rag_chat_async, rag_chat_stream,
+    ats_report, semantic_match_async, batch_ats_report_async, shutdown_ats_pool, list_taxonomy_roles,
+    extraction_stats, shutdown_extraction_pool, get_latex_pdf, latex_stats, shutdown_latex_pool,
+    search_jobs_async, job_search_stats, shutdown_job_search, submit_task, get_task, watch_task, task_stats,
+    render_document_async, document_stats, shutdown_documents,
+    ats_ai_feedback_async, summarize_resume_async,
+    optimize_resume_async, latex_resume_preview_async,
+    summarize_resume_stream, optimize_resume_stream, rag_query_stream
 )
-from app.services.agent import root_agent # Initialize agent to setup tools
+from app.services.documents import FORMATS as DOCUMENT_FORMATS, DocumentRenderError
+from app.services.lazy import resource_status, warm_up
+from app.services.llm_cache import response_cache_stats
+from app.services.rate_limit import LLM_LIMITER, LLMDeadlineExceeded, LLMOverloadedError
+from app.services.task_queue import IdempotencyConflict, QueueFullError
+from app.services.uploads import UploadFormatError, UploadTooLargeError, receive_upload
 
-app = FastAPI(title="Resumini API", version="0.1.0")
+# The ADK agent, embedding model and parsers load lazily on first use.
+# Set RESUMINI_WARMUP=1 to load them in the background at startup instead;
+# /ready reports 503 until that finishes.
+_WARMUP = {"requested": os.getenv("RESUMINI_WARMUP", "").lower() in ("1", "true", "yes"), "done": False, "errors": {}}
+
+async def _warm_up():
+    _WARMUP["errors"] = await asyncio.to_thread(warm_up)
+    _WARMUP["done"] = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    task = asyncio.create_task(_warm_up()) if _WARMUP["requested"] else None
+    yield
+    if task is not None and not task.done():
+        task.cancel()
+    shutdown_ats_pool()
+    shutdown_extraction_pool()
+    shutdown_latex_pool()
+    await shutdown_job_search()
+    shutdown_documents()
+
+app = FastAPI(title="Resumini API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,111 +67,476 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _sse_event(payload: dict) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+async def _sse_response(stream, lookup_status: int = 400) -> StreamingResponse:
+    # Pull the first delta before responding so setup errors (e.g. an unknown
+    # resume_id) still surface as a normal HTTP error instead of a broken stream.
+    # ``lookup_status`` matches the non-streaming endpoint's status for them.
+    try:
+        first = await anext(stream)
+    except StopAsyncIteration:
+        first = None
+    except LookupError as e:
+        raise HTTPException(status_code=lookup_status, detail=str(e))
+
+    async def events():
+        try:
+            if first is not None:
+                yield _sse_event({"delta": first})
+            async for delta in stream:
+                yield _sse_event({"delta": delta})
+            yield _sse_event({"done": True})
+        except Exception as e:
+            yield _sse_event({"error": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.exception_handler(LLMOverloadedError)
+async def llm_overloaded(request, exc):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(QueueFullError)
+async def task_queue_full(request, exc):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
+
+@app.exception_handler(IdempotencyConflict)
+async def idempotency_conflict(request, exc):
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
+
+@app.exception_handler(LLMDeadlineExceeded)
+async def llm_deadline_exceeded(request, exc):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
 @app.get("/")
 async def root():
     return {"message": "Resumini API is running"}
 
-@app.post("/upload/file")
-async def upload_resume_file(file: UploadFile = File(...)):
-    # Save upload file to temp
-    suffix = os.path.splitext(file.filename)[1]
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
+@app.get("/ready")
+async def ready():
+    is_ready = not _WARMUP["requested"] or (_WARMUP["done"] and not _WARMUP["errors"])
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "status": "ready" if is_ready else "starting",
+            "warmup": _WARMUP,
+            "resources": resource_status()
+        }
+    )
+
+@app.get("/stats")
+async def stats():
+    return {
+        "status": "success",
+        "rag": rag_stats(),
+        "chat_sessions": chat_session_stats(),
+        "extraction": extraction_stats(),
+        "latex": latex_stats(),
+        "job_search": job_search_stats(),
+        "tasks": await task_stats(),
+        "documents": document_stats(),
+        "llm_cache": response_cache_stats(),
+        "llm_limiter": LLM_LIMITER.stats()
+    }
+
+_UPLOAD_FORM_SCHEMA = {
+    "requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "required": ["file"],
+        "properties": {
+            "file": {"type": "string", "format": "binary"},
+            "metadata": {"type": "string", "description": "JSON object of searchable fields for /search/candidates"}
+        }
+    }}}}
+}
+
+@app.post("/upload/file", openapi_extra=_UPLOAD_FORM_SCHEMA)
+async def upload_resume_file(request: Request):
+    # The body is streamed into a size-capped, hashed, spooled buffer (see
+    # services/uploads.py) and parsed from there in the extraction process pool.
+    try:
+        upload, fields = await receive_upload(request)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     try:
-        # Extract text
-        result = extract_text(tmp_path)
+        # Optional JSON object of searchable fields for /search/candidates.
+        try:
+            metadata = json.loads(fields["metadata"]) if fields.get("metadata") else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"metadata is not valid JSON: {e}")
+        if metadata is not None and not isinstance(metadata, dict):
+            raise HTTPException(status_code=400, detail="metadata must be a JSON object")
+
+        result = await extract_text_from_file_async(upload.open(), upload.filename, upload.sha256)
         if result["status"] == "error":
             raise HTTPException(status_code=400, detail=result["error_message"])
-        
-        text = result["report"]
-        
-        # Store in RAG
-        rag_result = rag_store_resume(text)
-        
-        return {
-            "status": "success", 
-            "extracted_text": text[:500] + "...", # Preview
-            "rag_status": rag_result,
-            "message": "Resume processed and stored in memory."
-        }
     finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        upload.close()
+
+    text = result["report"]
+
+    # Store in RAG
+    rag_result = await rag_store_resume_async(text, metadata)
+
+    return {
+        "status": "success",
+        "resume_id": rag_result["resume_id"],
+        "file_sha256": upload.sha256,
+        "file_size": upload.size,
+        "pages": result["pages"],
+        "extraction_cached": result["cached"],
+        "extracted_text": text[:500] + "...", # Preview
+        "rag_status": rag_result,
+        "message": "Resume processed and stored in memory."
+    }
 
 @app.post("/upload/text")
-async def upload_resume_text(request: ResumeTextRequest):
+async def upload_resume_text(request: ResumeUploadRequest):
     text = request.text
-    rag_result = rag_store_resume(text)
+    rag_result = await rag_store_resume_async(text, request.metadata)
     return {
         "status": "success",
+        "resume_id": rag_result["resume_id"],
         "rag_status": rag_result,
         "message": "Resume text stored in memory."
     }
 
 @app.post("/analyze/summary", response_model=AnalysisResponse)
-async def get_summary(request: ResumeTextRequest):
-    result = summarize_resume(request.text)
+async def get_summary(request: ResumeTextRequest, use_cache: bool = True):
+    result = await summarize_resume_async(request.text, use_cache)
     if result.get("status") == "error":
          raise HTTPException(status_code=500, detail=str(result))
     return AnalysisResponse(status="success", report=result["report"])
 
+@app.post("/analyze/summary/stream")
+async def get_summary_stream(request: ResumeTextRequest, use_cache: bool = True):
+    return await _sse_response(summarize_resume_stream(request.text, use_cache))
+
 @app.post("/analyze/ats", response_model=ATSResponse)
 async def get_ats_score(
     resume_text: str = Body(..., embed=True),
     role: str = Body(..., embed=True),
-    job_description: Optional[str] = Body(None, embed=True)
+    job_description: Optional[str] = Body(None, embed=True),
+    use_cache: bool = True,
+    ai_feedback: bool = True
 ):
-    # 1. Heuristic Report
-    heuristic = ats_report(resume_text, role)
-    report_data = heuristic["ats_report"]
-    
-    # 2. AI Feedback (if JD provided)
-    ai_feedback_text = None
-    ai_score = None
-    
+    # Heuristic report (CPU, in a thread), semantic match and AI feedback (if a
+    # JD is provided) run concurrently. Pass ai_feedback=false to get the cheap
+    # embedding-based match without a Gemini call.
+    parts = [asyncio.to_thread(ats_report, resume_text, role)]
     if job_description:
-        ai_res = ats_ai_feedback(resume_text, job_description)
-        ai_feedback_text = ai_res.get("report")
-        ai_score = ai_res.get("score")
+        parts.append(semantic_match_async(resume_text, job_description))
+        if ai_feedback:
+            parts.append(ats_ai_feedback_async(resume_text, job_description, use_cache))
+    results = await asyncio.gather(*parts)
+    heuristic = results[0]
+    semantic = results[1] if job_description else {}
+    ai_res = results[2] if job_description and ai_feedback else {}
 
     return ATSResponse(
         status="success",
         role=role,
-        ats_report=report_data,
-        ai_feedback=ai_feedback_text,
-        match_score=ai_score
+        taxonomy_role=heuristic["taxonomy_role"],
+        ats_report=heuristic["ats_report"],
+        matched_keywords=heuristic["matched_keywords"],
+        semantic_score=semantic.get("semantic_score"),
+        requirement_coverage=semantic.get("requirements", []),
+        ai_feedback=ai_res.get("report"),
+        match_score=ai_res.get("score")
+    )
+
+ATS_BATCH_MAX_RESUMES = int(os.getenv("ATS_BATCH_MAX_RESUMES", "1000"))
+
+async def _ndjson_resumes(request: Request):
+    # Parses {"id": ..., "resume_text": ...} lines as the body arrives, so
+    # scoring of early chunks overlaps with the upload of later ones.
+    buffer, count = b"", 0
+
+    def parse(line: bytes):
+        nonlocal count
+        count += 1
+        if count > ATS_BATCH_MAX_RESUMES:
+            raise HTTPException(status_code=413, detail=f"At most {ATS_BATCH_MAX_RESUMES} resumes per batch")
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid NDJSON line {count}: {e}")
+        if not isinstance(item, dict) or not isinstance(item.get("resume_text"), str):
+            raise HTTPException(status_code=400,
+                                detail=f"Invalid NDJSON line {count}: expected an object with a resume_text string")
+        return str(item.get("id", count)), item["resume_text"]
+
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield parse(line)
+    if buffer.strip():
+        yield parse(buffer)
+
+@app.post("/analyze/ats/batch")
+async def analyze_ats_batch(request: Request, role: Optional[str] = None, top_k: Optional[int] = None):
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        if not role:
+            raise HTTPException(status_code=400, detail="role query parameter is required for NDJSON input")
+        resumes = _ndjson_resumes(request)
+    else:
+        try:
+            body = BatchATSRequest.model_validate_json(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if len(body.resumes) > ATS_BATCH_MAX_RESUMES:
+            raise HTTPException(status_code=413, detail=f"At most {ATS_BATCH_MAX_RESUMES} resumes per batch")
+        role, top_k = body.role, body.top_k or top_k
+        resumes = [(r.id, r.resume_text) for r in body.resumes]
+
+    # Bad NDJSON lines raise their own 400/413 from _ndjson_resumes.
+    result = await batch_ats_report_async(resumes, role, top_k)
+
+    def lines():
+        for item in result["report"]:
+            yield BatchATSResult(**item).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={
+        "X-Taxonomy-Role": result["taxonomy_role"],
+        "X-Resumes-Scored": str(result["scored"])
+    })
+
+@app.get("/taxonomies")
+async def taxonomies():
+    return {"status": "success", "roles": list_taxonomy_roles()}
+
+def _full_analysis_parts(request: FullAnalysisRequest, use_cache: bool) -> dict:
+    parts = {
+        "summary": summarize_resume_async(request.resume_text, use_cache),
+        "ats_report": asyncio.to_thread(ats_report, request.resume_text, request.role),
+    }
+    if request.job_description:
+        parts["ai_feedback"] = ats_ai_feedback_async(request.resume_text, request.job_description, use_cache)
+    if request.include_optimization:
+        parts["optimization"] = optimize_resume_async(request.resume_text, request.role, use_cache)
+    return parts
+
+def _full_analysis_fields(name: str, result: dict) -> dict:
+    if name == "summary":
+        return {"summary": result["report"]}
+    if name == "ats_report":
+        return {"ats_report": result["ats_report"]}
+    if name == "ai_feedback":
+        return {"ai_feedback": result.get("report"), "match_score": result.get("score")}
+    return {"optimized_content": result["report"]}
+
+async def _named(name: str, coro):
+    try:
+        return name, await coro, None
+    except Exception as e:
+        return name, None, e
+
+@app.post("/analyze/full", response_model=FullAnalysisResponse)
+async def analyze_full(request: FullAnalysisRequest, use_cache: bool = True, stream: bool = False):
+    # All parts run concurrently, so latency is the slowest LLM call rather than their sum.
+    tasks = [asyncio.ensure_future(_named(name, coro)) for name, coro in _full_analysis_parts(request, use_cache).items()]
+
+    if stream:
+        async def events():
+            # One SSE event per part, in completion order.
+            for next_done in asyncio.as_completed(tasks):
+                name, result, error = await next_done
+                if error is not None:
+                    yield _sse_event({"part": name, "error": str(error)})
+                else:
+                    yield _sse_event({"part": name, "result": _full_analysis_fields(name, result)})
+            yield _sse_event({"done": True})
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    fields, errors = {}, {}
+    for name, result, error in await asyncio.gather(*tasks):
+        if error is not None:
+            errors[name] = str(error)
+        else:
+            fields.update(_full_analysis_fields(name, result))
+
+    return FullAnalysisResponse(
+        status="partial" if errors else "success",
+        role=request.role,
+        errors=errors,
+        **fields
     )
 
 @app.post("/optimize", response_model=OptimizationResponse)
-async def optimize(request: ResumeTextRequest, role: str = Body(..., embed=True)):
-    # Note: The original tool writes to Desktop. We want to capture the content.
-    # The tool returns 'report' containing the content.
-    result = optimize_resume(request.text, role)
+async def optimize(request: ResumeTextRequest, role: str = Body(..., embed=True), use_cache: bool = True):
+    # Text only: DOCX/PDF files are rendered when downloaded, not here.
+    result = await optimize_resume_async(request.text, role, use_cache)
     if result["status"] == "error":
          raise HTTPException(status_code=500, detail=str(result))
     
     return OptimizationResponse(
         status="success",
-        optimized_content=result["report"]
+        optimized_content=result["report"],
+        document_id=result["document_id"],
+        downloads=result["downloads"]
     )
 
-@app.post("/chat", response_model=AnalysisResponse)
-async def chat_rag(request: ChatRequest):
-    result = rag_query(request.query, request.top_k)
+@app.get("/optimize/{document_id}.{fmt}")
+async def optimize_download(document_id: str, fmt: str):
+    if fmt not in DOCUMENT_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unknown format '{fmt}'")
+    try:
+        rendered = await render_document_async(document_id, fmt)
+    except DocumentRenderError as e:
+        # Without TeX the store falls back to its built-in PDF writer, so this
+        # is an overloaded renderer (temporary) or a failed compile (not).
+        status = 503 if e.status in ("unavailable", "timeout") else 500
+        raise HTTPException(status_code=status, detail=f"Could not render {fmt.upper()}: {e}")
+    if rendered is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired document_id")
+    data, role = rendered
+    filename = f"optimized_resume_{re.sub(r'[^A-Za-z0-9]+', '_', role).strip('_') or 'resume'}.{fmt}"
+    # The ID is the hash of the content, so the file never changes.
+    return Response(content=data, media_type=DOCUMENT_FORMATS[fmt], headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "ETag": f'"{document_id}.{fmt}"'
+    })
+
+@app.post("/optimize/stream")
+async def optimize_stream(request: ResumeTextRequest, role: str = Body(..., embed=True), use_cache: bool = True):
+    return await _sse_response(optimize_resume_stream(request.text, role, use_cache))
+
+@app.post("/chat/sessions")
+async def chat_session_create(request: ChatSessionRequest):
+    result = await asyncio.to_thread(create_chat_session, request.resume_id)
+    if result.get("status") == "error":
+        raise HTTPException(status_code=400, detail=result["error_message"])
+    return result
+
+@app.get("/chat/sessions/{session_id}")
+async def chat_session_get(session_id: str):
+    result = get_chat_session(session_id)
+    if result.get("status") == "error":
+        raise HTTPException(status_code=404, detail=result["error_message"])
+    return result
+
+@app.delete("/chat/sessions/{session_id}")
+async def chat_session_delete(session_id: str):
+    if not delete_chat_session(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session_id: {session_id}")
+    return {"status": "success"}
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat_rag(request: ChatRequest, use_cache: bool = True):
+    if request.session_id:
+        try:
+            result = await rag_chat_async(
+                request.session_id, request.query, request.top_k, use_cache, request.token_budget, request.rerank
+            )
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        return ChatResponse(**result)
+
+    result = await rag_query_async(
+        request.query, request.top_k, request.resume_id, use_cache, request.token_budget, request.rerank
+    )
     if result.get("status") == "error":
          raise HTTPException(status_code=400, detail=result["error_message"])
-    return AnalysisResponse(status="success", report=result["report"])
+    return ChatResponse(
+        status="success",
+        report=result["report"],
+        chunk_ids=result["chunk_ids"],
+        context_tokens=result["context_tokens"]
+    )
+
+@app.post("/chat/stream")
+async def chat_rag_stream(request: ChatRequest, use_cache: bool = True):
+    if request.session_id:
+        return await _sse_response(rag_chat_stream(
+            request.session_id, request.query, request.top_k, use_cache, request.token_budget, request.rerank
+        ), lookup_status=404)
+    return await _sse_response(rag_query_stream(
+        request.query, request.top_k, request.resume_id, use_cache, request.token_budget, request.rerank
+    ))
+
+@app.post("/search/candidates", response_model=CandidateSearchResponse)
+async def search_candidates_endpoint(request: CandidateSearchRequest):
+    result = await search_candidates_async(request.job_description, request.top_k, request.filters)
+    return CandidateSearchResponse(
+        status="success",
+        total_candidates=result["total_candidates"],
+        results=result["report"]
+    )
 
 @app.post("/jobs", response_model=JobSearchResponse)
 async def search_linkedin(request: JobRequest):
-    result = search_jobs(request.role, request.location)
+    result = await search_jobs_async(request.role, request.location)
     if result["status"] == "error":
           raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
-    return JobSearchResponse(status="success", jobs=result["report"])
+    return JobSearchResponse(status="success", jobs=result["report"], sources=result["sources"],
+                             partial=result["partial"])
 
 @app.post("/preview/latex")
-async def latex_preview(request: ResumeTextRequest, role: str = Body(..., embed=True)):
-    result = latex_resume_preview(request.text, role)
-    return result # Returns dict with pdf_base64, html_preview, etc.
+async def latex_preview(request: ResumeTextRequest, role: str = Body(..., embed=True), use_cache: bool = True):
+    result = await latex_resume_preview_async(request.text, role, use_cache)
+    return result # Returns dict with latex_source, pdf_url, html_preview, etc.
+
+@app.get("/preview/latex/{pdf_id}.pdf")
+async def latex_preview_pdf(pdf_id: str):
+    pdf = get_latex_pdf(pdf_id)
+    if pdf is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired pdf_id")
+    # The ID is the hash of the LaTeX source, so the content never changes; it
+    # is still someone's resume, so only the client may cache it.
+    return Response(content=pdf, media_type="application/pdf", headers={
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "ETag": f'"{pdf_id}"'
+    })
+
+# ---------- background tasks ----------
+# The slow endpoints above, queued: each returns 202 with a task ID at once.
+# Poll GET /tasks/{task_id} or subscribe to GET /tasks/{task_id}/events.
+
+async def _queue_task(kind: str, params: dict, idempotency_key: Optional[str]) -> JSONResponse:
+    task = await submit_task(kind, params, idempotency_key)
+    return JSONResponse(status_code=202 if task["created"] else 200, content={
+        "task_id": task["id"],
+        "kind": task["kind"],
+        "status": task["status"],
+        "created": task["created"],
+        "status_url": f"/tasks/{task['id']}",
+        "events_url": f"/tasks/{task['id']}/events"
+    })
+
+@app.post("/tasks/optimize", status_code=202)
+async def optimize_task(request: ResumeTextRequest, role: str = Body(..., embed=True), use_cache: bool = True,
+                        idempotency_key: Optional[str] = Header(None)):
+    return await _queue_task("optimize", {"resume_text": request.text, "role": role, "use_cache": use_cache},
+                             idempotency_key)
+
+@app.post("/tasks/preview/latex", status_code=202)
+async def latex_preview_task(request: ResumeTextRequest, role: str = Body(..., embed=True), use_cache: bool = True,
+                             idempotency_key: Optional[str] = Header(None)):
+    return await _queue_task("latex_preview", {"resume_text": request.text, "role": role, "use_cache": use_cache},
+                             idempotency_key)
+
+@app.post("/tasks/jobs", status_code=202)
+async def job_search_task(request: JobRequest, idempotency_key: Optional[str] = Header(None)):
+    return await _queue_task("job_search", {"role": request.role, "location": request.location}, idempotency_key)
+
+@app.get("/tasks/{task_id}")
+async def task_status(task_id: str):
+    task = await get_task(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired task_id")
+    return task
+
+@app.get("/tasks/{task_id}/events")
+async def task_events(task_id: str):
+    # One event per status change (queued -> running -> succeeded/failed).
+    if await get_task(task_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired task_id")
+    return await _sse_response(watch_task(task_id))
@@ -4,6 +4,9 @@ from typing import Optional, List, Dict, Any
 class ResumeTextRequest(BaseModel):
     text: str = Field(..., description="Raw text of the resume")
 
+class ResumeUploadRequest(ResumeTextRequest):
+    metadata: Optional[Dict[str, Any]] = Field(None, description="Searchable fields for /search/candidates, e.g. location")
+
 class JobRequest(BaseModel):
     role: str = Field(..., description="Target job role")
     location: str = Field("India", description="Job location for search")
@@ -12,6 +15,13 @@ class JobRequest(BaseModel):
 class ChatRequest(BaseModel):
     query: str = Field(..., description="Question to ask about the uploaded resume")
     top_k: int = Field(4, description="Number of context chunks to retrieve")
+    resume_id: Optional[str] = Field(None, description="ID returned by /upload/file or /upload/text; required unless session_id is given")
+    token_budget: Optional[int] = Field(None, ge=1, description="Max context tokens in the prompt; defaults to RAG_CONTEXT_TOKENS")
+    rerank: bool = Field(True, description="Rerank retrieved chunks by similarity plus keyword overlap")
+    session_id: Optional[str] = Field(None, description="ID from POST /chat/sessions; continues that conversation")
+
+class ChatSessionRequest(BaseModel):
+    resume_id: str = Field(..., description="ID returned by /upload/file or /upload/text")
 
 class ATSReport(BaseModel):
     overall_score: float
@@ -19,27 +29,103 @@ class ATSReport(BaseModel):
     structure_score: float
     length_score: float
 
+class RequirementCoverage(BaseModel):
+    requirement: str
+    similarity: float
+    covered: bool
+    evidence: str = Field("", description="Resume passage that best supports the requirement")
+
 class ATSResponse(BaseModel):
     status: str
     role: str
+    taxonomy_role: Optional[str] = Field(None, description="Role profile the resume was scored against")
     ats_report: ATSReport
+    matched_keywords: Dict[str, List[int]] = Field(default_factory=dict, description="Matched keyword -> character offsets")
+    semantic_score: Optional[float] = Field(None, description="Embedding-based job-description match, 0-100")
+    requirement_coverage: List[RequirementCoverage] = Field(default_factory=list)
     ai_feedback: Optional[str] = None
     match_score: Optional[int] = None
 
+class BatchResume(BaseModel):
+    id: str = Field(..., description="Caller-chosen identifier, echoed back in the results")
+    resume_text: str = Field(..., description="Raw text of the resume")
+
+class BatchATSRequest(BaseModel):
+    role: str = Field(..., description="Target job role all resumes are scored against")
+    resumes: List[BatchResume]
+    top_k: Optional[int] = Field(None, description="Return only the best k results")
+
+class BatchATSResult(BaseModel):
+    rank: int
+    id: str
+    taxonomy_role: str
+    ats_report: ATSReport
+    matched_keywords: Dict[str, List[int]] = Field(default_factory=dict)
+
+class CandidateSearchRequest(BaseModel):
+    job_description: str = Field(..., description="Job description to match stored resumes against")
+    top_k: int = Field(10, ge=1, le=1000, description="Number of candidates to return")
+    filters: Dict[str, Any] = Field(default_factory=dict, description="Metadata filters, e.g. {\"skills\": [\"python\"]}")
+
+class CandidateMatch(BaseModel):
+    candidate_id: str = Field(..., description="Opaque ID; not a resume_id and not accepted by /chat")
+    score: float
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+class CandidateSearchResponse(BaseModel):
+    status: str
+    total_candidates: int
+    results: List[CandidateMatch]
+
+class FullAnalysisRequest(BaseModel):
+    resume_text: str = Field(..., description="Raw text of the resume")
+    role: str = Field(..., description="Target job role")
+    job_description: Optional[str] = Field(None, description="Job description for AI ATS feedback")
+    include_optimization: bool = Field(False, description="Also rewrite the resume for the role")
+
+class FullAnalysisResponse(BaseModel):
+    status: str  # "success", or "partial" when some parts failed (see errors)
+    role: str
+    summary: Optional[str] = None
+    ats_report: Optional[ATSReport] = None
+    ai_feedback: Optional[str] = None
+    match_score: Optional[int] = None
+    optimized_content: Optional[str] = None
+    errors: Dict[str, str] = Field(default_factory=dict)
+
 class AnalysisResponse(BaseModel):
     status: str
     report: str
 
+class ChatResponse(AnalysisResponse):
+    chunk_ids: List[int] = Field(default_factory=list, description="Resume chunks used as context, in document order")
+    context_tokens: int = Field(0, description="Estimated tokens of context sent to the LLM")
+    session_id: Optional[str] = None
+    new_chunk_ids: List[int] = Field(default_factory=list, description="Chunks retrieved for this turn that earlier turns had not used")
+    history_tokens: int = Field(0, description="Estimated tokens of conversation history sent with this turn")
+    reused_context: bool = Field(False, description="True when the follow-up reused the session's context without a new search")
+
 class OptimizationResponse(BaseModel):
     status: str
-    # file_path: Optional[str] = None # We might return text or a link instead
     optimized_content: str
+    document_id: Optional[str] = Field(None, description="Content hash identifying the optimized resume")
+    downloads: Dict[str, str] = Field(default_factory=dict, description="Download URL per format (docx, pdf)")
 
 class JobListing(BaseModel):
     title: str
     company: str
     link: str
+    location: Optional[str] = None
+    source: Optional[str] = Field(None, description="Job source the listing came from")
+
+class JobSourceStatus(BaseModel):
+    status: str = Field(..., description="ok, timeout or error")
+    count: int = 0
+    ms: float = 0
+    error: Optional[str] = None
 
 class JobSearchResponse(BaseModel):
     status: str
     jobs: List[JobListing]
+    sources: Dict[str, JobSourceStatus] = Field(default_factory=dict)
+    partial: bool = Field(False, description="True when a source timed out or failed and its results are missing")
@@ -0,0 +1,7 @@
+import os
+
+# Runtime data (vector store, caches) lives next to the app unless overridden.
+DATA_DIR = os.getenv(
+    "RESUMINI_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+)
@@ -1,5 +1,9 @@
+import asyncio
+
 from google.adk.agents import LlmAgent
 from .available_tools import *
+from .llm_cache import RESPONSE_CACHE, ttl_for
+from .rate_limit import LLM_LIMITER
 
 
 root_agent = LlmAgent(
@@ -23,16 +27,46 @@ root_agent = LlmAgent(
 )
 
 # Manually inject the 'llm' attribute into tools because LlmAgent isn't doing it automatically.
-# We wrap the agent to expose a synchronous .generate() method required by available_tools.py.
+# We wrap the agent to expose .generate() (and an async .agenerate()) as required by available_tools.py.
 
 class AgentLLMWrapper:
-    def __init__(self, agent):
+    # Every entry point accepts `tool` (selects the cache TTL, see llm_cache.DEFAULT_TTLS)
+    # and `use_cache=False` to bypass the response cache for a single call.
+
+    # Provider calls go through a shared LLMLimiter (rate + concurrency caps,
+    # bounded queue, retries and a deadline); cache hits bypass it.
+
+    def __init__(self, agent, cache=RESPONSE_CACHE, limiter=LLM_LIMITER):
         self.agent = agent
+        self.cache = cache
+        self.limiter = limiter
+        self._model_instance = None
 
-    def generate(self, prompt: str) -> str:
+    @property
+    def model_instance(self):
         # Resolve the model from the agent (converts string name to Gemini object)
-        # canonical_model is a property on LlmAgent that returns the BaseLlm instance
-        model_instance = self.agent.canonical_model
+        # canonical_model is a property on LlmAgent that returns the BaseLlm instance.
+        # Resolve it once: the Gemini object caches its google.genai.Client, so
+        # keeping it around reuses the client's HTTP connection pool across calls.
+        if self._model_instance is None:
+            self._model_instance = self.agent.canonical_model
+        return self._model_instance
+
+    def _cached(self, prompt: str, use_cache: bool):
+        if self.cache is None or not use_cache:
+            return None
+        return self.cache.get(self.model_instance.model, prompt)
+
+    def _store(self, prompt: str, text: str, tool, use_cache: bool):
+        if self.cache is not None and use_cache and text:
+            self.cache.set(self.model_instance.model, prompt, text, ttl_for(tool))
+
+    def generate(self, prompt: str, tool: str = None, use_cache: bool = True) -> str:
+        cached = self._cached(prompt, use_cache)
+        if cached is not None:
+            return cached
+
+        model_instance = self.model_instance
         
         # Access the underlying google.genai.Client
         # The Gemini class (in google_llm.py) exposes 'api_client'
@@ -40,12 +74,58 @@ class AgentLLMWrapper:
         
         # Use the synchronous generation API
         # model_instance.model holds the model name string (e.g., 'gemini-2.5-flash')
-        response = client.models.generate_content(
+        response = self.limiter.call(lambda: client.models.generate_content(
             model=model_instance.model,
             contents=prompt
-        )
+        ))
+        self._store(prompt, response.text, tool, use_cache)
         return response.text
 
+    # The async paths reach the cache through a thread: the SQLite backend
+    # does blocking disk I/O.
+
+    async def agenerate(self, prompt: str, tool: str = None, use_cache: bool = True) -> str:
+        cached = await asyncio.to_thread(self._cached, prompt, use_cache)
+        if cached is not None:
+            return cached
+
+        model_instance = self.model_instance
+
+        # client.aio is the async surface of the same client; awaiting it frees
+        # the event loop for other requests while Gemini is generating.
+        client = model_instance.api_client
+        response = await self.limiter.acall(lambda: client.aio.models.generate_content(
+            model=model_instance.model,
+            contents=prompt
+        ))
+        await asyncio.to_thread(self._store, prompt, response.text, tool, use_cache)
+        return response.text
+
+    async def agenerate_stream(self, prompt: str, tool: str = None, use_cache: bool = True):
+        cached = await asyncio.to_thread(self._cached, prompt, use_cache)
+        if cached is not None:
+            yield cached
+            return
+
+        model_instance = self.model_instance
+
+        # Yields text deltas as Gemini produces them, so callers can forward
+        # the first tokens long before the full response is done.
+        # A stream holds its limiter slot until it is fully consumed and is not
+        # retried, since deltas may already have reached the client.
+        client = model_instance.api_client
+        parts = []
+        async with self.limiter.aslot():
+            stream = await client.aio.models.generate_content_stream(
+                model=model_instance.model,
+                contents=prompt
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+        await asyncio.to_thread(self._store, prompt, "".join(parts), tool, use_cache)
+
 llm_interface = AgentLLMWrapper(root_agent)
 
 tools_list = [
@@ -0,0 +1,40 @@
+from .taxonomy import RoleProfile
+
+# =========================================================
+# ATS HEURISTIC SCORING
+# =========================================================
+# Scores one resume against a resolved role profile (compiled keyword matcher,
+# weights, sections). Kept apart from available_tools so batch-scoring worker
+# processes only import this, the taxonomy and the keyword matcher, not the
+# registries, LLM wrapper and pools that available_tools sets up on import.
+
+
+def score_resume(profile: RoleProfile, resume_text: str) -> dict:
+    text = resume_text.lower()
+
+    matched = profile.matcher.matches(resume_text)
+    keyword_score = profile.keyword_score(matched) * 100
+    structure_score = len([s for s in profile.sections if s in text]) / len(profile.sections) * 100
+    length_score = 100 if 400 <= len(text.split()) <= 900 else 70
+
+    overall = round(
+        keyword_score * 0.4 +
+        structure_score * 0.3 +
+        length_score * 0.3, 2
+    )
+
+    return {
+        "taxonomy_role": profile.name,
+        "ats_report": {
+            "overall_score": overall,
+            "keyword_score": round(keyword_score, 2),
+            "structure_score": round(structure_score, 2),
+            "length_score": length_score
+        },
+        "matched_keywords": matched
+    }
+
+
+def score_batch(profile: RoleProfile, items: list) -> list:
+    """Scores (id, resume_text) pairs; runs inline or in a pool worker."""
+    return [{"id": resume_id, **score_resume(profile, text)} for resume_id, text in items]
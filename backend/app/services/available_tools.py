@@ -1,17 +1,31 @@
 import os
 import re
+import asyncio
+import secrets
 import time
-import base64
-import shutil
-import subprocess
-import tempfile
 import datetime
+import importlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
 from zoneinfo import ZoneInfo
 
-import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import docx
+
+from .documents import FORMATS as DOCUMENT_FORMATS, document_store_from_env
+from .embeddings import batcher_from_env, cache_from_env, encode_cached
+from .extraction import extract_document, extraction_service_from_env
+from .ats_scoring import score_batch, score_resume
+from .candidate_index import candidate_id, candidate_index_from_env, pool_embeddings
+from .chat_sessions import session_store_from_env
+from .chunker import CHUNKER_VERSION, chunk_resume, estimate_tokens
+from .context_builder import build_context
+from .job_search import job_searcher_from_env
+from .job_sources import job_aggregator_from_env
+from .latex import latex_compiler_from_env
+from .lazy import LazyResource
+from .task_queue import task_queue_from_env
+from .taxonomy import DEFAULT_ROLE, registry_from_env as taxonomy_registry_from_env
+from .vector_store import ResumeIndex, make_resume_id, registry_from_env
 
 # =========================================================
 # CENTRAL PROMPTS (EXACTLY AS PROVIDED)
@@ -157,140 +171,600 @@ def extract_text(path: str) -> dict:
     ext = os.path.splitext(path.lower())[1]
 
     try:
-        if ext == ".pdf":
-            import pdfplumber
-            pages = []
-            with pdfplumber.open(path) as pdf:
-                for p in pdf.pages:
-                    if p.extract_text():
-                        pages.append(p.extract_text())
-            text = "\n".join(pages)
-
-        elif ext in [".doc", ".docx"]:
-            doc = docx.Document(path)
-            text = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
-
-        else:
-            with open(path, "r", encoding="utf-8") as f:
-                text = f.read()
+        return {"status": "success", "report": extract_document(path, ext)}
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
 
-        return {"status": "success", "report": text}
 
+def extract_text_from_file(fileobj, filename: str) -> dict:
+    """Like extract_text, but parses an in-memory or spooled upload directly."""
+    ext = os.path.splitext(filename.lower())[1]
+    try:
+        return {"status": "success", "report": extract_document(fileobj, ext)}
     except Exception as e:
         return {"status": "error", "error_message": str(e)}
 
+
+# Uploads are parsed in worker processes with time and memory limits, and
+# cached by content hash (see services/extraction.py).
+_EXTRACTOR = extraction_service_from_env()
+
+
+async def extract_text_from_file_async(fileobj, filename: str, sha256: Optional[str] = None) -> dict:
+    # The upload may have spilled to disk; read it off the event loop.
+    data = await asyncio.to_thread(fileobj.read)
+    return await _EXTRACTOR.extract(data, filename, sha256)
+
+
+def extraction_stats() -> dict:
+    return _EXTRACTOR.stats()
+
+
+def shutdown_extraction_pool():
+    _EXTRACTOR.shutdown()
+
+# =========================================================
+# ASYNC LLM ACCESS
+# =========================================================
+
+# LLM calls pass the tool name (selects the response-cache TTL) and whether
+# the caller allows a cached response.
+
+async def _agenerate(tool, prompt: str, use_cache: bool = True) -> str:
+    # The agent wrapper exposes a native async path; plain .generate()
+    # implementations (e.g. test doubles) are run on a worker thread instead.
+    llm = tool.llm
+    if hasattr(llm, "agenerate"):
+        return await llm.agenerate(prompt, tool=tool.__name__, use_cache=use_cache)
+    return await asyncio.to_thread(llm.generate, prompt, tool=tool.__name__, use_cache=use_cache)
+
+
+async def _astream(tool, prompt: str, use_cache: bool = True):
+    # Streams text deltas; LLMs without a streaming path yield one full chunk.
+    llm = tool.llm
+    if hasattr(llm, "agenerate_stream"):
+        async for delta in llm.agenerate_stream(prompt, tool=tool.__name__, use_cache=use_cache):
+            yield delta
+    else:
+        yield await _agenerate(tool, prompt, use_cache)
+
 # =========================================================
 # VECTOR DB (FAISS) – RAG
 # =========================================================
 
-_EMBED_MODEL = SentenceTransformer("all-MiniLM-L6-v2")
+_EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def _load_embed_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(_EMBED_MODEL_NAME)
+
+
+_EMBED_MODEL = LazyResource("embedding_model", _load_embed_model)
+_EMBED_CACHE = cache_from_env(_EMBED_MODEL_NAME)
 _VECTOR_DIM = 384
-_VECTOR_INDEX = None
-_VECTOR_TEXTS = []
+# Section-aware chunks sized below the model's 256 word-piece limit (see chunker.py).
+_RAG_CHUNK_TOKENS = int(os.getenv("RAG_CHUNK_MAX_TOKENS", "128"))
+# Stored indexes are only reused when built by the same model and chunking.
+_INDEX_REGISTRY = registry_from_env(f"{_EMBED_MODEL_NAME}.chunker{CHUNKER_VERSION}.t{_RAG_CHUNK_TOKENS}")
+_CANDIDATES = LazyResource("candidate_index", lambda: candidate_index_from_env(_VECTOR_DIM))
 
 
-def _chunk_text(text: str, size=500, overlap=80):
-    words = text.split()
-    chunks, i = [], 0
-    while i < len(words):
-        chunks.append(" ".join(words[i:i+size]))
-        i += size - overlap
-    return chunks
+def _chunk_text(text: str, max_tokens: int = _RAG_CHUNK_TOKENS) -> list:
+    return [chunk.text for chunk in chunk_resume(text, max_tokens)]
 
 
-def rag_store_resume(resume_text: str) -> dict:
-    global _VECTOR_INDEX, _VECTOR_TEXTS
+def _encode_chunks(texts: list) -> np.ndarray:
+    return encode_cached(_EMBED_MODEL.get(), texts, _EMBED_CACHE)
 
-    chunks = _chunk_text(resume_text)
-    embeddings = _EMBED_MODEL.encode(chunks).astype("float32")
 
-    if _VECTOR_INDEX is None:
-        _VECTOR_INDEX = faiss.IndexFlatL2(_VECTOR_DIM)
+_EMBED_BATCHER = batcher_from_env(_encode_chunks)
 
-    _VECTOR_INDEX.add(embeddings)
-    _VECTOR_TEXTS.extend(chunks)
 
+def _stored_result(entry: ResumeIndex, chunks_added: int) -> dict:
     return {
         "status": "success",
-        "chunks_added": len(chunks),
-        "total_vectors": _VECTOR_INDEX.ntotal
+        "resume_id": entry.resume_id,
+        "chunks_added": chunks_added,
+        "total_vectors": entry.ntotal
+    }
+
+
+def _candidate_metadata(resume_text: str, metadata: Optional[dict]) -> dict:
+    # Derived fields first, so caller-supplied metadata can override them.
+    skills = _TAXONOMIES.get().resolve(DEFAULT_ROLE).matcher.matches(resume_text)
+    return {
+        "words": len(resume_text.split()),
+        "skills": sorted(skills),
+        "stored_at": int(time.time()),
+        **(metadata or {})
     }
 
 
-def rag_query(question: str, top_k: int = 4) -> dict:
-    if _VECTOR_INDEX is None:
-        return {"status": "error", "error_message": "No resume stored"}
+def _register_candidate(entry: ResumeIndex, resume_text: str, metadata: Optional[dict],
+                        embeddings: Optional[np.ndarray] = None):
+    candidates = _CANDIDATES.get()
+    if embeddings is None:
+        # Already indexed: only (re-)register when the pool lacks it or new metadata arrived.
+        if entry.resume_id in candidates and not metadata:
+            return
+        embeddings = entry.index.reconstruct_n(0, entry.ntotal)
+        metadata = {**(candidates.metadata(entry.resume_id) or {}), **(metadata or {})}
+    if len(embeddings):
+        candidates.upsert(entry.resume_id, pool_embeddings(embeddings), _candidate_metadata(resume_text, metadata))
+
+
+def _index_resume(resume_id: str, resume_text: str, chunks: list, embeddings: np.ndarray,
+                  metadata: Optional[dict] = None) -> dict:
+    entry = ResumeIndex(resume_id, _VECTOR_DIM)
+    entry.add(embeddings, chunks)
+    _INDEX_REGISTRY.put(entry)
+    _register_candidate(entry, resume_text, metadata, embeddings)
+    return _stored_result(entry, len(chunks))
 
-    q_emb = _EMBED_MODEL.encode([question]).astype("float32")
-    _, idxs = _VECTOR_INDEX.search(q_emb, top_k)
 
-    context = "\n\n".join(_VECTOR_TEXTS[i] for i in idxs[0])
+def _reuse_index(entry: ResumeIndex, resume_text: str, metadata: Optional[dict]) -> dict:
+    _register_candidate(entry, resume_text, metadata)
+    return _stored_result(entry, 0)
+
+
+def rag_store_resume(resume_text: str, metadata: Optional[dict] = None) -> dict:
+    resume_id = make_resume_id(resume_text)
+
+    # Same content hashes to the same ID, so a re-upload (even after a restart,
+    # via the on-disk store) reuses its index instead of re-embedding.
+    entry = _INDEX_REGISTRY.get(resume_id)
+    if entry is not None:
+        return _reuse_index(entry, resume_text, metadata)
+
+    chunks = _chunk_text(resume_text)
+    return _index_resume(resume_id, resume_text, chunks, _encode_chunks(chunks), metadata)
+
+
+async def rag_store_resume_async(resume_text: str, metadata: Optional[dict] = None) -> dict:
+    # Registry lookups may reopen an index from disk under the registry lock,
+    # so they run in a thread like the chunking and indexing.
+    resume_id = make_resume_id(resume_text)
+    entry = await asyncio.to_thread(_INDEX_REGISTRY.get, resume_id)
+    if entry is not None:
+        return await asyncio.to_thread(_reuse_index, entry, resume_text, metadata)
+
+    chunks = await asyncio.to_thread(_chunk_text, resume_text)
+    embeddings = await _EMBED_BATCHER.encode(chunks)
+    return await asyncio.to_thread(_index_resume, resume_id, resume_text, chunks, embeddings, metadata)
+
+
+def rag_stats() -> dict:
+    return {
+        "indexes": _INDEX_REGISTRY.stats(),
+        "embedding_cache": _EMBED_CACHE.stats(),
+        "embedding_batches": _EMBED_BATCHER.stats(),
+        "candidates": _CANDIDATES.get().stats() if _CANDIDATES.loaded else None
+    }
+
+
+def _resolve_index(resume_id: Optional[str], latest: bool = False):
+    # Only agent tool calls (latest=True) may fall back to the latest upload;
+    # API callers must name their resume, or they could read someone else's.
+    if resume_id:
+        entry = _INDEX_REGISTRY.get(resume_id)
+        if entry is None:
+            return None, {"status": "error", "error_message": f"Unknown or expired resume_id: {resume_id}"}
+    elif not latest:
+        return None, {"status": "error", "error_message": "resume_id is required"}
+    else:
+        entry = _INDEX_REGISTRY.most_recent()
+        if entry is None:
+            return None, {"status": "error", "error_message": "No resume stored"}
+    return entry, None
+
+
+# Chat context: search over-fetches, then build_context drops duplicate and
+# overlapping hits, reranks, and fills at most RAG_CONTEXT_TOKENS tokens.
+_RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "512"))
+_RAG_LEXICAL_WEIGHT = float(os.getenv("RAG_RERANK_LEXICAL_WEIGHT", "0.3"))
+
+
+def _select_context(entry: ResumeIndex, q_emb: np.ndarray, question: str, top_k: int,
+                    token_budget: Optional[int] = None, rerank: bool = True) -> dict:
+    distances, idxs = entry.search(q_emb, top_k * 2)
+    return build_context(
+        list(zip(idxs[0], distances[0])), entry.texts, question,
+        token_budget=token_budget or _RAG_CONTEXT_TOKENS, max_chunks=top_k,
+        rerank=rerank, lexical_weight=_RAG_LEXICAL_WEIGHT
+    )
+
+
+def _rag_prompt(entry: ResumeIndex, q_emb: np.ndarray, question: str, top_k: int,
+                token_budget: Optional[int] = None, rerank: bool = True):
+    selection = _select_context(entry, q_emb, question, top_k, token_budget, rerank)
 
     prompt = f"""
     Answer using ONLY the context below.
 
     Context:
-    {context}
+    {selection["context"]}
+
+    Question:
+    {question}
+    """
+    return prompt, selection
+
+
+def _rag_result(answer: str, selection: dict) -> dict:
+    return {
+        "status": "success",
+        "report": answer.strip(),
+        "chunk_ids": selection["chunk_ids"],
+        "context_tokens": selection["tokens"]
+    }
+
+
+def rag_query(question: str, top_k: int = 4, resume_id: Optional[str] = None) -> dict:
+    entry, error = _resolve_index(resume_id, latest=True)
+    if error:
+        return error
+
+    q_emb = _EMBED_MODEL.get().encode([question]).astype("float32")
+    prompt, selection = _rag_prompt(entry, q_emb, question, top_k)
+
+    answer = rag_query.llm.generate(prompt, tool="rag_query")
+
+    return _rag_result(answer, selection)
+
+
+async def rag_query_async(question: str, top_k: int = 4, resume_id: Optional[str] = None, use_cache: bool = True,
+                          token_budget: Optional[int] = None, rerank: bool = True) -> dict:
+    entry, error = await asyncio.to_thread(_resolve_index, resume_id)
+    if error:
+        return error
+
+    q_emb = await _EMBED_BATCHER.encode([question])
+    prompt, selection = await asyncio.to_thread(_rag_prompt, entry, q_emb, question, top_k, token_budget, rerank)
+
+    answer = await _agenerate(rag_query, prompt, use_cache)
+
+    return _rag_result(answer, selection)
+
+
+async def rag_query_stream(question: str, top_k: int = 4, resume_id: Optional[str] = None, use_cache: bool = True,
+                           token_budget: Optional[int] = None, rerank: bool = True):
+    entry, error = await asyncio.to_thread(_resolve_index, resume_id)
+    if error:
+        # Raised on the first iteration, before anything has been streamed.
+        raise LookupError(error["error_message"])
+
+    q_emb = await _EMBED_BATCHER.encode([question])
+    prompt, _ = await asyncio.to_thread(_rag_prompt, entry, q_emb, question, top_k, token_budget, rerank)
+
+    async for delta in _astream(rag_query, prompt, use_cache):
+        yield delta
+
+# =========================================================
+# MULTI-TURN CHAT SESSIONS
+# =========================================================
+
+_CHAT_SESSIONS = session_store_from_env()
+
+
+def create_chat_session(resume_id: str) -> dict:
+    entry, error = _resolve_index(resume_id)
+    if error:
+        return error
+    session = _CHAT_SESSIONS.create(entry.resume_id)
+    return {"status": "success", "session_id": session.session_id, "resume_id": session.resume_id}
+
+
+def get_chat_session(session_id: str) -> dict:
+    session = _CHAT_SESSIONS.get(session_id)
+    if session is None:
+        return {"status": "error", "error_message": f"Unknown or expired session_id: {session_id}"}
+    return {"status": "success", "report": session.describe()}
+
+
+def delete_chat_session(session_id: str) -> bool:
+    return _CHAT_SESSIONS.remove(session_id)
+
+
+def chat_session_stats() -> dict:
+    return _CHAT_SESSIONS.stats()
+
+
+async def _session_prompt(session, question: str, top_k: int, token_budget: Optional[int], rerank: bool):
+    entry = await asyncio.to_thread(_INDEX_REGISTRY.get, session.resume_id)
+    if entry is None:
+        raise LookupError(f"Unknown or expired resume_id: {session.resume_id}")
+
+    # The bare question decides whether the topic changed; the question joined
+    # with the previous one is what gets searched.
+    q_emb, search_emb = np.split(await _EMBED_BATCHER.encode([question, session.retrieval_query(question)]), 2)
+    reused = session.can_reuse(q_emb)
+    added = []
+    if not reused:
+        selection = await asyncio.to_thread(_select_context, entry, search_emb, question, top_k, token_budget, rerank)
+        added = session.add_context(
+            selection["chunk_ids"], [entry.texts[i] for i in selection["chunk_ids"]], selection["chunk_tokens"],
+            budget=token_budget
+        )
+
+    # Stable parts first (context, then history) so consecutive prompts share a prefix.
+    history = session.history_text()
+    prompt = f"""
+    Answer using ONLY the context below and the conversation so far.
+
+    Context:
+    {session.context_text()}
+
+    Conversation so far:
+    {history or "(none)"}
 
     Question:
     {question}
     """
+    info = {
+        "session_id": session.session_id,
+        "chunk_ids": list(session.context),
+        "context_tokens": session.context_size,
+        "new_chunk_ids": added,
+        "history_tokens": estimate_tokens(history),
+        "reused_context": reused
+    }
+    return prompt, info
+
+
+def _resolve_session(session_id: str):
+    session = _CHAT_SESSIONS.get(session_id)
+    if session is None:
+        raise LookupError(f"Unknown or expired session_id: {session_id}")
+    return session
 
-    answer = rag_query.llm.generate(prompt)
 
-    return {"status": "success", "report": answer.strip()}
+async def rag_chat_async(session_id: str, question: str, top_k: int = 4, use_cache: bool = True,
+                         token_budget: Optional[int] = None, rerank: bool = True) -> dict:
+    """One turn of a session: retrieval is incremental and history is bounded."""
+    session = _resolve_session(session_id)
+    async with session.lock:
+        prompt, info = await _session_prompt(session, question, top_k, token_budget, rerank)
+        answer = await _agenerate(rag_query, prompt, use_cache)
+        session.record(question, answer)
+    return {"status": "success", "report": answer.strip(), **info}
+
+
+async def rag_chat_stream(session_id: str, question: str, top_k: int = 4, use_cache: bool = True,
+                          token_budget: Optional[int] = None, rerank: bool = True):
+    session = _resolve_session(session_id)
+    async with session.lock:
+        prompt, _ = await _session_prompt(session, question, top_k, token_budget, rerank)
+        parts = []
+        async for delta in _astream(rag_query, prompt, use_cache):
+            parts.append(delta)
+            yield delta
+        # Only a completed answer becomes part of the history.
+        session.record(question, "".join(parts))
+
+
+# =========================================================
+# CANDIDATE SEARCH
+# =========================================================
+
+# Results list candidates by an opaque ID, never by resume_id: the pool holds
+# every user's resumes and a resume_id is all /chat asks for. Set
+# CANDIDATE_ID_SECRET to keep the IDs stable across restarts and workers.
+_CANDIDATE_ID_KEY = os.getenv("CANDIDATE_ID_SECRET", "").encode("utf-8") or secrets.token_bytes(32)
+
+
+def _candidate_result(hits: list) -> dict:
+    return {
+        "status": "success",
+        "total_candidates": len(_CANDIDATES.get()),
+        "report": [
+            {"candidate_id": candidate_id(resume_id, _CANDIDATE_ID_KEY), "score": round(score, 4), "metadata": metadata}
+            for resume_id, score, metadata in hits
+        ]
+    }
+
+
+def search_candidates(job_description: str, top_k: int = 10, filters: Optional[dict] = None) -> dict:
+    """Ranks stored resumes by similarity to a job description."""
+    query = pool_embeddings(_encode_chunks(_chunk_text(job_description)))
+    return _candidate_result(_CANDIDATES.get().search(query, top_k, filters))
+
+
+async def search_candidates_async(job_description: str, top_k: int = 10, filters: Optional[dict] = None) -> dict:
+    chunks = await asyncio.to_thread(_chunk_text, job_description)
+    query = pool_embeddings(await _EMBED_BATCHER.encode(chunks))
+    hits = await asyncio.to_thread(_CANDIDATES.get().search, query, top_k, filters)
+    return _candidate_result(hits)
+
 
 # =========================================================
 # ATS HEURISTIC REPORT (JSON)
 # =========================================================
 
+# Role -> weighted keywords, synonyms and sections, loaded from
+# app/data/taxonomies and compiled into per-role matchers (see taxonomy.py).
+_TAXONOMIES = LazyResource("taxonomies", taxonomy_registry_from_env)
+
+
+def _resolve_role(role: str):
+    # Loads the taxonomy files on first use and re-reads them when they change.
+    return _TAXONOMIES.get().resolve(role)
+
+
 def ats_report(resume_text: str, role: str) -> dict:
-    text = resume_text.lower()
-
-    keywords = [
-        "python", "java", "c++", "javascript", "typescript", "html", "css", "react", "angular", "vue",
-        "node", "express", "django", "flask", "fastapi", "spring", "springboot", "hibernate",
-        "sql", "mysql", "postgresql", "mongodb", "redis", "elasticsearch", "cassandra",
-        "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "gitlab", "github actions",
-        "machine learning", "deep learning", "nlp", "computervision", "tensorflow", "pytorch", "scikit-learn",
-        "pandas", "numpy", "matplotlib", "seaborn", "tableau", "powerbi",
-        "git", "linux", "agile", "scrum", "rest api", "graphql", "microservices"
-    ]
-    sections = ["education", "skills", "experience", "projects"]
-
-    keyword_score = len([k for k in keywords if k in text]) / len(keywords) * 100
-    structure_score = len([s for s in sections if s in text]) / len(sections) * 100
-    length_score = 100 if 400 <= len(text.split()) <= 900 else 70
-
-    overall = round(
-        keyword_score * 0.4 +
-        structure_score * 0.3 +
-        length_score * 0.3, 2
-    )
+    profile = _resolve_role(role)
+    return {"status": "success", "role": role, **score_resume(profile, resume_text)}
+
+
+def list_taxonomy_roles() -> list:
+    return _TAXONOMIES.get().roles()
+
+# =========================================================
+# SEMANTIC JOB MATCH (EMBEDDINGS)
+# =========================================================
+
+# An LLM-free match signal: the job description is split into requirements,
+# the resume into small section-aware chunks, and one cosine-similarity matrix
+# (requirements x chunks) gives every requirement its best-supporting passage.
+# Once the embedding model is loaded this takes milliseconds, so Gemini
+# feedback can be kept for shortlisted candidates.
+_SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_MATCH_THRESHOLD", "0.5"))
+_SEMANTIC_FLOOR = float(os.getenv("SEMANTIC_MATCH_FLOOR", "0.2"))
+_SEMANTIC_CHUNK_TOKENS = 64
+_MAX_REQUIREMENTS = 50
+
+
+def _split_requirements(job_description: str) -> list:
+    requirements = []
+    for part in re.split(r"\n+|(?<=[.;!?])\s+", job_description):
+        part = re.sub(r"^\s*(?:[\-*•]|\d+[.)])\s*", "", part).strip()
+        if len(part.split()) >= 3 and part not in requirements:
+            requirements.append(part)
+    return requirements[:_MAX_REQUIREMENTS]
+
 
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def requirement_coverage(req_vecs: np.ndarray, chunk_vecs: np.ndarray,
+                         threshold: float = _SEMANTIC_THRESHOLD, floor: float = _SEMANTIC_FLOOR):
+    """Best similarity and best chunk per requirement, plus a 0-100 score.
+
+    Each requirement earns credit linearly from ``floor`` (none) up to
+    ``threshold`` (full); the score is the mean credit.
+    """
+    sims = _unit_rows(req_vecs) @ _unit_rows(chunk_vecs).T
+    best_idx = sims.argmax(axis=1)
+    best = sims[np.arange(len(sims)), best_idx]
+    credit = np.clip((best - floor) / (threshold - floor), 0, 1)
+    return best, best_idx, float(credit.mean() * 100)
+
+
+def _semantic_inputs(resume_text: str, job_description: str):
+    return _split_requirements(job_description), _chunk_text(resume_text, _SEMANTIC_CHUNK_TOKENS)
+
+
+def _semantic_result(requirements: list, chunks: list, vectors: Optional[np.ndarray]) -> dict:
+    if vectors is None:
+        return {"status": "success", "semantic_score": 0.0, "requirements": []}
+
+    best, best_idx, score = requirement_coverage(vectors[:len(requirements)], vectors[len(requirements):])
     return {
         "status": "success",
-        "role": role,
-        "ats_report": {
-            "overall_score": overall,
-            "keyword_score": round(keyword_score, 2),
-            "structure_score": round(structure_score, 2),
-            "length_score": length_score
-        }
+        "semantic_score": round(score, 2),
+        "requirements": [
+            {
+                "requirement": requirement,
+                "similarity": round(float(sim), 4),
+                "covered": bool(sim >= _SEMANTIC_THRESHOLD),
+                "evidence": chunks[idx][:200]
+            }
+            for requirement, sim, idx in zip(requirements, best, best_idx)
+        ]
     }
 
+
+def semantic_match(resume_text: str, job_description: str) -> dict:
+    requirements, chunks = _semantic_inputs(resume_text, job_description)
+    if not requirements or not chunks:
+        return _semantic_result(requirements, chunks, None)
+    return _semantic_result(requirements, chunks, _encode_chunks(requirements + chunks))
+
+
+async def semantic_match_async(resume_text: str, job_description: str) -> dict:
+    requirements, chunks = await asyncio.to_thread(_semantic_inputs, resume_text, job_description)
+    if not requirements or not chunks:
+        return _semantic_result(requirements, chunks, None)
+    # One batcher call, so concurrent requests share a model batch.
+    return _semantic_result(requirements, chunks, await _EMBED_BATCHER.encode(requirements + chunks))
+
+
 # =========================================================
-# ATS AI SCORING (PROMPT-BASED)
+# BATCH ATS SCORING
 # =========================================================
 
-def ats_ai_feedback(resume_text: str, job_description: str) -> dict:
-    prompt = ATS_SCORING_PROMPT.format(
-        resume=resume_text,
-        job=job_description
-    )
+# Ranking many resumes against one role: the role is resolved (keywords,
+# weights, sections, compiled matcher) once per batch, and resumes are scored
+# in chunks on a process pool so large batches use every core. Workers run
+# ats_scoring.score_batch, so they never import this module. Small batches
+# are scored inline, where pickling and process hand-off would cost more than
+# the scoring itself.
+_ATS_BATCH_WORKERS = int(os.getenv("ATS_BATCH_WORKERS", "0")) or os.cpu_count() or 1
+_ATS_BATCH_CHUNK_SIZE = int(os.getenv("ATS_BATCH_CHUNK_SIZE", "32"))
+_ATS_BATCH_INLINE_MAX = int(os.getenv("ATS_BATCH_INLINE_MAX", "16"))
+_ATS_POOL = LazyResource("ats_pool", lambda: ProcessPoolExecutor(max_workers=_ATS_BATCH_WORKERS))
+
+
+def _rank(results: list, top_k: Optional[int]) -> list:
+    ranked = sorted(results, key=lambda r: r["ats_report"]["overall_score"], reverse=True)
+    if top_k:
+        ranked = ranked[:top_k]
+    for rank, result in enumerate(ranked, start=1):
+        result["rank"] = rank
+    return ranked
+
+
+def batch_ats_report(resumes, role: str, top_k: Optional[int] = None) -> dict:
+    """Scores (id, resume_text) pairs against one role, best first."""
+    profile = _resolve_role(role)
+    items = list(resumes)
+    if len(items) <= _ATS_BATCH_INLINE_MAX:
+        results = score_batch(profile, items)
+    else:
+        chunks = [items[i:i + _ATS_BATCH_CHUNK_SIZE] for i in range(0, len(items), _ATS_BATCH_CHUNK_SIZE)]
+        results = [r for chunk in _ATS_POOL.get().map(score_batch, [profile] * len(chunks), chunks) for r in chunk]
+    return {"status": "success", "role": role, "taxonomy_role": profile.name, "scored": len(items),
+            "report": _rank(results, top_k)}
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def batch_ats_report_async(resumes, role: str, top_k: Optional[int] = None) -> dict:
+    """Like batch_ats_report, but ``resumes`` may be an async iterable (e.g. an
+    NDJSON request body); full chunks go to the pool while the rest is still arriving."""
+    profile = await asyncio.to_thread(_resolve_role, role)
+    loop = asyncio.get_running_loop()
+    pending, chunk, scored = [], [], 0
+
+    def submit(items):
+        # Always a Future, so the error path below can cancel it.
+        if not pending and len(items) <= _ATS_BATCH_INLINE_MAX:
+            return asyncio.ensure_future(asyncio.to_thread(score_batch, profile, items))
+        return loop.run_in_executor(_ATS_POOL.get(), score_batch, profile, items)
+
+    try:
+        async for item in (resumes if hasattr(resumes, "__aiter__") else _aiter(resumes)):
+            chunk.append(item)
+            scored += 1
+            if len(chunk) >= _ATS_BATCH_CHUNK_SIZE:
+                pending.append(submit(chunk))
+                chunk = []
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        raise
+    if chunk:
+        pending.append(submit(chunk))
+
+    results = [r for part in await asyncio.gather(*pending) for r in part]
+    return {"status": "success", "role": role, "taxonomy_role": profile.name, "scored": scored,
+            "report": _rank(results, top_k)}
+
 
-    response = ats_ai_feedback.llm.generate(prompt)
+def shutdown_ats_pool():
+    if _ATS_POOL.loaded:
+        _ATS_POOL.get().shutdown(wait=False, cancel_futures=True)
 
+
+# =========================================================
+# ATS AI SCORING (PROMPT-BASED)
+# =========================================================
+
+def _ats_feedback_result(response: str) -> dict:
     score = None
     m = re.search(r"ATS Match Score:\s*(\d+)", response)
     if m:
@@ -302,18 +776,85 @@ def ats_ai_feedback(resume_text: str, job_description: str) -> dict:
         "report": response.strip()
     }
 
+
+def ats_ai_feedback(resume_text: str, job_description: str) -> dict:
+    prompt = ATS_SCORING_PROMPT.format(
+        resume=resume_text,
+        job=job_description
+    )
+
+    response = ats_ai_feedback.llm.generate(prompt, tool="ats_ai_feedback")
+    return _ats_feedback_result(response)
+
+
+async def ats_ai_feedback_async(resume_text: str, job_description: str, use_cache: bool = True) -> dict:
+    prompt = ATS_SCORING_PROMPT.format(
+        resume=resume_text,
+        job=job_description
+    )
+
+    response = await _agenerate(ats_ai_feedback, prompt, use_cache)
+    return _ats_feedback_result(response)
+
 # =========================================================
 # SUMMARY TOOL
 # =========================================================
 
 def summarize_resume(resume_text: str) -> dict:
     prompt = SUMMARY_PROMPT.format(resume_text=resume_text)
-    response = summarize_resume.llm.generate(prompt)
+    response = summarize_resume.llm.generate(prompt, tool="summarize_resume")
+    return {"status": "success", "report": response.strip()}
+
+
+async def summarize_resume_async(resume_text: str, use_cache: bool = True) -> dict:
+    prompt = SUMMARY_PROMPT.format(resume_text=resume_text)
+    response = await _agenerate(summarize_resume, prompt, use_cache)
     return {"status": "success", "report": response.strip()}
 
+
+async def summarize_resume_stream(resume_text: str, use_cache: bool = True):
+    prompt = SUMMARY_PROMPT.format(resume_text=resume_text)
+    async for delta in _astream(summarize_resume, prompt, use_cache):
+        yield delta
+
 # =========================================================
-# OPTIMIZE RESUME (DOCX)
+# OPTIMIZE RESUME (DOCX / PDF ON DEMAND)
 # =========================================================
+# The optimized text is only registered by content hash; DOCX and PDF files
+# are rendered in memory when downloaded (see services/documents.py).
+
+_DOCUMENTS = document_store_from_env()
+
+
+def _optimized_result(response: str, role: str) -> dict:
+    report = response.strip()
+    doc_id = _DOCUMENTS.register(report, role)
+    return {
+        "status": "success",
+        "report": report,
+        "document_id": doc_id,
+        "downloads": {fmt: f"/optimize/{doc_id}.{fmt}" for fmt in DOCUMENT_FORMATS}
+    }
+
+
+def render_document(doc_id: str, fmt: str) -> Optional[tuple]:
+    """(bytes, role) of a registered optimized resume, or None if unknown."""
+    entry = _DOCUMENTS.get(doc_id)
+    data = _DOCUMENTS.render(doc_id, fmt) if entry else None
+    return (data, entry[1]) if data is not None else None
+
+
+async def render_document_async(doc_id: str, fmt: str) -> Optional[tuple]:
+    return await asyncio.to_thread(render_document, doc_id, fmt)
+
+
+def document_stats() -> dict:
+    return _DOCUMENTS.stats()
+
+
+def shutdown_documents():
+    _DOCUMENTS.shutdown()
+
 
 def optimize_resume(resume_text: str, role: str) -> dict:
     prompt = OPTIMIZE_PROMPT.format(
@@ -321,37 +862,48 @@ def optimize_resume(resume_text: str, role: str) -> dict:
         role=role
     )
 
-    response = optimize_resume.llm.generate(prompt)
+    response = optimize_resume.llm.generate(prompt, tool="optimize_resume")
+    return _optimized_result(response, role)
 
-    desktop = os.path.join(os.path.expanduser("~"), "Desktop")
-    out_path = os.path.join(desktop, f"optimized_resume_{role}.docx")
 
-    doc = docx.Document()
-    for line in response.splitlines():
-        doc.add_paragraph(line)
-    doc.save(out_path)
+async def optimize_resume_async(resume_text: str, role: str, use_cache: bool = True) -> dict:
+    prompt = OPTIMIZE_PROMPT.format(
+        resume_text=resume_text,
+        role=role
+    )
+
+    response = await _agenerate(optimize_resume, prompt, use_cache)
+    return _optimized_result(response, role)
 
-    return {
-        "status": "success",
-        "file_path": out_path,
-        "report": response.strip()
-    }
+
+async def optimize_resume_stream(resume_text: str, role: str, use_cache: bool = True):
+    # Text only: the streamed variant does not register a downloadable document.
+    prompt = OPTIMIZE_PROMPT.format(
+        resume_text=resume_text,
+        role=role
+    )
+    async for delta in _astream(optimize_resume, prompt, use_cache):
+        yield delta
 
 # =========================================================
 # LaTeX → PDF → HTML PREVIEW
 # =========================================================
 
-def latex_resume_preview(resume_text: str, role: str) -> dict:
-    prompt = f"""
+def _latex_prompt(resume_text: str, role: str) -> str:
+    return f"""
     Convert the resume into a clean, ATS-safe,
     single-page LaTeX resume for {role}.
     Output ONLY LaTeX.
+
+    Resume Text:
+    \"\"\"{resume_text}\"\"\"
     """
 
-    latex = latex_resume_preview.llm.generate(prompt).strip()
 
-    if "\\documentclass" not in latex:
-        latex = f"""
+def _wrap_latex(latex: str) -> str:
+    if "\\documentclass" in latex:
+        return latex
+    return f"""
 \\documentclass[11pt]{{article}}
 \\usepackage[utf8]{{inputenc}}
 \\usepackage[T1]{{fontenc}}
@@ -365,69 +917,144 @@ def latex_resume_preview(resume_text: str, role: str) -> dict:
 \\end{{document}}
 """
 
-    pdf64 = None
 
-    with tempfile.TemporaryDirectory() as tmp:
-        tex = os.path.join(tmp, "r.tex")
-        pdf = os.path.join(tmp, "r.pdf")
-        open(tex, "w", encoding="utf-8").write(latex)
+# Compiles run on a bounded pool with time and resource limits and are cached
+# by source hash (see services/latex.py). The PDF itself is served as binary
+# from /preview/latex/{pdf_id}.pdf rather than base64-encoded into the JSON.
+_LATEX = latex_compiler_from_env()
 
-        if shutil.which("pdflatex"):
-            subprocess.run(
-                ["pdflatex", tex],
-                cwd=tmp,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-
-        if os.path.exists(pdf):
-            pdf64 = base64.b64encode(open(pdf, "rb").read()).decode()
 
+def _latex_result(latex: str, role: str, compiled: dict) -> dict:
+    pdf_url = f"/preview/latex/{compiled['id']}.pdf" if compiled["pdf"] is not None else None
     html = f"""
     <html><body style="background:#000;color:#fff">
     <h2>Optimized Resume ({role})</h2>
-    <embed src="data:application/pdf;base64,{pdf64}"
+    <embed src="{pdf_url}" type="application/pdf"
            width="100%" height="600px">
     </body></html>
-    """
+    """ if pdf_url else None
 
     return {
         "status": "success",
         "latex_source": latex,
-        "pdf_base64": pdf64,
+        "pdf_id": compiled["id"],
+        "pdf_url": pdf_url,
+        "compile_status": compiled["status"],
+        "compile_log": compiled["log"] or None,
+        "cached": compiled["cached"],
         "html_preview": html
     }
 
+
+def get_latex_pdf(pdf_id: str) -> Optional[bytes]:
+    return _LATEX.get_pdf(pdf_id)
+
+
+def latex_stats() -> dict:
+    return _LATEX.stats()
+
+
+def shutdown_latex_pool():
+    _LATEX.shutdown()
+
+
+def latex_resume_preview(resume_text: str, role: str) -> dict:
+    latex = _wrap_latex(
+        latex_resume_preview.llm.generate(_latex_prompt(resume_text, role), tool="latex_resume_preview").strip()
+    )
+    return _latex_result(latex, role, _LATEX.compile(latex))
+
+
+async def latex_resume_preview_async(resume_text: str, role: str, use_cache: bool = True) -> dict:
+    latex = _wrap_latex((await _agenerate(latex_resume_preview, _latex_prompt(resume_text, role), use_cache)).strip())
+    return _latex_result(latex, role, await asyncio.shield(asyncio.wrap_future(_LATEX.submit(latex))))
+
 # =========================================================
 # LINKEDIN JOB SEARCH (DEMO)
 # =========================================================
 
+# Browser sessions are pooled and results cached per (role, location); see
+# services/job_search.py. JOB_SEARCH_URL can point at a local fixture server.
+# All configured sources (services/job_sources.py) are queried concurrently,
+# each within its own deadline.
+_JOB_SEARCH = job_searcher_from_env()
+_JOB_SOURCES = job_aggregator_from_env(_JOB_SEARCH)
+
+
+async def search_jobs_async(role: str, location: str = "India") -> dict:
+    result = await _JOB_SOURCES.search(role, location)
+    if not result["jobs"] and not any(s["status"] == "ok" for s in result["sources"].values()):
+        failures = "; ".join(f"{name}: {s.get('error', s['status'])}" for name, s in result["sources"].items())
+        return {"status": "error", "error_message": failures or "No job sources configured",
+                "sources": result["sources"]}
+    return {"status": "success", "report": result["jobs"], "sources": result["sources"], "partial": result["partial"]}
+
+
 def search_jobs(role: str, location: str = "India") -> dict:
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.options import Options
+    # Agent tools may be called from inside a running event loop, so the
+    # fan-out gets a fresh loop on its own thread; the sources' HTTP clients
+    # for that loop are closed with it.
+    async def run():
+        try:
+            return await search_jobs_async(role, location)
+        finally:
+            await _JOB_SOURCES.aclose()
 
-    options = Options()
-    options.add_argument("--headless=new")
-    driver = webdriver.Chrome(options=options)
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, run()).result()
 
-    jobs = []
-    try:
-        url = f"https://www.linkedin.com/jobs/search/?keywords={role}&location={location}"
-        driver.get(url)
-        time.sleep(5)
-
-        cards = driver.find_elements(By.CSS_SELECTOR, "ul.jobs-search__results-list li")
-        for c in cards[:10]:
-            try:
-                jobs.append({
-                    "title": c.find_element(By.TAG_NAME, "h3").text,
-                    "company": c.find_element(By.TAG_NAME, "h4").text,
-                    "link": c.find_element(By.TAG_NAME, "a").get_attribute("href")
-                })
-            except Exception:
-                continue
-    finally:
-        driver.quit()
-
-    return {"status": "success", "report": jobs}
+
+def job_search_stats() -> dict:
+    return _JOB_SEARCH.stats()
+
+
+async def shutdown_job_search():
+    _JOB_SEARCH.shutdown()
+    await _JOB_SOURCES.aclose()
+
+# =========================================================
+# BACKGROUND TASKS
+# =========================================================
+# Slow tools can also run as queued tasks (see services/task_queue.py).
+# Handlers look the tool up at call time so it can be swapped in tests.
+
+_TASKS = task_queue_from_env()
+_TASKS.register("optimize", lambda **params: optimize_resume_async(**params))
+_TASKS.register("latex_preview", lambda **params: latex_resume_preview_async(**params))
+_TASKS.register("job_search", lambda **params: search_jobs_async(**params))
+
+
+async def submit_task(kind: str, params: dict, idempotency_key: Optional[str] = None) -> dict:
+    """Raises QueueFullError, IdempotencyConflict or LookupError (unknown kind)."""
+    record, created = await _TASKS.submit(kind, params, idempotency_key)
+    return dict(record, created=created)
+
+
+async def get_task(task_id: str) -> Optional[dict]:
+    return await _TASKS.get(task_id)
+
+
+def watch_task(task_id: str):
+    return _TASKS.watch(task_id)
+
+
+async def task_stats() -> dict:
+    return await _TASKS.stats()
+
+# =========================================================
+# LAZY AGENT BINDING
+# =========================================================
+# agent.py injects its LLM wrapper into the tools as `tool.llm`. Until it is
+# imported, tools hold a proxy that loads the agent (and the ADK) on first use
+# instead of at API startup.
+
+_AGENT_LLM = LazyResource("agent", lambda: importlib.import_module(".agent", __package__).llm_interface)
+
+
+class _LazyAgentLLM:
+    def __getattr__(self, name):
+        return getattr(_AGENT_LLM.get(), name)
+
+
+for _tool in (rag_query, ats_ai_feedback, summarize_resume, optimize_resume, latex_resume_preview):
+    _tool.llm = _LazyAgentLLM()
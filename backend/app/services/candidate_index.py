@@ -0,0 +1,366 @@
+import os
+import hmac
+import json
+import math
+import hashlib
+import threading
+from typing import Optional
+
+import numpy as np
+
+from . import DATA_DIR
+from .vector_store import load_faiss
+
+# =========================================================
+# CANDIDATE POOL INDEX
+# =========================================================
+# One pooled vector per resume (the normalized mean of its chunk embeddings)
+# in a single FAISS inner-product index, for "which stored resumes best match
+# this job description". Small pools use an exact flat index; past
+# ``flat_max`` resumes the index is rebuilt as HNSW (or IVF when configured),
+# so query time grows sublinearly with the pool. Rebuilds run on a background
+# thread, outside the lock; until one lands, searches keep using the previous
+# index (or an exact flat one) with the newest rows appended to it.
+#
+# Rows are append-only: re-storing a resume appends a new row and retires the
+# old one, so no index type ever needs in-place updates. Retired rows are
+# skipped at query time and dropped when the pool is compacted.
+#
+# On disk (``store_dir``):
+#   candidates.f32    float32 rows, appended
+#   candidates.jsonl  one {"id", "row", "metadata"} or {"id", "removed"} line per change
+
+_VECTORS_FILE = "candidates.f32"
+_LOG_FILE = "candidates.jsonl"
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype="float32")
+    vectors = vectors.reshape(-1, vectors.shape[-1])
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def pool_embeddings(chunk_embeddings: np.ndarray) -> np.ndarray:
+    """One unit vector summarizing all chunks of a document."""
+    return _unit(np.asarray(chunk_embeddings, dtype="float32").mean(axis=0, keepdims=True))[0]
+
+
+def candidate_id(resume_id: str, key: bytes) -> str:
+    """The ID a resume is listed under in search results.
+
+    A keyed hash, so results can be told apart without revealing the resume_id,
+    which is what grants access to a resume (/chat).
+    """
+    return hmac.new(key, resume_id.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def _matches_filters(metadata: dict, filters: dict) -> bool:
+    # Scalars must be equal (strings case-insensitively); list-valued metadata
+    # (e.g. skills) must contain every requested value.
+    for key, wanted in filters.items():
+        value = metadata.get(key)
+        if value is None:
+            return False
+        wanted = wanted if isinstance(wanted, list) else [wanted]
+        have = value if isinstance(value, list) else [value]
+        have = {str(v).lower() for v in have}
+        if not all(str(w).lower() in have for w in wanted):
+            return False
+    return True
+
+
+class CandidateIndex:
+    def __init__(self, dim: int, store_dir: Optional[str] = None, kind: str = "auto", flat_max: int = 20000,
+                 hnsw_m: int = 32, ef_search: int = 64, nprobe: int = 16):
+        self.dim = dim
+        self.store_dir = store_dir
+        self.kind = kind
+        self.flat_max = flat_max
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+
+        self._lock = threading.Lock()
+        self._vectors = np.empty((64, dim), dtype="float32")
+        self._ids = []          # row -> resume_id, None once retired
+        self._rows = {}         # resume_id -> live row
+        self._metadata = {}     # resume_id -> metadata
+        self._index = None
+        self._index_kind = None
+        self._indexed = 0
+        self._trained_on = 0
+        self._generation = 0    # bumped when compaction renumbers rows
+        self._rebuild_thread = None
+        self.rebuilds = 0
+
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+            self._replay()
+
+    # ---------- rows ----------
+
+    def _append_row(self, vector: np.ndarray) -> int:
+        row = len(self._ids)
+        if row >= len(self._vectors):
+            grown = np.empty((len(self._vectors) * 2, self.dim), dtype="float32")
+            grown[:row] = self._vectors[:row]
+            self._vectors = grown
+        self._vectors[row] = vector
+        self._ids.append(None)
+        return row
+
+    def _retire(self, resume_id: str):
+        row = self._rows.pop(resume_id, None)
+        if row is not None:
+            self._ids[row] = None
+
+    def __contains__(self, resume_id: str) -> bool:
+        return resume_id in self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def upsert(self, resume_id: str, vector: np.ndarray, metadata: Optional[dict] = None):
+        vector = _unit(np.asarray(vector, dtype="float32").reshape(1, self.dim))[0]
+        with self._lock:
+            self._retire(resume_id)
+            row = self._append_row(vector)
+            self._ids[row] = resume_id
+            self._rows[resume_id] = row
+            self._metadata[resume_id] = dict(metadata or {})
+            self._log({"id": resume_id, "row": row, "metadata": self._metadata[resume_id]}, vector)
+            self._maybe_compact()
+            self._schedule_rebuild()
+
+    def remove(self, resume_id: str):
+        with self._lock:
+            if resume_id not in self._rows:
+                return
+            self._retire(resume_id)
+            self._metadata.pop(resume_id, None)
+            self._log({"id": resume_id, "removed": True})
+
+    def metadata(self, resume_id: str) -> Optional[dict]:
+        return self._metadata.get(resume_id)
+
+    # ---------- FAISS index ----------
+
+    def _wanted_kind(self) -> str:
+        # Both thresholds count live rows: retired ones are never returned.
+        if self.kind == "ivf":
+            # IVF needs enough rows to train its centroids; stay exact until then.
+            return "ivf" if len(self._rows) >= 64 else "flat"
+        if self.kind != "auto":
+            return self.kind
+        return "flat" if len(self._rows) <= self.flat_max else "hnsw"
+
+    def _new_index(self, kind: str, vectors: np.ndarray):
+        faiss = load_faiss()
+        if kind == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = self.ef_search
+        elif kind == "ivf":
+            nlist = max(1, int(4 * math.sqrt(len(vectors))))
+            index = faiss.IndexIVFFlat(faiss.IndexFlatIP(self.dim), self.dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.nprobe = self.nprobe
+        else:
+            index = faiss.IndexFlatIP(self.dim)
+        if len(vectors):
+            index.add(vectors)
+        return index
+
+    def _install(self, index, kind: str, indexed: int):
+        self._index, self._index_kind, self._indexed = index, kind, indexed
+        self.rebuilds += 1
+
+    def _stale_kind(self) -> Optional[str]:
+        # The index kind to rebuild as, or None while the current one fits.
+        # IVF centroids are trained on the rows present at build time, so
+        # retrain once the live pool has doubled.
+        kind = self._wanted_kind()
+        if self._index is None or kind != self._index_kind or (kind == "ivf" and len(self._rows) > 2 * self._trained_on):
+            return kind
+        return None
+
+    def _schedule_rebuild(self):
+        # Caller holds self._lock. HNSW and IVF builds take seconds on a large
+        # pool, so they never run under the lock.
+        kind = self._stale_kind()
+        if kind is None or kind == "flat" or self._rebuild_thread is not None:
+            return
+        n = len(self._ids)
+        # Rows below n are never modified in place (compaction copies into a
+        # new array), so the build can read them without the lock.
+        self._rebuild_thread = threading.Thread(
+            target=self._rebuild, args=(kind, self._vectors[:n], len(self._rows), self._generation),
+            name="candidate-index-rebuild", daemon=True
+        )
+        self._rebuild_thread.start()
+
+    def _rebuild(self, kind: str, vectors: np.ndarray, live: int, generation: int):
+        index = None
+        try:
+            index = self._new_index(kind, vectors)
+        finally:
+            with self._lock:
+                self._rebuild_thread = None
+                # Dropped if a compaction renumbered the rows meanwhile; the
+                # next search or insert schedules a fresh build.
+                if index is not None and generation == self._generation:
+                    n = len(self._ids)
+                    if n > len(vectors):
+                        index.add(self._vectors[len(vectors):n])
+                    self._install(index, kind, n)
+                    self._trained_on = live
+
+    def _ensure_index(self):
+        # Caller holds self._lock.
+        self._schedule_rebuild()
+        n = len(self._ids)
+        if self._index is None or (self._stale_kind() == "flat" and self._index_kind != "flat"):
+            # An exact index is just a copy of the rows: cheap enough to build
+            # inline, and it serves searches until a background build lands.
+            self._install(self._new_index("flat", self._vectors[:n]), "flat", n)
+        elif self._indexed < n:
+            self._index.add(self._vectors[self._indexed:n])
+            self._indexed = n
+
+    def wait_for_rebuild(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until no background rebuild is running; False on timeout."""
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def search(self, query: np.ndarray, top_k: int = 10, filters: Optional[dict] = None) -> list:
+        """Returns up to ``top_k`` (resume_id, cosine score, metadata), best first."""
+        query = _unit(np.asarray(query, dtype="float32").reshape(1, self.dim))
+        with self._lock:
+            if not self._rows or top_k <= 0:
+                return []
+            self._ensure_index()
+            total = self._index.ntotal
+            # Over-fetch to make up for retired rows and filtered-out candidates,
+            # widening the search only when that was not enough.
+            fetch = min(total, top_k * (4 if filters else 1) + (total - len(self._rows)))
+            while True:
+                scores, rows = self._index.search(query, max(fetch, 1))
+                results = []
+                for score, row in zip(scores[0], rows[0]):
+                    resume_id = self._ids[row] if row >= 0 else None
+                    if resume_id is None:
+                        continue
+                    if filters and not _matches_filters(self._metadata[resume_id], filters):
+                        continue
+                    results.append((resume_id, float(score), self._metadata[resume_id]))
+                    if len(results) == top_k:
+                        return results
+                if fetch >= total:
+                    return results
+                fetch = min(total, fetch * 4)
+
+    # ---------- persistence ----------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.store_dir, name)
+
+    def _log(self, record: dict, vector: Optional[np.ndarray] = None):
+        if not self.store_dir:
+            return
+        if vector is not None:
+            with open(self._path(_VECTORS_FILE), "ab") as f:
+                f.write(vector.astype("<f4").tobytes())
+        with open(self._path(_LOG_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _replay(self):
+        if not os.path.exists(self._path(_LOG_FILE)):
+            return
+        data = b""
+        if os.path.exists(self._path(_VECTORS_FILE)):
+            with open(self._path(_VECTORS_FILE), "rb") as f:
+                data = f.read()
+        # A crash mid-append can leave a partial row at the end of the file.
+        row_bytes = self.dim * 4
+        vectors = np.frombuffer(data[:len(data) - len(data) % row_bytes], dtype="<f4").reshape(-1, self.dim)
+        torn = False
+        with open(self._path(_LOG_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    torn = True
+                    break
+                resume_id = record["id"]
+                if record.get("removed"):
+                    self._retire(resume_id)
+                    self._metadata.pop(resume_id, None)
+                    continue
+                if record["row"] >= len(vectors):
+                    torn = True
+                    break
+                self._retire(resume_id)
+                row = self._append_row(vectors[record["row"]])
+                self._ids[row] = resume_id
+                self._rows[resume_id] = row
+                self._metadata[resume_id] = record.get("metadata") or {}
+        # New rows are appended by position, so a torn tail has to go before
+        # anything else is written after it.
+        if torn or len(data) != len(self._ids) * row_bytes:
+            self._rewrite_files()
+
+    def _rewrite_files(self):
+        n = len(self._ids)
+        self._vectors[:n].astype("<f4").tofile(self._path(_VECTORS_FILE) + ".tmp")
+        with open(self._path(_LOG_FILE) + ".tmp", "w", encoding="utf-8") as f:
+            for resume_id, row in sorted(self._rows.items(), key=lambda item: item[1]):
+                f.write(json.dumps({"id": resume_id, "row": row, "metadata": self._metadata[resume_id]}) + "\n")
+        os.replace(self._path(_VECTORS_FILE) + ".tmp", self._path(_VECTORS_FILE))
+        os.replace(self._path(_LOG_FILE) + ".tmp", self._path(_LOG_FILE))
+
+    def _maybe_compact(self):
+        retired = len(self._ids) - len(self._rows)
+        if retired < 1024 or retired < len(self._rows):
+            return
+        live = sorted(self._rows.items(), key=lambda item: item[1])
+        vectors = np.empty((max(64, len(live) * 2), self.dim), dtype="float32")
+        for new_row, (resume_id, row) in enumerate(live):
+            vectors[new_row] = self._vectors[row]
+        self._vectors = vectors
+        self._ids = [resume_id for resume_id, _ in live]
+        self._rows = {resume_id: row for row, resume_id in enumerate(self._ids)}
+        self._index = None
+        self._generation += 1
+
+        if self.store_dir:
+            self._rewrite_files()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "candidates": len(self._rows),
+                "rows": len(self._ids),
+                "index_kind": self._index_kind,
+                "rebuilding": self._rebuild_thread is not None,
+                "rebuilds": self.rebuilds
+            }
+
+
+_DEFAULT_STORE_DIR = os.path.join(DATA_DIR, "candidates")
+
+
+def candidate_index_from_env(dim: int) -> CandidateIndex:
+    # CANDIDATE_STORE_DIR="" keeps the pool in memory only.
+    return CandidateIndex(
+        dim,
+        store_dir=os.getenv("CANDIDATE_STORE_DIR", _DEFAULT_STORE_DIR) or None,
+        kind=os.getenv("CANDIDATE_INDEX_KIND", "auto"),
+        flat_max=int(os.getenv("CANDIDATE_FLAT_MAX", "20000")),
+        hnsw_m=int(os.getenv("CANDIDATE_HNSW_M", "32")),
+        ef_search=int(os.getenv("CANDIDATE_HNSW_EF_SEARCH", "64")),
+        nprobe=int(os.getenv("CANDIDATE_IVF_NPROBE", "16"))
+    )
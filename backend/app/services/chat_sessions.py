@@ -0,0 +1,190 @@
+import os
+import re
+import time
+import asyncio
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from .chunker import estimate_tokens
+
+# =========================================================
+# MULTI-TURN CHAT SESSIONS
+# =========================================================
+# A session pins a conversation to one resume and keeps three bounded pieces
+# of state between /chat turns:
+#
+# - the last ``max_turns`` question/answer pairs, verbatim;
+# - a compact extractive summary of older turns (no extra LLM call), capped at
+#   ``summary_tokens``;
+# - a working set of resume chunks already retrieved, capped at
+#   ``context_tokens`` (by default the stateless /chat budget, so a session
+#   turn never sends more context than a one-off question). New chunks are
+#   appended, so the context block, which leads the prompt, stays a stable
+#   prefix across turns (and benefits from provider-side prefix caching). A
+#   follow-up whose embedding is close to the question that last triggered a
+#   search skips the vector search entirely.
+
+
+def _first_sentence(text: str, max_words: int = 30) -> str:
+    sentence = re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+    words = sentence.split()
+    return " ".join(words[:max_words]) + (" ..." if len(words) > max_words else "")
+
+
+class ChatSession:
+    def __init__(self, session_id: str, resume_id: str, max_turns: int = 4, summary_tokens: int = 256,
+                 context_tokens: int = 512, reuse_similarity: float = 0.85):
+        self.session_id = session_id
+        self.resume_id = resume_id
+        self.max_turns = max_turns
+        self.summary_tokens = summary_tokens
+        self.context_tokens = context_tokens
+        self.reuse_similarity = reuse_similarity
+
+        self.turns = []                 # recent (question, answer)
+        self.summary = []               # one line per older turn
+        self.context = OrderedDict()    # chunk_id -> (text, tokens), in first-use order
+        self.last_query = None          # unit embedding of the question that last triggered a search
+        self.turn_count = 0
+        self.last_access = time.monotonic()
+        self.lock = asyncio.Lock()      # one turn at a time, so history stays ordered
+
+    # ---------- retrieval ----------
+
+    def retrieval_query(self, question: str) -> str:
+        # Follow-ups ("and before that?") rarely stand alone; the previous
+        # question gives the embedding something to resolve them against.
+        return f"{self.turns[-1][0]} {question}" if self.turns else question
+
+    def can_reuse(self, query_embedding: np.ndarray) -> bool:
+        query = np.asarray(query_embedding, dtype="float32").ravel()
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        reuse = bool(self.context) and self.last_query is not None \
+            and float(query @ self.last_query) >= self.reuse_similarity
+        if not reuse:
+            self.last_query = query
+        return reuse
+
+    def add_context(self, chunk_ids: list, texts: list, tokens: list, budget: Optional[int] = None) -> list:
+        """Adds newly retrieved chunks; returns the IDs that were not already present.
+
+        The working set is then trimmed to ``budget`` (at most ``context_tokens``).
+        """
+        added = []
+        for chunk_id, text, count in zip(chunk_ids, texts, tokens):
+            if chunk_id not in self.context:
+                self.context[chunk_id] = (text, count)
+                added.append(chunk_id)
+        # Evict the oldest chunks first, never the ones this turn needs.
+        limit = min(budget or self.context_tokens, self.context_tokens)
+        while self.context_size > limit:
+            stale = next((c for c in self.context if c not in chunk_ids), None)
+            if stale is None:
+                break
+            del self.context[stale]
+        return added
+
+    @property
+    def context_size(self) -> int:
+        return sum(count for _, count in self.context.values())
+
+    def context_text(self) -> str:
+        return "\n\n".join(text for text, _ in self.context.values())
+
+    # ---------- history ----------
+
+    def history_text(self) -> str:
+        parts = []
+        if self.summary:
+            parts.append("Earlier in this conversation:\n" + "\n".join(self.summary))
+        if self.turns:
+            parts.append("\n".join(f"Q: {q}\nA: {a}" for q, a in self.turns))
+        return "\n\n".join(parts)
+
+    def record(self, question: str, answer: str):
+        self.turns.append((question, answer.strip()))
+        self.turn_count += 1
+        while len(self.turns) > self.max_turns:
+            q, a = self.turns.pop(0)
+            self.summary.append(f"- Asked: {_first_sentence(q)} Answer: {_first_sentence(a)}")
+        while self.summary and estimate_tokens("\n".join(self.summary)) > self.summary_tokens:
+            self.summary.pop(0)
+
+    def describe(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "resume_id": self.resume_id,
+            "turns": self.turn_count,
+            "recent_turns": [{"query": q, "answer": a} for q, a in self.turns],
+            "summary": self.summary,
+            "context_chunk_ids": list(self.context),
+            "context_tokens": self.context_size,
+            "history_tokens": estimate_tokens(self.history_text())
+        }
+
+
+class SessionStore:
+    """LRU store of chat sessions with idle-TTL expiry."""
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 3600, **session_options):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.session_options = session_options
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evictions = 0
+
+    def create(self, resume_id: str) -> ChatSession:
+        session = ChatSession(secrets.token_hex(16), resume_id, **self.session_options)
+        with self._lock:
+            self._expire()
+            self._sessions[session.session_id] = session
+            self.created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+        return session
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_access = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def remove(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self):
+        if not self.ttl_seconds:
+            return
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_access >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"sessions": len(self._sessions), "created": self.created, "evictions": self.evictions}
+
+
+def session_store_from_env() -> SessionStore:
+    return SessionStore(
+        max_sessions=int(os.getenv("CHAT_MAX_SESSIONS", "1000")),
+        ttl_seconds=float(os.getenv("CHAT_SESSION_TTL_SECONDS", "3600")),
+        max_turns=int(os.getenv("CHAT_MAX_TURNS", "4")),
+        summary_tokens=int(os.getenv("CHAT_SUMMARY_TOKENS", "256")),
+        context_tokens=int(os.getenv("CHAT_CONTEXT_TOKENS", os.getenv("RAG_CONTEXT_TOKENS", "512"))),
+        reuse_similarity=float(os.getenv("CHAT_REUSE_SIMILARITY", "0.85"))
+    )
@@ -0,0 +1,166 @@
+import re
+import math
+from typing import List, NamedTuple
+
+# =========================================================
+# SECTION-AWARE RESUME CHUNKING
+# =========================================================
+# Resumes are split at section headings (Experience, Education, Skills, ...)
+# and then at bullet/paragraph boundaries, and the pieces are packed into
+# chunks that fit a token budget below the embedding model's maximum sequence
+# length (all-MiniLM-L6-v2 truncates at 256 word pieces, silently dropping the
+# rest of a longer chunk). Each chunk's text is prefixed with its section name
+# so both the embedding and the chat prompt keep that context.
+
+# Bump whenever chunk boundaries or chunk text change: stored indexes are
+# kept per version, so older ones are rebuilt rather than served.
+CHUNKER_VERSION = 2
+MODEL_MAX_TOKENS = 256
+_SPECIAL_TOKENS = 2  # [CLS] and [SEP]
+
+_SECTION_ALIASES = {
+    "summary": "Summary", "professional summary": "Summary", "profile": "Summary",
+    "objective": "Summary", "career objective": "Summary", "about me": "Summary",
+    "experience": "Experience", "work experience": "Experience", "professional experience": "Experience",
+    "employment": "Experience", "employment history": "Experience", "work history": "Experience",
+    "internships": "Experience", "internship": "Experience",
+    "education": "Education", "academic background": "Education", "academics": "Education",
+    "skills": "Skills", "technical skills": "Skills", "core competencies": "Skills", "key skills": "Skills",
+    "projects": "Projects", "personal projects": "Projects", "academic projects": "Projects",
+    "certifications": "Certifications", "certificates": "Certifications", "licenses": "Certifications",
+    "achievements": "Achievements", "awards": "Achievements", "honors": "Achievements",
+    "publications": "Publications", "research": "Publications",
+    "languages": "Languages", "interests": "Interests", "hobbies": "Interests",
+    "volunteer": "Volunteering", "volunteering": "Volunteering", "extracurricular activities": "Volunteering",
+    "contact": "Contact", "contact information": "Contact", "personal details": "Contact",
+}
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*•◦▪·●■➢►]|\d{1,2}[.)])\s+")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_INLINE_HEADING_RE = re.compile(r"^\s*([A-Za-z][A-Za-z ]{2,30}):\s+(\S.*)$")
+
+
+class Chunk(NamedTuple):
+    text: str       # section-prefixed text, as embedded and shown to the LLM
+    section: str
+    start: int      # character offset of the chunk body in the source text
+    tokens: int     # estimated word-piece count of ``text``
+
+
+def _cost(text: str) -> float:
+    # Word-piece tokenizers split rarer words further; ~1.3 pieces per word
+    # and one per punctuation mark is a close, dependency-free estimate.
+    return sum(1.3 if w[0].isalnum() else 1 for w in _TOKEN_RE.findall(text))
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(_cost(text))
+
+
+def _heading(line: str):
+    stripped = line.strip().strip(":").strip()
+    if not stripped or len(stripped) > 40:
+        return None
+    key = re.sub(r"[^a-z ]+", "", stripped.lower()).strip()
+    key = re.sub(r"\s+", " ", key)
+    if key in _SECTION_ALIASES:
+        return _SECTION_ALIASES[key]
+    # Short ALL-CAPS lines are headings in most resume templates.
+    words = stripped.split()
+    if len(words) <= 4 and stripped.isupper() and any(c.isalpha() for c in stripped) and not _BULLET_RE.match(line):
+        return stripped.title()
+    return None
+
+
+def _sections(text: str) -> list:
+    """Splits text into (section, [(unit, start), ...]), units being bullets or paragraphs."""
+    sections, section, units = [], "General", []
+    current, current_start, previous_blank = None, 0, True
+    offset = 0
+
+    def close_unit():
+        nonlocal current
+        if current is not None and current.strip():
+            units.append((current.strip(), current_start))
+        current = None
+
+    for line in text.splitlines(keepends=True):
+        line_start, offset = offset, offset + len(line)
+        if not line.strip():
+            close_unit()
+            previous_blank = True
+            continue
+
+        heading, rest = _heading(line), None
+        inline = _INLINE_HEADING_RE.match(line) if heading is None else None
+        if inline and _heading(inline.group(1)) in _SECTION_ALIASES.values():
+            # "Skills: Python, Go" opens a section and starts its first unit.
+            heading, rest = _heading(inline.group(1)), inline.group(2)
+        if heading is not None:
+            close_unit()
+            if units:
+                sections.append((section, units))
+            section, units = heading, []
+            previous_blank = rest is None
+            if rest is None:
+                continue
+            current, current_start = rest.strip(), line_start + inline.start(2)
+            continue
+
+        if current is None or previous_blank or _BULLET_RE.match(line):
+            close_unit()
+            current, current_start = _BULLET_RE.sub("", line).strip(), line_start
+        else:
+            current += " " + line.strip()
+        previous_blank = False
+
+    close_unit()
+    if units:
+        sections.append((section, units))
+    return sections
+
+
+def _split_long(unit: str, budget: int) -> List[str]:
+    # A single bullet or paragraph over budget is cut into word windows.
+    pieces, piece, used = [], [], 0
+    for word in unit.split():
+        cost = _cost(word)
+        if piece and used + cost > budget:
+            pieces.append(" ".join(piece))
+            piece, used = [], 0
+        piece.append(word)
+        used += cost
+    if piece:
+        pieces.append(" ".join(piece))
+    return pieces
+
+
+def chunk_resume(text: str, max_tokens: int = 128) -> List[Chunk]:
+    """Section-aware chunks of at most ``max_tokens`` (capped by the model's limit)."""
+    max_tokens = min(max_tokens, MODEL_MAX_TOKENS - _SPECIAL_TOKENS)
+    chunks = []
+
+    for section, units in _sections(text):
+        prefix = f"{section}: "
+        budget = max(8, max_tokens - _cost(prefix))
+        groups, body, used = [], [], 0
+
+        # Greedily pack whole bullets/paragraphs; never split one unless it
+        # alone exceeds the budget.
+        for unit, start in units:
+            pieces = [unit] if _cost(unit) <= budget else _split_long(unit, budget)
+            for piece in pieces:
+                cost = _cost(piece)
+                if body and used + cost > budget:
+                    groups.append(body)
+                    body, used = [], 0
+                body.append((piece, start))
+                used += cost
+        if body:
+            groups.append(body)
+
+        for group in groups:
+            chunk_text = prefix + "\n".join(piece for piece, _ in group)
+            chunks.append(Chunk(chunk_text, section, group[0][1], estimate_tokens(chunk_text)))
+
+    return chunks
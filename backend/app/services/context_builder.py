@@ -0,0 +1,83 @@
+import re
+from typing import Optional
+
+from .chunker import estimate_tokens
+
+# =========================================================
+# TOKEN-BUDGETED RAG CONTEXT
+# =========================================================
+# Turns raw vector-search hits into the smallest useful prompt context:
+# invalid and duplicate hits are dropped, the rest are optionally reranked by
+# a cheap score (vector similarity plus lexical overlap with the question),
+# near-duplicates of already chosen chunks are skipped, and chunks are added
+# best-first until the token budget is spent. The chosen chunks are emitted in
+# document order so the context reads coherently.
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD_RE.findall(text.lower()) if len(w) > 2}
+
+
+def _overlap(a: set, b: set) -> float:
+    # Share of the smaller chunk that also appears in the other: catches both
+    # near-copies and one chunk contained in another.
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def build_context(hits: list, texts, question: str, token_budget: int = 512, max_chunks: Optional[int] = None,
+                  rerank: bool = True, lexical_weight: float = 0.3, overlap_threshold: float = 0.8) -> dict:
+    """Selects chunks for a prompt.
+
+    ``hits`` are (chunk_id, squared L2 distance) pairs from the index, best
+    first, over unit-normalized embeddings; ``texts`` maps chunk_id to text.
+    """
+    dropped = {"invalid": 0, "duplicate": 0, "over_budget": 0}
+    question_terms = _terms(question)
+
+    candidates, seen = [], set()
+    for rank, (chunk_id, distance) in enumerate(hits):
+        chunk_id = int(chunk_id)
+        if chunk_id < 0 or chunk_id >= len(texts):
+            dropped["invalid"] += 1
+            continue
+        if chunk_id in seen:
+            dropped["duplicate"] += 1
+            continue
+        seen.add(chunk_id)
+        text = texts[chunk_id]
+        terms = _terms(text)
+        # For unit vectors, squared L2 distance d maps to cosine 1 - d/2.
+        score = 1 - float(distance) / 2
+        if rerank and question_terms:
+            score += lexical_weight * len(question_terms & terms) / len(question_terms)
+        candidates.append((score, rank, chunk_id, text, terms))
+
+    if rerank:
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+
+    chosen, used = [], 0
+    for score, _, chunk_id, text, terms in candidates:
+        if max_chunks is not None and len(chosen) >= max_chunks:
+            break
+        if any(_overlap(terms, other[3]) >= overlap_threshold for other in chosen):
+            dropped["duplicate"] += 1
+            continue
+        tokens = estimate_tokens(text)
+        if used + tokens > token_budget:
+            dropped["over_budget"] += 1
+            continue
+        chosen.append((chunk_id, text, tokens, terms))
+        used += tokens
+
+    chosen.sort(key=lambda c: c[0])
+    return {
+        "context": "\n\n".join(text for _, text, _, _ in chosen),
+        "chunk_ids": [chunk_id for chunk_id, _, _, _ in chosen],
+        "chunk_tokens": [tokens for _, _, tokens, _ in chosen],
+        "tokens": used,
+        "dropped": dropped
+    }
@@ -0,0 +1,327 @@
+import io
+import os
+import re
+import zlib
+import hashlib
+import importlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .latex import LatexCompiler
+
+# =========================================================
+# ON-DEMAND RESUME DOCUMENTS
+# =========================================================
+# Optimized resumes are registered as text under the SHA-256 of that text;
+# nothing is rendered or written when the text is produced. A DOCX or PDF is
+# built into an in-memory buffer only when it is downloaded, and the bytes
+# are kept in an LRU bounded by total size, so repeat downloads of the same
+# content are served from memory. PDFs are typeset with LuaLaTeX when it and
+# its fonts are installed, and written directly otherwise (see below).
+
+FORMATS = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def document_id(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# ---------- DOCX ----------
+
+def render_docx(text: str) -> bytes:
+    doc = importlib.import_module("docx").Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+# ---------- PDF (built-in) ----------
+
+# A dependency-free fallback: Helvetica (WinAnsi), wrapped and paginated. It
+# only covers Latin-1 text; other characters come out as "?", which is why
+# LuaLaTeX is preferred when it is available.
+
+# Helvetica advance widths (1/1000 em) for ASCII 32-126, from the standard AFM.
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_PAGE_WIDTH, _PAGE_HEIGHT, _MARGIN = 612, 792, 54
+_FONT_SIZE, _LEADING = 10.5, 14
+
+
+def _text_width(text: str) -> float:
+    return sum(_HELVETICA_WIDTHS[ord(c) - 32] if 32 <= ord(c) <= 126 else 556 for c in text) * _FONT_SIZE / 1000
+
+
+def _wrap(line: str, width: float) -> list:
+    words, lines, current = line.split(), [], ""
+    for word in words:
+        candidate = f"{current} {word}" if current else word
+        if current and _text_width(candidate) > width:
+            lines.append(current)
+            candidate = word
+        current = candidate
+    lines.append(current)  # "" keeps blank lines
+    return lines
+
+
+def _pdf_string(text: str) -> bytes:
+    data = text.encode("cp1252", "replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def render_basic_pdf(text: str) -> bytes:
+    width = _PAGE_WIDTH - 2 * _MARGIN
+    per_page = int((_PAGE_HEIGHT - 2 * _MARGIN) // _LEADING)
+    lines = [wrapped for line in text.splitlines() for wrapped in _wrap(line, width)] or [""]
+    pages = [lines[i:i + per_page] for i in range(0, len(lines), per_page)]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a (page, content) pair per page.
+    objects = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for page_lines in pages:
+        ops = [b"BT /F1 %g Tf %g TL %d %d Td" % (_FONT_SIZE, _LEADING, _MARGIN, _PAGE_HEIGHT - _MARGIN - _FONT_SIZE)]
+        ops += [_pdf_string(line) + b" '" if i else _pdf_string(line) + b" Tj" for i, line in enumerate(page_lines)]
+        ops.append(b"ET")
+        stream = zlib.compress(b"\n".join(ops))
+        page_number, content_number = len(objects) + 1, len(objects) + 2
+        kids.append(b"%d 0 R" % page_number)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+                       b"/Contents %d 0 R >>" % (_PAGE_WIDTH, _PAGE_HEIGHT, content_number))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % len(pages)
+
+    out, offsets = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# ---------- PDF (LuaLaTeX) ----------
+
+# PDFs are typeset by LuaLaTeX through a LatexCompiler (bounded pool, time and
+# memory limits; see latex.py). fontspec embeds an OpenType font, and scripts
+# it does not cover (Devanagari, CJK, ...) fall back to ``fallback_fonts``,
+# all shaped with HarfBuzz, so any resume comes out as real, searchable text.
+# Every line of the resume is escaped and set as its own paragraph. A missing
+# compiler or main font is reported as "unavailable", and the store then uses
+# the built-in writer above.
+
+_LATEX_SPECIALS = {
+    "\\": r"\textbackslash{}", "{": r"\{", "}": r"\}", "$": r"\$", "&": r"\&", "#": r"\#",
+    "%": r"\%", "_": r"\_", "^": r"\textasciicircum{}", "~": r"\textasciitilde{}",
+}
+_LATEX_SPECIALS_RE = re.compile("|".join(re.escape(c) for c in _LATEX_SPECIALS))
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+_FONT_NAME_RE = re.compile(r"^[\w .-]+$")
+_MISSING_FONT_RE = re.compile(r'fontspec Error: The font "[^"]*" cannot')  # "... be found."
+
+
+def escape_latex(text: str) -> str:
+    text = _CONTROL_RE.sub("", text.replace("\t", " "))
+    return _LATEX_SPECIALS_RE.sub(lambda m: _LATEX_SPECIALS[m.group()], text)
+
+
+class DocumentRenderError(RuntimeError):
+    def __init__(self, status: str, message: str):
+        super().__init__(message)
+        self.status = status   # "unavailable" (no TeX or fonts), "timeout" or "failed"
+
+
+class PdfRenderer:
+    def __init__(self, compiler: LatexCompiler, font: str = "Noto Sans",
+                 fallback_fonts=("Noto Sans Devanagari", "Noto Sans CJK SC")):
+        for name in (font, *fallback_fonts):
+            if not _FONT_NAME_RE.match(name):
+                raise ValueError(f"Invalid font name: {name!r}")
+        self.compiler = compiler
+        self.font = font
+        self.fallback_fonts = list(fallback_fonts)
+        self.fonts_missing = False   # set once a compile reports the font is not installed
+
+    def source(self, text: str) -> str:
+        """The LaTeX document for ``text``."""
+        body = []
+        for line in text.splitlines():
+            line = escape_latex(line).strip()
+            body.append(line + r"\par" if line else r"\medskip")
+        if not any(line != r"\medskip" for line in body):
+            body.append(r"\mbox{}")  # an empty page still yields a PDF
+
+        features = "Renderer=HarfBuzz"
+        preamble = []
+        if self.fallback_fonts:
+            fonts = ", ".join(f'"{name}:mode=harf;"' for name in self.fallback_fonts)
+            preamble.append(r'\directlua{luaotfload.add_fallback("resumefallback", {' + fonts + "})}")
+            features += ", RawFeature={fallback=resumefallback}"
+        return "\n".join([
+            r"\documentclass[11pt]{article}",
+            r"\usepackage[margin=0.75in]{geometry}",
+            r"\usepackage{fontspec}",
+            *preamble,
+            r"\setmainfont{" + self.font + "}[" + features + "]",
+            r"\setlength{\parindent}{0pt}",
+            r"\setlength{\emergencystretch}{3em}",
+            r"\pagestyle{empty}",
+            r"\begin{document}",
+            *body,
+            r"\end{document}",
+            ""
+        ])
+
+    @property
+    def available(self) -> bool:
+        return self.compiler.available and not self.fonts_missing
+
+    def render(self, text: str) -> bytes:
+        if self.fonts_missing:
+            raise DocumentRenderError("unavailable", f"Font {self.font!r} is not installed on the server.")
+        result = self.compiler.compile(self.source(text))
+        if result["status"] == "failed" and _MISSING_FONT_RE.search(result["log"]):
+            self.fonts_missing = True
+            raise DocumentRenderError("unavailable", result["log"])
+        if result["status"] != "ok":
+            raise DocumentRenderError(result["status"], result["log"])
+        return result["pdf"]
+
+    def stats(self) -> dict:
+        return dict(self.compiler.stats(), fonts_missing=self.fonts_missing)
+
+    def shutdown(self):
+        self.compiler.shutdown()
+
+
+# ---------- store ----------
+
+class DocumentStore:
+    def __init__(self, max_documents: int = 1024, max_rendered_bytes: int = 64 * 1024 * 1024,
+                 pdf_renderer: Optional[PdfRenderer] = None):
+        self.max_documents = max_documents
+        self.max_rendered_bytes = max_rendered_bytes
+        self.pdf_renderer = pdf_renderer
+        self._lock = threading.Lock()
+        self._texts = OrderedDict()      # id -> (text, role)
+        self._rendered = OrderedDict()   # (id, format) -> bytes
+        self._rendered_bytes = 0
+        self.renders = 0
+        self.hits = 0
+        self.pdf_fallbacks = 0
+
+    def register(self, text: str, role: str = "") -> str:
+        """Remembers ``text`` for later download; returns its document ID. No rendering happens here."""
+        doc_id = document_id(text)
+        with self._lock:
+            self._texts[doc_id] = (text, role)
+            self._texts.move_to_end(doc_id)
+            while len(self._texts) > self.max_documents:
+                evicted, _ = self._texts.popitem(last=False)
+                for fmt in FORMATS:
+                    self._drop((evicted, fmt))
+        return doc_id
+
+    def _drop(self, key):
+        data = self._rendered.pop(key, None)
+        if data is not None:
+            self._rendered_bytes -= len(data)
+
+    def get(self, doc_id: str) -> Optional[tuple]:
+        """(text, role) for a registered document, or None."""
+        if not _ID_RE.match(doc_id):
+            return None
+        with self._lock:
+            return self._texts.get(doc_id)
+
+    def _render(self, text: str, fmt: str) -> bytes:
+        if fmt == "docx":
+            return render_docx(text)
+        if self.pdf_renderer is not None:
+            try:
+                return self.pdf_renderer.render(text)
+            except DocumentRenderError as e:
+                if e.status != "unavailable":
+                    raise
+        # No LuaLaTeX or fonts on this server: still serve a (Latin-only) PDF.
+        with self._lock:
+            self.pdf_fallbacks += 1
+        return render_basic_pdf(text)
+
+    def render(self, doc_id: str, fmt: str) -> Optional[bytes]:
+        """The document as ``fmt`` bytes, built on first request; None if unknown.
+
+        Raises DocumentRenderError when the format cannot be produced.
+        """
+        entry = self.get(doc_id)
+        if entry is None or fmt not in FORMATS:
+            return None
+        key = (doc_id, fmt)
+        with self._lock:
+            data = self._rendered.get(key)
+            if data is not None:
+                self._rendered.move_to_end(key)
+                self.hits += 1
+                return data
+
+        data = self._render(entry[0], fmt)
+        with self._lock:
+            self.renders += 1
+            if key not in self._rendered and len(data) <= self.max_rendered_bytes:
+                self._rendered[key] = data
+                self._rendered_bytes += len(data)
+                while self._rendered_bytes > self.max_rendered_bytes:
+                    self._drop(next(iter(self._rendered)))
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self._texts),
+                "rendered": len(self._rendered),
+                "rendered_bytes": self._rendered_bytes,
+                "renders": self.renders,
+                "hits": self.hits,
+                "pdf_fallbacks": self.pdf_fallbacks,
+                "pdf": self.pdf_renderer.stats() if self.pdf_renderer else None
+            }
+
+    def shutdown(self):
+        if self.pdf_renderer is not None:
+            self.pdf_renderer.shutdown()
+
+
+def document_store_from_env() -> DocumentStore:
+    # Rendered PDFs are cached by the store itself, so the compiler keeps none.
+    compiler = LatexCompiler(
+        command=os.getenv("DOCUMENT_PDF_COMMAND", "lualatex").split(),
+        workers=int(os.getenv("DOCUMENT_PDF_WORKERS", "2")),
+        timeout_seconds=float(os.getenv("DOCUMENT_PDF_TIMEOUT_SECONDS", "60")),
+        memory_mb=int(os.getenv("DOCUMENT_PDF_MEMORY_MB", "2048")),
+        cache_entries=0
+    )
+    fallback = os.getenv("DOCUMENT_PDF_FALLBACK_FONTS", "Noto Sans Devanagari,Noto Sans CJK SC")
+    return DocumentStore(
+        max_documents=int(os.getenv("DOCUMENT_MAX_DOCUMENTS", "1024")),
+        max_rendered_bytes=int(float(os.getenv("DOCUMENT_CACHE_MAX_MB", "64")) * 1024 * 1024),
+        pdf_renderer=PdfRenderer(
+            compiler,
+            font=os.getenv("DOCUMENT_PDF_FONT", "Noto Sans"),
+            fallback_fonts=[name.strip() for name in fallback.split(",") if name.strip()]
+        )
+    )
@@ -0,0 +1,208 @@
+import os
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from . import DATA_DIR
+
+# =========================================================
+# CHUNK EMBEDDING CACHE
+# =========================================================
+
+class EmbeddingCache:
+    """Two-tier cache of chunk embeddings keyed by (model name, chunk text).
+
+    The in-memory tier is an LRU of ``max_entries`` vectors. When ``db_path`` is
+    set, vectors are also written to a SQLite file and memory misses fall back
+    to it, so the cache survives restarts.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = 4096, db_path: Optional[str] = None):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._db.commit()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str):
+        key = self.key(text)
+        with self._lock:
+            vec = self._memory.get(key)
+            if vec is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vec
+
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vec = np.frombuffer(row[0], dtype="float32")
+                    self._remember(key, vec)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return vec
+
+            self.misses += 1
+            return None
+
+    def put_many(self, texts: list, vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype="float32")
+        with self._lock:
+            rows = []
+            for text, vec in zip(texts, vectors):
+                key = self.key(text)
+                self._remember(key, vec.copy())
+                rows.append((key, vec.tobytes()))
+            if self._db is not None and rows:
+                self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
+
+    def _remember(self, key: str, vec: np.ndarray):
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+def encode_cached(model, texts: list, cache: Optional[EmbeddingCache]) -> np.ndarray:
+    """Encode ``texts``, running the model only on chunks the cache has not seen."""
+    if cache is None:
+        return model.encode(texts).astype("float32")
+
+    vectors = [cache.get(t) for t in texts]
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+
+    if missing:
+        fresh = model.encode(missing).astype("float32")
+        cache.put_many(missing, fresh)
+        by_text = dict(zip(missing, fresh))
+        vectors = [v if v is not None else by_text[t] for t, v in zip(texts, vectors)]
+
+    return np.vstack(vectors).astype("float32") if vectors else np.empty((0, 0), dtype="float32")
+
+
+# =========================================================
+# CROSS-REQUEST MICRO-BATCHING
+# =========================================================
+
+class EmbeddingBatcher:
+    """Coalesces encode calls from concurrent handlers into one model batch.
+
+    Requests queue up for at most ``max_wait_ms`` (or until ``max_batch_size``
+    texts are pending), then run as a single ``encode_fn`` call on a dedicated
+    worker thread so the event loop is never blocked by the model.
+    """
+
+    def __init__(self, encode_fn, max_batch_size: int = 64, max_wait_ms: float = 5):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self._loop = None
+        self._pending = []
+        self._pending_texts = 0
+        self._timer = None
+        self.batches = 0
+        self.batched_texts = 0
+
+    async def encode(self, texts: list) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A new event loop (e.g. a fresh TestClient) starts with a clean queue.
+            self._loop = loop
+            self._pending, self._pending_texts, self._timer = [], 0, None
+
+        future = loop.create_future()
+        self._pending.append((list(texts), future))
+        self._pending_texts += len(texts)
+
+        if self._pending_texts >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending, self._pending_texts = self._pending, [], 0
+        texts = [t for item, _ in batch for t in item]
+        self.batches += 1
+        self.batched_texts += len(texts)
+
+        work = self._loop.run_in_executor(self._executor, self.encode_fn, texts)
+        work.add_done_callback(lambda done: self._resolve(batch, done))
+
+    @staticmethod
+    def _resolve(batch, done):
+        error = asyncio.CancelledError() if done.cancelled() else done.exception()
+        vectors = None if error else done.result()
+        start = 0
+        for texts, future in batch:
+            end = start + len(texts)
+            if not future.done():
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(vectors[start:end])
+            start = end
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "batched_texts": self.batched_texts,
+            "avg_batch_size": round(self.batched_texts / self.batches, 2) if self.batches else 0.0
+        }
+
+
+def batcher_from_env(encode_fn) -> EmbeddingBatcher:
+    return EmbeddingBatcher(
+        encode_fn,
+        max_batch_size=int(os.getenv("EMBED_BATCH_MAX_SIZE", "64")),
+        max_wait_ms=float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+    )
+
+
+def cache_from_env(model_name: str) -> EmbeddingCache:
+    # EMBED_CACHE_PATH="" disables the on-disk tier.
+    return EmbeddingCache(
+        model_name,
+        max_entries=int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "4096")),
+        db_path=os.getenv("EMBED_CACHE_PATH", os.path.join(DATA_DIR, "embedding_cache.sqlite")) or None
+    )
@@ -0,0 +1,276 @@
+import io
+import os
+import time
+import signal
+import asyncio
+import hashlib
+import importlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# =========================================================
+# PROCESS-POOL DOCUMENT EXTRACTION
+# =========================================================
+# PDF and DOCX parsing runs in a pool of worker processes, off the event loop
+# and away from the API process's memory. Each document gets a time limit
+# (a SIGALRM inside the worker, plus a backstop in the parent that recycles
+# the pool if a worker is stuck in C code) and each worker an address-space
+# limit, so one pathological file fails on its own instead of taking a worker
+# or the API down with it. Large PDFs are split into page ranges that are
+# extracted in parallel. Results are cached by content hash, and concurrent
+# requests for the same file share one extraction.
+
+_PARSED_EXTS = (".pdf", ".doc", ".docx")
+
+
+class ExtractionTimeout(TimeoutError):
+    pass
+
+
+# ---------- parsing (runs in workers, and inline for extract_document) ----------
+
+def _pdf_pages(source, start: int = 0, end: Optional[int] = None):
+    """Text of pages [start, end) and the document's page count."""
+    pdfplumber = importlib.import_module("pdfplumber")
+    texts = []
+    with pdfplumber.open(source) as pdf:
+        total = len(pdf.pages)
+        for page in pdf.pages[start:end]:
+            text = page.extract_text()
+            if text:
+                texts.append(text)
+            page.close()  # drops the page's cached layout objects
+    return texts, total
+
+
+def extract_document(source, ext: str) -> str:
+    """Extracts text from a path or binary file object in the calling process."""
+    if ext == ".pdf":
+        return "\n".join(_pdf_pages(source)[0])
+
+    if ext in [".doc", ".docx"]:
+        doc = importlib.import_module("docx").Document(source)
+        return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as f:
+            return f.read()
+    return source.read().decode("utf-8")
+
+
+def _init_worker(memory_mb: int):
+    if resource is not None and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _time_limited(seconds: float, fn, *args):
+    if not seconds or not hasattr(signal, "setitimer"):
+        return fn(*args)
+
+    def expired(signum, frame):
+        raise ExtractionTimeout(f"Extraction timed out after {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _pdf_task(data: bytes, start: int, end: Optional[int], seconds: float):
+    return _time_limited(seconds, _pdf_pages, io.BytesIO(data), start, end)
+
+
+def _document_task(data: bytes, ext: str, seconds: float):
+    return _time_limited(seconds, extract_document, io.BytesIO(data), ext)
+
+
+# ---------- service (API process) ----------
+
+class ExtractionService:
+    def __init__(self, workers: int = 2, timeout_seconds: float = 30, memory_mb: int = 1024,
+                 pages_per_task: int = 8, parallel_min_pages: int = 16, cache_entries: int = 256):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.memory_mb = memory_mb
+        self.pages_per_task = pages_per_task
+        self.parallel_min_pages = parallel_min_pages
+        self.cache_entries = cache_entries
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._cache = OrderedDict()   # "<sha256><ext>" -> (text, pages)
+        self._inflight = {}           # same key -> asyncio.Task
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    # ---------- pool ----------
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned (not forked) workers start small, so the memory
+                # limit applies to parsing rather than to a copy of the API.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker, initargs=(self.memory_mb,)
+                )
+            return self._pool
+
+    def _recycle(self, pool: ProcessPoolExecutor):
+        # A worker that ignored its alarm (stuck in native code) would hold
+        # its slot forever; kill the pool's processes and start a fresh one.
+        # Only the pool the failed call ran on: if another call already
+        # replaced it, the current pool is healthy and shared by other requests.
+        with self._pool_lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- cache ----------
+
+    def _cache_get(self, key: str):
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+        return value
+
+    def _cache_set(self, key: str, value):
+        if not self.cache_entries:
+            return
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    # ---------- extraction ----------
+
+    async def _run(self, data: bytes, ext: str):
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        deadline = time.monotonic() + self.timeout_seconds
+
+        async def call(fn, *args):
+            remaining = max(deadline - time.monotonic(), 0.001)
+            future = loop.run_in_executor(pool, fn, *args, remaining)
+            try:
+                # The worker's own alarm fires first; this only catches a
+                # worker that could not be interrupted.
+                return await asyncio.wait_for(future, remaining + 5)
+            except ExtractionTimeout:
+                raise  # raised by the worker itself; the pool is fine
+            except asyncio.TimeoutError:
+                self._recycle(pool)
+                raise ExtractionTimeout(f"Extraction timed out after {self.timeout_seconds:g}s")
+            except BrokenProcessPool:
+                # A worker died (e.g. killed by the OS); the pool cannot be reused.
+                self._recycle(pool)
+                raise
+
+        if ext != ".pdf":
+            return await call(_document_task, data, ext), None
+
+        # The first range also reports the page count; the rest of a long PDF
+        # is fanned out across the pool.
+        step = self.pages_per_task if self.workers > 1 else None
+        first_end = step
+        texts, total = await call(_pdf_task, data, 0, first_end)
+        if first_end is not None and total > first_end:
+            if total < self.parallel_min_pages:
+                rest = [await call(_pdf_task, data, first_end, None)]
+            else:
+                rest = await asyncio.gather(*(
+                    call(_pdf_task, data, start, start + step) for start in range(first_end, total, step)
+                ))
+            for more, _ in rest:
+                texts.extend(more)
+        return "\n".join(texts), total
+
+    async def extract(self, data: bytes, filename: str, sha256: Optional[str] = None) -> dict:
+        """Extracts text from an uploaded document's bytes.
+
+        Returns {"status", "report", "pages", "cached"} or an error dict.
+        ``sha256`` (of ``data``) saves rehashing when the caller already has it.
+        """
+        ext = os.path.splitext(filename.lower())[1]
+        if ext not in _PARSED_EXTS:
+            try:
+                return {"status": "success", "report": data.decode("utf-8"), "pages": None, "cached": False}
+            except UnicodeDecodeError as e:
+                return {"status": "error", "error_message": str(e)}
+
+        key = (sha256 or hashlib.sha256(data).hexdigest()) + ext
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.hits += 1
+            return {"status": "success", "report": cached[0], "pages": cached[1], "cached": True}
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._run(data, ext))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        try:
+            # Shielded so one caller disconnecting does not cancel the
+            # extraction the others are waiting on.
+            text, pages = await asyncio.shield(task)
+        except ExtractionTimeout as e:
+            self.timeouts += 1
+            return {"status": "error", "error_message": str(e)}
+        except MemoryError:
+            self.failures += 1
+            return {"status": "error", "error_message": f"Extraction exceeded the {self.memory_mb} MB memory limit"}
+        except Exception as e:
+            self.failures += 1
+            return {"status": "error", "error_message": str(e) or type(e).__name__}
+
+        self._cache_set(key, (text, pages))
+        return {"status": "success", "report": text, "pages": pages, "cached": False}
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "cache_entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "timeouts": self.timeouts,
+            "failures": self.failures
+        }
+
+
+def extraction_service_from_env() -> ExtractionService:
+    return ExtractionService(
+        workers=int(os.getenv("EXTRACT_WORKERS", "2")),
+        timeout_seconds=float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "30")),
+        memory_mb=int(os.getenv("EXTRACT_MEMORY_MB", "1024")),
+        pages_per_task=int(os.getenv("EXTRACT_PAGES_PER_TASK", "8")),
+        parallel_min_pages=int(os.getenv("EXTRACT_PARALLEL_MIN_PAGES", "16")),
+        cache_entries=int(os.getenv("EXTRACT_CACHE_ENTRIES", "256"))
+    )
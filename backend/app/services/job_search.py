@@ -0,0 +1,288 @@
+import os
+import time
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import urlencode
+
+# =========================================================
+# POOLED HEADLESS-BROWSER JOB SEARCH
+# =========================================================
+# Chrome sessions are kept warm in a small pool instead of being started per
+# request. A session is health-checked when it is checked out and replaced
+# after ``max_uses`` searches or on any WebDriver error. Pages load with the
+# "eager" strategy and the scraper waits for the result cards to appear
+# instead of sleeping a fixed time. The rendered HTML is then parsed in one
+# pass here instead of with one WebDriver round-trip per field.
+#
+# Results are cached per normalized (role, location) for ``cache_ttl``
+# seconds, and identical searches already in flight share one browser run.
+# An empty result is often a page that did not render or a login wall rather
+# than a real "no jobs", so it is only kept for the much shorter ``empty_ttl``.
+
+_CARD_SELECTOR = "ul.jobs-search__results-list li"
+
+
+class _JobCardParser(HTMLParser):
+    """Collects title (h3), company (h4) and first link of each result card."""
+
+    def __init__(self):
+        super().__init__()
+        self.jobs = []
+        self._list_depth = 0      # >0 while inside the results <ul>
+        self._card = None
+        self._card_depth = 0
+        self._field = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "ul":
+            if self._list_depth or "jobs-search__results-list" in (attrs.get("class") or "").split():
+                self._list_depth += 1
+            return
+        if not self._list_depth:
+            return
+        if tag == "li" and self._card is None:
+            self._card, self._card_depth = {"title": "", "company": "", "link": ""}, 0
+        if self._card is None:
+            return
+        if tag == "li":
+            self._card_depth += 1
+        elif tag in ("h3", "h4"):
+            self._field = "title" if tag == "h3" else "company"
+        elif tag == "a" and not self._card["link"]:
+            self._card["link"] = attrs.get("href") or ""
+
+    def handle_endtag(self, tag):
+        if tag == "ul" and self._list_depth:
+            self._list_depth -= 1
+        elif tag in ("h3", "h4"):
+            self._field = None
+        elif tag == "li" and self._card is not None:
+            self._card_depth -= 1
+            if self._card_depth == 0:
+                card = {k: " ".join(v.split()) for k, v in self._card.items()}
+                if card["title"]:
+                    self.jobs.append(card)
+                self._card = None
+
+    def handle_data(self, data):
+        if self._card is not None and self._field:
+            self._card[self._field] += data
+
+
+def parse_job_cards(html: str, limit: int = 10) -> list:
+    parser = _JobCardParser()
+    parser.feed(html)
+    parser.close()
+    return parser.jobs[:limit]
+
+
+def _chrome_factory():
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.page_load_strategy = "eager"
+    return webdriver.Chrome(options=options)
+
+
+class BrowserPool:
+    """A bounded pool of reusable WebDriver sessions."""
+
+    def __init__(self, factory=_chrome_factory, size: int = 2, max_uses: int = 50):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = queue.LifoQueue()  # most recently used first: its caches are warm
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._uses = {}
+        self._closed = False
+        self.started = 0
+        self.discarded = 0
+
+    def _healthy(self, driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self.discarded += 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, timeout: Optional[float] = None):
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser session became available")
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    driver = self.factory()
+                    with self._lock:
+                        self._uses[id(driver)] = 0
+                        self.started += 1
+                    return driver
+                if self._healthy(driver):
+                    return driver
+                self._quit(driver)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, driver, broken: bool = False):
+        with self._lock:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+        if broken or self._closed or uses >= self.max_uses:
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+        self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        return {"size": self.size, "idle": self._idle.qsize(), "started": self.started, "discarded": self.discarded}
+
+
+class JobSearcher:
+    def __init__(self, pool: BrowserPool, base_url: str = "https://www.linkedin.com/jobs/search/",
+                 wait_seconds: float = 10, cache_ttl: float = 900, cache_entries: int = 512, max_results: int = 10,
+                 empty_ttl: float = 60):
+        self.pool = pool
+        self.base_url = base_url
+        self.wait_seconds = wait_seconds
+        self.cache_ttl = cache_ttl
+        self.empty_ttl = empty_ttl
+        self.cache_entries = cache_entries
+        self.max_results = max_results
+
+        self._executor = ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="job-search")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()   # (role, location) -> (expires_at, jobs)
+        self._inflight = {}           # same key -> Future
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(role: str, location: str) -> tuple:
+        return " ".join(role.lower().split()), " ".join(location.lower().split())
+
+    def _scrape(self, role: str, location: str) -> list:
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = self.pool.acquire(timeout=self.wait_seconds * 3)
+        broken = False
+        try:
+            driver.get(f"{self.base_url}?{urlencode({'keywords': role, 'location': location})}")
+            # Done as soon as cards render, or once the page has fully loaded
+            # without any (no results).
+            try:
+                WebDriverWait(driver, self.wait_seconds, poll_frequency=0.1).until(
+                    lambda d: d.find_elements(By.CSS_SELECTOR, _CARD_SELECTOR)
+                    or d.execute_script("return document.readyState") == "complete"
+                )
+            except TimeoutException:
+                pass
+            return parse_job_cards(driver.page_source, self.max_results)
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.pool.release(driver, broken=broken)
+
+    def _run(self, key: tuple, role: str, location: str) -> list:
+        jobs = self._scrape(role, location)
+        ttl = self.cache_ttl if jobs else self.empty_ttl
+        if ttl <= 0:
+            return jobs
+        with self._lock:
+            self._cache[key] = (time.monotonic() + ttl, jobs)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return jobs
+
+    def submit(self, role: str, location: str) -> Future:
+        """Searches jobs; the future resolves to {"jobs", "cached"}."""
+        key = self._key(role, location)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                done = Future()
+                done.set_result({"jobs": entry[1], "cached": True})
+                return done
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                return inflight
+            self.misses += 1
+            job = self._executor.submit(self._run, key, role, location)
+            future = Future()
+            self._inflight[key] = future
+
+        def finish(job):
+            with self._lock:
+                self._inflight.pop(key, None)
+            error = job.exception()
+            if error is not None:
+                with self._lock:
+                    self.errors += 1
+                future.set_exception(error)
+            else:
+                future.set_result({"jobs": job.result(), "cached": False})
+
+        job.add_done_callback(finish)
+        return future
+
+    def search(self, role: str, location: str) -> dict:
+        return self.submit(role, location).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {"cache_entries": len(self._cache), "in_flight": len(self._inflight),
+                        "hits": self.hits, "misses": self.misses, "errors": self.errors}
+        return dict(counters, browsers=self.pool.stats())
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.pool.close()
+
+
+def job_searcher_from_env() -> JobSearcher:
+    return JobSearcher(
+        BrowserPool(
+            size=int(os.getenv("JOB_SEARCH_BROWSERS", "2")),
+            max_uses=int(os.getenv("JOB_SEARCH_BROWSER_MAX_USES", "50"))
+        ),
+        base_url=os.getenv("JOB_SEARCH_URL", "https://www.linkedin.com/jobs/search/"),
+        wait_seconds=float(os.getenv("JOB_SEARCH_WAIT_SECONDS", "10")),
+        cache_ttl=float(os.getenv("JOB_SEARCH_CACHE_TTL_SECONDS", "900")),
+        cache_entries=int(os.getenv("JOB_SEARCH_CACHE_ENTRIES", "512")),
+        max_results=int(os.getenv("JOB_SEARCH_MAX_RESULTS", "10")),
+        empty_ttl=float(os.getenv("JOB_SEARCH_EMPTY_TTL_SECONDS", "60"))
+    )
@@ -0,0 +1,238 @@
+import os
+import re
+import json
+import time
+import asyncio
+import importlib
+import weakref
+import threading
+from typing import Optional
+from urllib.parse import quote, urlsplit
+
+# =========================================================
+# JOB SOURCES AND FAN-OUT
+# =========================================================
+# /jobs queries every configured source concurrently. Each source has its own
+# deadline; a source that misses it (or fails) is reported in ``sources`` and
+# the others' results are returned without it, so latency is bounded by the
+# deadline rather than by the slowest source. Listings are deduplicated
+# across sources by normalized link and by normalized title + company, the
+# first source listed winning.
+#
+# A source is any object with a ``name``, a ``deadline`` in seconds and an
+# ``async search(role, location, limit)`` returning
+# [{"title", "company", "link", ...}], plus an optional ``async aclose()``.
+
+_FIELD_ALIASES = {
+    "title": ("title", "position", "job_title", "name"),
+    "company": ("company", "company_name", "employer", "organization"),
+    "link": ("link", "url", "apply_url", "job_url"),
+    "location": ("location", "city", "place"),
+}
+
+
+def _listing(item: dict, source: str) -> Optional[dict]:
+    listing = {"source": source}
+    for field, aliases in _FIELD_ALIASES.items():
+        value = next((item[k] for k in aliases if item.get(k)), "")
+        if isinstance(value, dict):  # e.g. {"company": {"name": "Acme"}}
+            value = value.get("name") or value.get("display_name") or ""
+        listing[field] = " ".join(str(value).split())
+    return listing if listing["title"] else None
+
+
+def _norm(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _norm_link(link: str) -> str:
+    # Tracking parameters and fragments differ per source; the path identifies the posting.
+    parts = urlsplit(link.strip())
+    if not parts.netloc:
+        return ""
+    return f"{parts.netloc.lower().removeprefix('www.')}{parts.path.rstrip('/')}"
+
+
+def dedupe_listings(listings: list) -> list:
+    seen, unique = set(), []
+    for listing in listings:
+        keys = {("link", _norm_link(listing.get("link", "")))} - {("link", "")}
+        title, company = _norm(listing.get("title", "")), _norm(listing.get("company", ""))
+        if title:
+            keys.add(("job", title, company))
+        if keys & seen:
+            continue
+        seen |= keys
+        unique.append(listing)
+    return unique
+
+
+def _matches(listing: dict, role: str, location: str) -> bool:
+    # Every word of the role must appear in the title; listings without a
+    # location, and remote ones, match any location.
+    title = set(_norm(listing["title"]).split())
+    if not set(_norm(role).split()) <= title:
+        return False
+    where = _norm(listing.get("location", ""))
+    wanted = _norm(location)
+    return not where or not wanted or wanted in where or where in wanted or "remote" in where
+
+
+# ---------- adapters ----------
+
+# Time a cold browser needs on top of the scraper's own wait for results:
+# starting Chrome and loading the page before the wait begins.
+_BROWSER_HEADROOM_SECONDS = 5
+
+
+class BrowserJobSource:
+    """LinkedIn, scraped through the pooled headless browsers (job_search.py).
+
+    The default deadline is the scraper's ``wait_seconds`` plus headroom, so a
+    cache-miss scrape with default settings can finish in time.
+    """
+
+    def __init__(self, searcher, name: str = "linkedin", deadline: Optional[float] = None):
+        self.searcher = searcher
+        self.name = name
+        self.deadline = deadline if deadline is not None else searcher.wait_seconds + _BROWSER_HEADROOM_SECONDS
+
+    async def search(self, role: str, location: str, limit: int) -> list:
+        # Shielded: a missed deadline must not cancel the shared (coalesced)
+        # future; the scrape finishes in the background and warms the cache.
+        scrape = asyncio.wrap_future(self.searcher.submit(role, location))
+        scrape.add_done_callback(lambda f: f.cancelled() or f.exception())  # retrieved even if abandoned
+        result = await asyncio.shield(scrape)
+        return [dict(job, source=self.name) for job in result["jobs"][:limit]]
+
+
+class FeedJobSource:
+    """A JSON job feed over HTTP.
+
+    ``url`` may contain ``{role}`` and ``{location}`` placeholders. The body is a
+    list of jobs or an object with a "jobs" or "results" list; common field
+    names (title/position, company/employer, link/url, ...) are recognized.
+    """
+
+    def __init__(self, url: str, name: str = "feed", deadline: float = 8, headers: Optional[dict] = None):
+        self.url = url
+        self.name = name
+        self.deadline = deadline
+        self.headers = headers or {}
+        self._clients = weakref.WeakKeyDictionary()   # event loop -> AsyncClient
+        self._lock = threading.Lock()
+
+    def _http(self):
+        # One pooled async client per event loop: its connections belong to
+        # the loop that opened them, and agent tool calls run the fan-out on a
+        # loop of their own (see available_tools.search_jobs). Being async, a
+        # request that misses the deadline is cancelled rather than left
+        # running in a thread.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                httpx = importlib.import_module("httpx")
+                client = httpx.AsyncClient(timeout=self.deadline, headers=self.headers, follow_redirects=True)
+                self._clients[loop] = client
+            return client
+
+    async def search(self, role: str, location: str, limit: int) -> list:
+        url = self.url.format(role=quote(role), location=quote(location))
+        response = await self._http().get(url)
+        response.raise_for_status()
+        body = response.json()
+        items = body if isinstance(body, list) else body.get("jobs") or body.get("results") or []
+        listings = [_listing(item, self.name) for item in items if isinstance(item, dict)]
+        return [listing for listing in listings if listing][:limit]
+
+    async def aclose(self):
+        """Closes the client of the running event loop."""
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+class FileJobSource:
+    """Jobs from a local JSON (list or {"jobs": [...]}) or JSONL file, reloaded when it changes."""
+
+    def __init__(self, path: str, name: str = "file", deadline: float = 2):
+        self.path = path
+        self.name = name
+        self.deadline = deadline
+        self._mtime = None
+        self._listings = []
+        self._lock = threading.Lock()
+
+    def _load(self) -> list:
+        mtime = os.path.getmtime(self.path)
+        with self._lock:
+            if mtime != self._mtime:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    if self.path.endswith(".jsonl"):
+                        items = [json.loads(line) for line in f if line.strip()]
+                    else:
+                        body = json.load(f)
+                        items = body if isinstance(body, list) else body.get("jobs", [])
+                listings = [_listing(item, self.name) for item in items if isinstance(item, dict)]
+                self._listings, self._mtime = [listing for listing in listings if listing], mtime
+            return self._listings
+
+    async def search(self, role: str, location: str, limit: int) -> list:
+        listings = await asyncio.to_thread(self._load)
+        return [listing for listing in listings if _matches(listing, role, location)][:limit]
+
+
+# ---------- fan-out ----------
+
+class JobAggregator:
+    def __init__(self, sources: list, max_results: int = 25):
+        self.sources = sources
+        self.max_results = max_results
+
+    async def _query(self, source, role: str, location: str) -> dict:
+        start = time.perf_counter()
+        try:
+            jobs = await asyncio.wait_for(source.search(role, location, self.max_results), source.deadline)
+            status = {"status": "ok", "count": len(jobs)}
+        except asyncio.TimeoutError:
+            jobs, status = [], {"status": "timeout", "count": 0}
+        except Exception as e:
+            jobs, status = [], {"status": "error", "count": 0, "error": str(e) or type(e).__name__}
+        status["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return {"jobs": jobs, "status": status}
+
+    async def search(self, role: str, location: str) -> dict:
+        results = await asyncio.gather(*(self._query(source, role, location) for source in self.sources))
+        listings = dedupe_listings([job for result in results for job in result["jobs"]])
+        return {
+            "jobs": listings[:self.max_results],
+            "sources": {source.name: result["status"] for source, result in zip(self.sources, results)},
+            "partial": any(result["status"]["status"] != "ok" for result in results)
+        }
+
+    async def aclose(self):
+        for source in self.sources:
+            if hasattr(source, "aclose"):
+                await source.aclose()
+
+
+def _deadline(name: str, default: float) -> float:
+    return float(os.getenv(f"JOB_SOURCE_DEADLINE_{name.upper()}", os.getenv("JOB_SOURCE_DEADLINE_SECONDS", default)))
+
+
+def job_aggregator_from_env(searcher) -> JobAggregator:
+    # JOB_SOURCES orders the sources (earlier ones win duplicates); "feed" and
+    # "file" are skipped unless JOB_FEED_URL / JOB_FILE_PATH are set.
+    sources = []
+    for name in (n.strip() for n in os.getenv("JOB_SOURCES", "linkedin,feed,file").split(",")):
+        if name == "linkedin":
+            sources.append(BrowserJobSource(
+                searcher, deadline=_deadline("linkedin", searcher.wait_seconds + _BROWSER_HEADROOM_SECONDS)
+            ))
+        elif name == "feed" and os.getenv("JOB_FEED_URL"):
+            sources.append(FeedJobSource(os.getenv("JOB_FEED_URL"), deadline=_deadline("feed", 8)))
+        elif name == "file" and os.getenv("JOB_FILE_PATH"):
+            sources.append(FileJobSource(os.getenv("JOB_FILE_PATH"), deadline=_deadline("file", 2)))
+    return JobAggregator(sources, max_results=int(os.getenv("JOB_SEARCH_MAX_TOTAL", "25")))
@@ -0,0 +1,86 @@
+import re
+from typing import Dict, Iterable, List, Optional, Union
+
+# =========================================================
+# COMPILED MULTI-KEYWORD MATCHER
+# =========================================================
+# All keywords (and their synonyms) are compiled once into a single regex built
+# from a character trie, so one left-to-right pass over the text finds every
+# match. Cost grows with the text length and the trie depth, not with the
+# number of keywords. Matches respect word boundaries ("java" does not match
+# inside "javascript", "git" not inside "github"), and a space inside a
+# keyword also matches hyphens and runs of whitespace ("machine-learning").
+
+_WORD = r"[\w+#]"
+_SEPARATOR = r"[\s\-]+"
+
+
+def normalize_keyword(text: str) -> str:
+    return re.sub(r"[\s\-]+", " ", text.strip().lower())
+
+
+def _trie_pattern(node: dict) -> str:
+    # "" marks the end of a keyword; longer continuations are tried first
+    # (greedy), so "github actions" wins over "github" where both match.
+    end = "" in node
+    branches = []
+    for ch in sorted(k for k in node if k):
+        atom = _SEPARATOR if ch == " " else re.escape(ch)
+        branches.append(atom + _trie_pattern(node[ch]))
+
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if end:
+        return "(?:" + body + ")?"
+    return body
+
+
+class KeywordMatcher:
+    """Finds canonical keywords, via any of their surface forms, in one scan.
+
+    ``keywords`` is either a list of keywords or a mapping of canonical
+    keyword -> list of synonyms.
+    """
+
+    def __init__(self, keywords: Union[Iterable[str], Dict[str, Iterable[str]]]):
+        if not isinstance(keywords, dict):
+            keywords = {k: () for k in keywords}
+
+        self.keywords = [normalize_keyword(k) for k in keywords]
+        self._canonical = {}
+        for canonical, synonyms in keywords.items():
+            for form in (canonical, *synonyms):
+                self._canonical.setdefault(normalize_keyword(form), normalize_keyword(canonical))
+
+        trie = {}
+        for form in self._canonical:
+            node = trie
+            for ch in form:
+                node = node.setdefault(ch, {})
+            node[""] = True
+
+        self._regex = re.compile(f"(?<!{_WORD})(?:{_trie_pattern(trie)})(?!{_WORD})", re.IGNORECASE) if trie else None
+
+    def find(self, text: str) -> List[tuple]:
+        """Returns (canonical keyword, start, end) for every match, in order."""
+        if self._regex is None:
+            return []
+        return [
+            (self._canonical[normalize_keyword(m.group(0))], m.start(), m.end())
+            for m in self._regex.finditer(text)
+            if m.end() > m.start()
+        ]
+
+    def matches(self, text: str) -> Dict[str, List[int]]:
+        """Returns canonical keyword -> start positions, for keywords found in ``text``."""
+        found = {}
+        for keyword, start, _ in self.find(text):
+            found.setdefault(keyword, []).append(start)
+        return found
+
+    def coverage(self, text: str, matches: Optional[Dict[str, List[int]]] = None) -> float:
+        if not self.keywords:
+            return 0.0
+        matches = self.matches(text) if matches is None else matches
+        return len(matches) / len(self.keywords)
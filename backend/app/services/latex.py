@@ -0,0 +1,249 @@
+import os
+import re
+import signal
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from . import DATA_DIR
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# =========================================================
+# BOUNDED LaTeX COMPILATION
+# =========================================================
+# pdflatex runs on a fixed pool of ``workers`` slots, each job in its own
+# process group with a wall-clock timeout and CPU, memory and output-size
+# limits, so a burst of previews queues up instead of forking without bound,
+# and a runaway document is killed. Results are keyed by the SHA-256 of the
+# LaTeX source: the PDF is served by that ID, identical sources compile once,
+# and concurrent requests for the same source wait on the same job.
+#
+# PDFs are kept in an in-memory LRU and, when ``store_dir`` is set, on disk as
+# ``<id>.pdf`` so IDs stay fetchable after eviction or a restart.
+
+_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+_LOG_TAIL_CHARS = 2000
+
+
+def latex_id(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _log_tail(log: str) -> str:
+    # pdflatex reports the first error as a "! ..." line; start there if present.
+    start = log.find("\n!")
+    log = log[start + 1:] if start >= 0 else log
+    return log[-_LOG_TAIL_CHARS:].strip()
+
+
+class LatexCompiler:
+    def __init__(self, command=("pdflatex",), workers: int = 2, timeout_seconds: float = 20,
+                 memory_mb: int = 512, max_output_mb: int = 20, cache_entries: int = 128,
+                 store_dir: Optional[str] = None):
+        self.command = list(command)
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.memory_mb = memory_mb
+        self.max_output_mb = max_output_mb
+        self.cache_entries = cache_entries
+        self.store_dir = store_dir
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="latex")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()   # id -> result dict (PDF bytes or failure)
+        self._inflight = {}           # id -> Future
+        self.compiles = 0
+        self.hits = 0
+        self.failures = 0
+        self.timeouts = 0
+
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+
+    @property
+    def available(self) -> bool:
+        return shutil.which(self.command[0]) is not None
+
+    # ---------- compilation (pool threads) ----------
+
+    def _limit_child(self, pid: int):
+        # Applied from the parent right after spawning: preexec_fn is not safe
+        # in a threaded process (the forked child can deadlock on a lock held
+        # by another thread), and compiles run on pool threads.
+        if resource is None or not hasattr(resource, "prlimit"):
+            return
+        cpu = int(self.timeout_seconds) + 1
+        resource.prlimit(pid, resource.RLIMIT_CPU, (cpu, cpu))
+        if self.memory_mb:
+            memory = self.memory_mb * 1024 * 1024
+            resource.prlimit(pid, resource.RLIMIT_AS, (memory, memory))
+        if self.max_output_mb:
+            size = self.max_output_mb * 1024 * 1024
+            resource.prlimit(pid, resource.RLIMIT_FSIZE, (size, size))
+
+    def _compile(self, source: str) -> dict:
+        with tempfile.TemporaryDirectory(prefix="latex-") as tmp:
+            with open(os.path.join(tmp, "resume.tex"), "w", encoding="utf-8") as f:
+                f.write(source)
+            # openout_any=p stops \openout from writing outside the job directory.
+            env = dict(os.environ, openout_any="p", openin_any="p")
+            process = subprocess.Popen(
+                self.command + ["-interaction=nonstopmode", "-halt-on-error", "-no-shell-escape", "resume.tex"],
+                cwd=tmp, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                start_new_session=True
+            )
+            try:
+                self._limit_child(process.pid)
+            except ProcessLookupError:
+                pass  # already exited
+            try:
+                output, _ = process.communicate(timeout=self.timeout_seconds)
+            except subprocess.TimeoutExpired:
+                # Kill the whole group: TeX can spawn helpers (mktexpk, ...).
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except (AttributeError, ProcessLookupError):
+                    process.kill()
+                process.communicate()
+                return {"status": "timeout", "pdf": None,
+                        "log": f"Compilation exceeded {self.timeout_seconds:g}s and was stopped."}
+
+            pdf_path = os.path.join(tmp, "resume.pdf")
+            if process.returncode == 0 and os.path.exists(pdf_path):
+                with open(pdf_path, "rb") as f:
+                    return {"status": "ok", "pdf": f.read(), "log": ""}
+            return {"status": "failed", "pdf": None, "log": _log_tail(output.decode("utf-8", "replace"))}
+
+    def _run(self, pdf_id: str, source: str) -> dict:
+        result = self._compile(source)
+        with self._lock:
+            self.compiles += 1
+            if result["status"] == "timeout":
+                self.timeouts += 1
+            elif result["status"] == "failed":
+                self.failures += 1
+            # Timeouts may be load-dependent, so only deterministic outcomes are cached.
+            if result["status"] != "timeout":
+                self._remember(pdf_id, result)
+        if result["pdf"] is not None and self.store_dir:
+            tmp_path = self._path(pdf_id) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(result["pdf"])
+            os.replace(tmp_path, self._path(pdf_id))
+        return result
+
+    # ---------- cache ----------
+
+    def _path(self, pdf_id: str) -> str:
+        return os.path.join(self.store_dir, f"{pdf_id}.pdf")
+
+    def _remember(self, pdf_id: str, result: dict):
+        if not self.cache_entries:
+            return
+        self._cache[pdf_id] = result
+        self._cache.move_to_end(pdf_id)
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    def _cached(self, pdf_id: str) -> Optional[dict]:
+        # Caller holds self._lock.
+        result = self._cache.get(pdf_id)
+        if result is not None:
+            self._cache.move_to_end(pdf_id)
+            return result
+        if self.store_dir and os.path.exists(self._path(pdf_id)):
+            with open(self._path(pdf_id), "rb") as f:
+                result = {"status": "ok", "pdf": f.read(), "log": ""}
+            self._remember(pdf_id, result)
+        return result
+
+    # ---------- public ----------
+
+    def submit(self, source: str) -> Future:
+        """Compiles ``source``; the future resolves to {"id", "status", "pdf", "log", "cached"}."""
+        pdf_id = latex_id(source)
+        with self._lock:
+            cached = self._cached(pdf_id)
+            if cached is not None:
+                self.hits += 1
+                done = Future()
+                done.set_result(dict(cached, id=pdf_id, cached=True))
+                return done
+            inflight = self._inflight.get(pdf_id)
+            if inflight is not None:
+                return inflight
+
+            if not self.available:
+                done = Future()
+                done.set_result({"id": pdf_id, "status": "unavailable", "pdf": None, "cached": False,
+                                 "log": f"{self.command[0]} is not installed on the server."})
+                return done
+
+            job = self._pool.submit(self._run, pdf_id, source)
+            future = Future()
+            self._inflight[pdf_id] = future
+
+        def finish(job):
+            with self._lock:
+                self._inflight.pop(pdf_id, None)
+            if future.cancelled():
+                return  # a waiter cancelled the shared future; nothing to deliver
+            error = job.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(dict(job.result(), id=pdf_id, cached=False))
+
+        job.add_done_callback(finish)
+        return future
+
+    def compile(self, source: str) -> dict:
+        return self.submit(source).result()
+
+    def get_pdf(self, pdf_id: str) -> Optional[bytes]:
+        if not _ID_RE.match(pdf_id):
+            return None
+        with self._lock:
+            result = self._cached(pdf_id)
+        return result["pdf"] if result else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "available": self.available,
+                "workers": self.workers,
+                "in_flight": len(self._inflight),
+                "cache_entries": len(self._cache),
+                "compiles": self.compiles,
+                "hits": self.hits,
+                "failures": self.failures,
+                "timeouts": self.timeouts
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_DEFAULT_STORE_DIR = os.path.join(DATA_DIR, "latex")
+
+
+def latex_compiler_from_env() -> LatexCompiler:
+    # LATEX_STORE_DIR="" keeps compiled PDFs in memory only.
+    return LatexCompiler(
+        command=os.getenv("LATEX_COMMAND", "pdflatex").split(),
+        workers=int(os.getenv("LATEX_WORKERS", "2")),
+        timeout_seconds=float(os.getenv("LATEX_TIMEOUT_SECONDS", "20")),
+        memory_mb=int(os.getenv("LATEX_MEMORY_MB", "512")),
+        max_output_mb=int(os.getenv("LATEX_MAX_OUTPUT_MB", "20")),
+        cache_entries=int(os.getenv("LATEX_CACHE_ENTRIES", "128")),
+        store_dir=os.getenv("LATEX_STORE_DIR", _DEFAULT_STORE_DIR) or None
+    )
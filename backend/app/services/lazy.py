@@ -0,0 +1,65 @@
+import time
+import threading
+
+# =========================================================
+# LAZY, THREAD-SAFE RESOURCE LOADING
+# =========================================================
+
+_RESOURCES = {}
+
+
+class LazyResource:
+    """Builds a heavy object (model, library, agent) on first use, exactly once.
+
+    Registered resources are reported by /ready and /stats and loaded by
+    warm_up(); pass ``register=False`` for one that should not be.
+    """
+
+    def __init__(self, name: str, factory, register: bool = True):
+        self.name = name
+        self._factory = factory
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.load_seconds = None
+        if register:
+            _RESOURCES[name] = self
+
+    def unregister(self):
+        if _RESOURCES.get(self.name) is self:
+            del _RESOURCES[self.name]
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                self._value = self._factory()
+                self.load_seconds = round(time.perf_counter() - start, 3)
+                self._loaded = True
+        return self._value
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+
+def resource_status() -> dict:
+    return {
+        name: {"loaded": r.loaded, "load_seconds": r.load_seconds}
+        for name, r in _RESOURCES.items()
+    }
+
+
+def warm_up(names=None) -> dict:
+    """Load the given resources (all registered ones by default), collecting failures."""
+    errors = {}
+    for name, resource in list(_RESOURCES.items()):
+        if names is not None and name not in names:
+            continue
+        try:
+            resource.get()
+        except Exception as e:
+            errors[name] = str(e)
+    return errors
@@ -0,0 +1,158 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from . import DATA_DIR
+
+# =========================================================
+# PROMPT-LEVEL LLM RESPONSE CACHE
+# =========================================================
+
+# Seconds a response stays valid, per tool. Override with LLM_CACHE_TTL_<TOOL>
+# (e.g. LLM_CACHE_TTL_SUMMARIZE_RESUME=0 disables caching for summaries).
+DEFAULT_TTLS = {
+    "summarize_resume": 24 * 3600,
+    "ats_ai_feedback": 24 * 3600,
+    "optimize_resume": 3600,
+    "latex_resume_preview": 3600,
+    "rag_query": 600,
+}
+DEFAULT_TTL = 3600
+
+
+def ttl_for(tool: Optional[str]) -> float:
+    if not tool:
+        return DEFAULT_TTL
+    return float(os.getenv(f"LLM_CACHE_TTL_{tool.upper()}", DEFAULT_TTLS.get(tool, DEFAULT_TTL)))
+
+
+def normalize_prompt(prompt: str) -> str:
+    # Whitespace-only differences (indentation, trailing newlines) hit the same entry.
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now + ttl)
+            )
+            self._db.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class LLMResponseCache:
+    """Caches full LLM responses keyed by (model, normalized prompt hash)."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str):
+        value = self.backend.get(self.key(model, prompt))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, model: str, prompt: str, value: str, ttl: float):
+        if ttl > 0:
+            self.backend.set(self.key(model, prompt), value, ttl)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def response_cache_from_env() -> Optional[LLMResponseCache]:
+    # LLM_CACHE_BACKEND is one of memory (default), sqlite or none.
+    backend = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        path = os.getenv("LLM_CACHE_PATH", os.path.join(DATA_DIR, "llm_cache.sqlite"))
+        return LLMResponseCache(SQLiteBackend(path, max_entries))
+    return LLMResponseCache(MemoryBackend(max_entries))
+
+
+RESPONSE_CACHE = response_cache_from_env()
+
+
+def response_cache_stats() -> dict:
+    return RESPONSE_CACHE.stats() if RESPONSE_CACHE is not None else {"backend": None}
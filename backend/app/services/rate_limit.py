@@ -0,0 +1,219 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional
+
+# =========================================================
+# LLM CONCURRENCY LIMITER, BACKPRESSURE AND RETRIES
+# =========================================================
+
+class LLMOverloadedError(RuntimeError):
+    """Raised when the wait queue is full; callers should retry later."""
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """Raised when a call (queueing, attempts and backoff) runs past its deadline."""
+
+
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_POLL_SECONDS = 0.01
+
+
+def is_retryable(error: Exception) -> bool:
+    # google.genai errors carry `code`; httpx/requests-style errors `status_code`.
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in _RETRYABLE_STATUS
+    return isinstance(error, (ConnectionError, TimeoutError)) and not isinstance(error, LLMDeadlineExceeded)
+
+
+class LLMLimiter:
+    """Shared gate in front of the LLM provider.
+
+    A token bucket caps the request rate (``rate`` per second, up to ``burst``
+    at once) and a concurrency cap bounds in-flight calls. At most ``max_queue``
+    callers may wait for a slot; beyond that calls fail fast with
+    LLMOverloadedError instead of piling up. Retryable provider errors are
+    retried with jittered exponential backoff, all within one deadline.
+    Works from both threads (``call``) and coroutines (``acall``).
+    """
+
+    def __init__(self, rate: float = 5, burst: int = 10, max_concurrency: int = 8, max_queue: int = 64,
+                 max_retries: int = 3, retry_base: float = 0.5, retry_max: float = 8, deadline: float = 60):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.deadline = deadline
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.retries = 0
+        self.rejected = 0
+        self.deadline_exceeded = 0
+
+    # ---------- slot acquisition ----------
+
+    def _try_acquire(self) -> float:
+        """Takes a slot and returns 0, or returns how long to wait before retrying. Holds _cond."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self.in_flight >= self.max_concurrency:
+            return _POLL_SECONDS
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        self._tokens -= 1
+        self.in_flight += 1
+        return 0
+
+    def _enqueue(self):
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise LLMOverloadedError("LLM request queue is full")
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def _release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def _expired(self):
+        self.deadline_exceeded += 1
+        return LLMDeadlineExceeded("LLM request deadline exceeded")
+
+    @contextmanager
+    def slot(self, deadline_at: Optional[float] = None):
+        deadline_at = deadline_at or time.monotonic() + self.deadline
+        with self._cond:
+            wait = self._try_acquire()
+            if wait:
+                self._enqueue()
+                try:
+                    while wait:
+                        remaining = deadline_at - time.monotonic()
+                        if remaining <= 0:
+                            raise self._expired()
+                        self._cond.wait(min(wait, remaining))
+                        wait = self._try_acquire()
+                finally:
+                    self.queue_depth -= 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self, deadline_at: Optional[float] = None):
+        deadline_at = deadline_at or time.monotonic() + self.deadline
+        with self._cond:
+            wait = self._try_acquire()
+            if wait:
+                self._enqueue()
+        if wait:
+            try:
+                while wait:
+                    remaining = deadline_at - time.monotonic()
+                    if remaining <= 0:
+                        raise self._expired()
+                    await asyncio.sleep(min(wait, remaining))
+                    with self._cond:
+                        wait = self._try_acquire()
+            finally:
+                with self._cond:
+                    self.queue_depth -= 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    # ---------- calls with retries ----------
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(retry_max, base * 2^attempt)].
+        return random.uniform(0, min(self.retry_max, self.retry_base * (2 ** attempt)))
+
+    def call(self, fn, deadline: Optional[float] = None):
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            try:
+                with self.slot(deadline_at):
+                    result = fn()
+                self.completed += 1
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                pause = self._backoff(attempt)
+                if time.monotonic() + pause >= deadline_at:
+                    raise self._expired() from e
+                self.retries += 1
+                attempt += 1
+                time.sleep(pause)
+
+    async def acall(self, fn, deadline: Optional[float] = None):
+        """``fn`` returns an awaitable; each attempt is cancelled at the deadline."""
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            try:
+                async with self.aslot(deadline_at):
+                    remaining = deadline_at - time.monotonic()
+                    try:
+                        result = await asyncio.wait_for(fn(), timeout=max(remaining, 0))
+                    except asyncio.TimeoutError:
+                        if time.monotonic() < deadline_at:
+                            raise
+                        raise self._expired() from None
+                self.completed += 1
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                pause = self._backoff(attempt)
+                if time.monotonic() + pause >= deadline_at:
+                    raise self._expired() from e
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(pause)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "retries": self.retries,
+                "rejected": self.rejected,
+                "deadline_exceeded": self.deadline_exceeded
+            }
+
+
+def limiter_from_env() -> LLMLimiter:
+    return LLMLimiter(
+        rate=float(os.getenv("LLM_RATE_PER_SECOND", "5")),
+        burst=int(os.getenv("LLM_BURST", "10")),
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+        max_queue=int(os.getenv("LLM_MAX_QUEUE", "64")),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+        retry_base=float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5")),
+        retry_max=float(os.getenv("LLM_RETRY_MAX_SECONDS", "8")),
+        deadline=float(os.getenv("LLM_DEADLINE_SECONDS", "60"))
+    )
+
+
+LLM_LIMITER = limiter_from_env()
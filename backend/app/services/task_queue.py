@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import secrets
+import importlib
+from collections import OrderedDict
+from typing import Optional
+
+# =========================================================
+# BACKGROUND TASK QUEUE
+# =========================================================
+# Long-running tools (optimize, LaTeX preview, job search) can be submitted as
+# tasks: the request returns a task ID at once and the work runs on a bounded
+# pool of in-process workers. Clients poll the task or subscribe to its status
+# changes. Task records live in a store: in memory (default), or in Redis (or
+# any Redis-compatible server) so every API worker sees every task's status.
+# The work itself always runs in the worker that accepted it.
+#
+# An idempotency key makes a submission safe to retry: the same key and the
+# same payload return the original task instead of doing the work again; the
+# same key with a different payload is rejected.
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+TERMINAL = (SUCCEEDED, FAILED)
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class IdempotencyConflict(ValueError):
+    pass
+
+
+def fingerprint(kind: str, params: dict) -> str:
+    return hashlib.sha256(json.dumps([kind, params], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# ---------- stores ----------
+
+class MemoryTaskStore:
+    def __init__(self, max_tasks: int = 10000):
+        self.max_tasks = max_tasks
+        self._tasks = OrderedDict()   # id -> (record, expires_at)
+        self._keys = {}               # idempotency key -> (task_id, fingerprint, expires_at)
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        item = self._tasks.get(task_id)
+        if item is None or item[1] < time.time():
+            return None
+        return dict(item[0])
+
+    async def put(self, record: dict, ttl: float):
+        self._tasks[record["id"]] = (dict(record), time.time() + ttl)
+        self._tasks.move_to_end(record["id"])
+        while len(self._tasks) > self.max_tasks:
+            self._tasks.popitem(last=False)
+
+    async def claim(self, key: str, task_id: str, digest: str, ttl: float) -> Optional[tuple]:
+        """Binds ``key`` to ``task_id`` unless already bound; returns the existing (task_id, fingerprint)."""
+        now = time.time()
+        existing = self._keys.get(key)
+        if existing is not None and existing[2] >= now:
+            return existing[0], existing[1]
+        self._keys[key] = (task_id, digest, now + ttl)
+        if len(self._keys) > self.max_tasks:
+            self._keys = {k: v for k, v in self._keys.items() if v[2] >= now}
+        return None
+
+    async def release(self, key: str):
+        self._keys.pop(key, None)
+
+    async def discard(self, task_id: str):
+        self._tasks.pop(task_id, None)
+
+    async def count(self) -> int:
+        return len(self._tasks)
+
+
+class RedisTaskStore:
+    def __init__(self, url: str, prefix: str = "resumini:tasks:"):
+        self.prefix = prefix
+        self._redis = importlib.import_module("redis.asyncio").Redis.from_url(url, decode_responses=True)
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        value = await self._redis.get(f"{self.prefix}{task_id}")
+        return json.loads(value) if value else None
+
+    async def put(self, record: dict, ttl: float):
+        await self._redis.set(f"{self.prefix}{record['id']}", json.dumps(record), ex=max(1, int(ttl)))
+
+    async def claim(self, key: str, task_id: str, digest: str, ttl: float) -> Optional[tuple]:
+        name = f"{self.prefix}key:{key}"
+        # SET NX is atomic, so two workers racing on one key cannot both win.
+        if await self._redis.set(name, json.dumps([task_id, digest]), nx=True, ex=max(1, int(ttl))):
+            return None
+        value = await self._redis.get(name)
+        return tuple(json.loads(value)) if value else await self.claim(key, task_id, digest, ttl)
+
+    async def release(self, key: str):
+        await self._redis.delete(f"{self.prefix}key:{key}")
+
+    async def discard(self, task_id: str):
+        await self._redis.delete(f"{self.prefix}{task_id}")
+
+    async def count(self) -> Optional[int]:
+        return None  # not tracked; SCAN over a shared server is too costly for /stats
+
+
+# ---------- queue ----------
+
+class TaskQueue:
+    def __init__(self, store, workers: int = 4, max_pending: int = 100, result_ttl: float = 3600,
+                 idempotency_ttl: float = 86400, poll_interval: float = 1.0):
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.idempotency_ttl = idempotency_ttl
+        self.poll_interval = poll_interval
+
+        self._handlers = {}
+        self._tasks = set()      # asyncio tasks of jobs accepted by this process
+        self._changed = {}       # task id -> asyncio.Event, set on every status change
+        self._loop = None
+        self._slots = None
+        self.submitted = 0
+        self.deduplicated = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler):
+        """``handler(**params)`` is a coroutine returning a tool result dict."""
+        self._handlers[kind] = handler
+
+    @property
+    def kinds(self) -> list:
+        return sorted(self._handlers)
+
+    def _bind_loop(self):
+        # Slots belong to the event loop that runs the work.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop, self._slots, self._tasks, self._changed = loop, asyncio.Semaphore(self.workers), set(), {}
+
+    async def _save(self, record: dict):
+        await self.store.put(record, self.result_ttl)
+        event = self._changed.get(record["id"])
+        if event is not None:
+            event.set()
+
+    async def submit(self, kind: str, params: dict, idempotency_key: Optional[str] = None) -> tuple:
+        """Queues a task; returns (record, created). ``created`` is False for an idempotent replay."""
+        if kind not in self._handlers:
+            raise LookupError(f"Unknown task kind '{kind}'")
+        self._bind_loop()
+        if len(self._tasks) >= self.max_pending:
+            raise QueueFullError("Task queue is full")
+
+        record = {"id": secrets.token_hex(16), "kind": kind, "status": QUEUED, "created_at": time.time(),
+                  "started_at": None, "finished_at": None, "result": None, "error": None}
+        # Saved before the key is claimed, so whoever finds the key can
+        # always read the task it points to.
+        await self.store.put(record, self.result_ttl)
+        if idempotency_key:
+            digest = fingerprint(kind, params)
+            existing = await self.store.claim(idempotency_key, record["id"], digest, self.idempotency_ttl)
+            if existing is not None:
+                await self.store.discard(record["id"])
+                if existing[1] != digest:
+                    raise IdempotencyConflict("Idempotency key was already used with a different request")
+                original = await self.store.get(existing[0])
+                if original is not None:
+                    self.deduplicated += 1
+                    return original, False
+                # The original task expired; the key is free again.
+                await self.store.release(idempotency_key)
+                return await self.submit(kind, params, idempotency_key)
+
+        self._changed[record["id"]] = asyncio.Event()
+        self.submitted += 1
+
+        task = asyncio.create_task(self._run(record, params))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return record, True
+
+    async def _run(self, record: dict, params: dict):
+        async with self._slots:
+            record.update(status=RUNNING, started_at=time.time())
+            await self._save(record)
+            try:
+                result = await self._handlers[record["kind"]](**params)
+                if isinstance(result, dict) and result.get("status") == "error":
+                    record.update(status=FAILED, error=result.get("error_message", "Unknown error"))
+                else:
+                    record.update(status=SUCCEEDED, result=result)
+            except Exception as e:
+                record.update(status=FAILED, error=str(e) or type(e).__name__)
+            record["finished_at"] = time.time()
+            if record["status"] == SUCCEEDED:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            await self._save(record)
+            # Nothing will change any more; subscribers still holding the
+            # event get this last set().
+            self._changed.pop(record["id"], None)
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        return await self.store.get(task_id)
+
+    async def watch(self, task_id: str):
+        """Yields the task record on every status change until it finishes."""
+        record = await self.store.get(task_id)
+        if record is None:
+            raise LookupError(f"Unknown task_id '{task_id}'")
+        yield record
+        event = self._changed.get(task_id)
+        while record["status"] not in TERMINAL:
+            # Tasks run by this process signal changes; others (shared
+            # store) are polled.
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+            else:
+                await asyncio.sleep(self.poll_interval)
+            latest = await self.store.get(task_id)
+            if latest is None:
+                return
+            if latest["status"] != record["status"]:
+                record = latest
+                yield record
+
+    async def stats(self) -> dict:
+        return {
+            "backend": type(self.store).__name__,
+            "workers": self.workers,
+            "pending": len(self._tasks),
+            "stored": await self.store.count(),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "succeeded": self.succeeded,
+            "failed": self.failed
+        }
+
+
+def task_queue_from_env() -> TaskQueue:
+    # TASK_QUEUE_BACKEND is memory (default) or redis (TASK_QUEUE_REDIS_URL).
+    if os.getenv("TASK_QUEUE_BACKEND", "memory").lower() == "redis":
+        store = RedisTaskStore(os.getenv("TASK_QUEUE_REDIS_URL", "redis://localhost:6379/0"))
+    else:
+        store = MemoryTaskStore(int(os.getenv("TASK_QUEUE_MAX_TASKS", "10000")))
+    return TaskQueue(
+        store,
+        workers=int(os.getenv("TASK_QUEUE_WORKERS", "4")),
+        max_pending=int(os.getenv("TASK_QUEUE_MAX_PENDING", "100")),
+        result_ttl=float(os.getenv("TASK_RESULT_TTL_SECONDS", "3600")),
+        idempotency_ttl=float(os.getenv("TASK_IDEMPOTENCY_TTL_SECONDS", "86400"))
+    )
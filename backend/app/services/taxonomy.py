@@ -0,0 +1,196 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from .keyword_matcher import KeywordMatcher, normalize_keyword
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# ROLE KEYWORD TAXONOMIES
+# =========================================================
+# Each file under the taxonomy directory (JSON, or YAML when PyYAML is
+# installed) maps role names to weighted keywords, synonyms and expected
+# resume sections:
+#
+#   {"roles": {"backend_developer": {
+#       "title": "Backend Developer",
+#       "aliases": ["python developer", "backend engineer"],
+#       "sections": ["education", "skills", "experience", "projects"],
+#       "keywords": {"python": 2, "postgresql": {"weight": 1.5, "synonyms": ["postgres"]}}}}}
+#
+# Every role is compiled once into its own KeywordMatcher when the files are
+# loaded, so scoring a request never compiles anything. The "general" role is
+# the fallback for titles that match no known role.
+
+DEFAULT_TAXONOMY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "taxonomies")
+DEFAULT_ROLE = "general"
+DEFAULT_SECTIONS = ["education", "skills", "experience", "projects"]
+
+
+def _role_key(text: str) -> str:
+    return normalize_keyword(re.sub(r"[_/]+", " ", text))
+
+
+class RoleProfile:
+    def __init__(self, name: str, spec: dict):
+        self.name = name
+        self.title = spec.get("title", name.replace("_", " ").title())
+        self.aliases = [_role_key(a) for a in spec.get("aliases", [])]
+        self.sections = [s.lower() for s in spec.get("sections") or DEFAULT_SECTIONS]
+
+        self.weights, synonyms = {}, {}
+        for keyword, value in spec.get("keywords", {}).items():
+            if isinstance(value, dict):
+                self.weights[normalize_keyword(keyword)] = float(value.get("weight", 1))
+                synonyms[keyword] = value.get("synonyms", [])
+            else:
+                self.weights[normalize_keyword(keyword)] = float(value)
+                synonyms[keyword] = []
+        self.total_weight = sum(self.weights.values())
+        self.matcher = KeywordMatcher(synonyms)
+
+    def keyword_score(self, matches: dict) -> float:
+        """Weighted share of this role's keywords present in ``matches`` (0-1)."""
+        if not self.total_weight:
+            return 0.0
+        return sum(self.weights.get(k, 0) for k in matches) / self.total_weight
+
+    def describe(self) -> dict:
+        return {"name": self.name, "title": self.title, "aliases": self.aliases,
+                "sections": self.sections, "keywords": len(self.weights)}
+
+
+def _read_file(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        import yaml  # optional: only needed for .yaml/.yml taxonomies
+        return yaml.safe_load(f) or {}
+
+
+class TaxonomyRegistry:
+    """Compiled role profiles with alias lookup and mtime-based hot reload."""
+
+    def __init__(self, directory: str = DEFAULT_TAXONOMY_DIR, reload_interval: float = 5, cache_size: int = 4096):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._aliases = {}
+        self._tokens = {}
+        self._resolved = OrderedDict()
+        self._signature = None
+        self._checked_at = 0.0
+        self.reloads = 0
+        self.load()
+
+    # ---------- loading ----------
+
+    def _files(self) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.endswith((".json", ".yaml", ".yml"))
+        )
+
+    def _current_signature(self, files: list) -> tuple:
+        return tuple((path, os.path.getmtime(path)) for path in files)
+
+    def load(self):
+        files = self._files()
+        profiles = {}
+        for path in files:
+            try:
+                data = _read_file(path)
+            except ImportError:
+                logger.warning("Skipping %s: PyYAML is not installed", path)
+                continue
+            except Exception:
+                logger.exception("Skipping unreadable taxonomy file %s", path)
+                continue
+            for name, spec in (data.get("roles") or {}).items():
+                profiles[name] = RoleProfile(name, spec)
+
+        if DEFAULT_ROLE not in profiles:
+            profiles[DEFAULT_ROLE] = RoleProfile(DEFAULT_ROLE, {})
+
+        aliases, tokens = {}, {}
+        for profile in profiles.values():
+            for alias in [_role_key(profile.name), _role_key(profile.title), *profile.aliases]:
+                aliases.setdefault(alias, profile)
+                for token in alias.split():
+                    tokens.setdefault(token, set()).add(profile.name)
+
+        # Build everything first, then swap, so readers never see a half-loaded state.
+        with self._lock:
+            self._profiles, self._aliases, self._tokens = profiles, aliases, tokens
+            self._resolved.clear()
+            self._signature = self._current_signature(files)
+            self._checked_at = time.monotonic()
+            self.reloads += 1
+
+    def maybe_reload(self):
+        if not self.reload_interval or time.monotonic() - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            changed = self._current_signature(self._files()) != self._signature
+        except OSError:
+            return
+        if changed:
+            self.load()
+
+    # ---------- lookup ----------
+
+    def resolve(self, role: str) -> RoleProfile:
+        """Maps a free-text job title to the closest role profile."""
+        self.maybe_reload()
+        key = _role_key(role or "")
+        with self._lock:
+            profile = self._resolved.get(key)
+            if profile is not None:
+                self._resolved.move_to_end(key)
+                return profile
+
+            profile = self._aliases.get(key) or self._closest(key) or self._profiles[DEFAULT_ROLE]
+            self._resolved[key] = profile
+            while len(self._resolved) > self.cache_size:
+                self._resolved.popitem(last=False)
+            return profile
+
+    def _closest(self, key: str):
+        # Best token overlap between the title and any role alias.
+        words = set(key.split())
+        candidates = set()
+        for word in words:
+            candidates |= self._tokens.get(word, set())
+        best, best_score = None, 0.0
+        for name in sorted(candidates):
+            profile = self._profiles[name]
+            for alias in [_role_key(profile.name), _role_key(profile.title), *profile.aliases]:
+                alias_words = set(alias.split())
+                score = len(words & alias_words) / len(words | alias_words)
+                if score > best_score:
+                    best, best_score = profile, score
+        return best
+
+    def get(self, name: str):
+        return self._profiles.get(name)
+
+    def roles(self) -> list:
+        self.maybe_reload()
+        return [p.describe() for p in sorted(self._profiles.values(), key=lambda p: p.name)]
+
+
+def registry_from_env() -> TaxonomyRegistry:
+    return TaxonomyRegistry(
+        directory=os.getenv("TAXONOMY_DIR", DEFAULT_TAXONOMY_DIR),
+        reload_interval=float(os.getenv("TAXONOMY_RELOAD_SECONDS", "5"))
+    )
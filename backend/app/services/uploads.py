@@ -0,0 +1,162 @@
+import os
+import hashlib
+import tempfile
+from typing import Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# =========================================================
+# STREAMING, SIZE-LIMITED UPLOADS
+# =========================================================
+# The multipart body is parsed as it arrives. The file part goes into a
+# SpooledTemporaryFile (memory up to ``spool_bytes``, disk beyond) while being
+# hashed, and the upload is aborted the moment it passes ``max_bytes``, so an
+# oversized body is never fully read. Small resumes never touch disk.
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+_MAX_FIELD_BYTES = 64 * 1024
+_MULTIPART_OVERHEAD = 16 * 1024  # boundaries, part headers and small form fields
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+class UploadFormatError(ValueError):
+    pass
+
+
+class SpooledUpload:
+    """An uploaded file held in a spooled buffer, with its size and SHA-256."""
+
+    def __init__(self, filename: str = "", max_bytes: int = UPLOAD_MAX_BYTES, spool_bytes: int = UPLOAD_SPOOL_BYTES):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds the {self.max_bytes} byte limit")
+        self._hash.update(data)
+        self.file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def on_disk(self) -> bool:
+        return bool(getattr(self.file, "_rolled", False))
+
+    def open(self):
+        self.file.seek(0)
+        return self.file
+
+    def close(self):
+        self.file.close()
+
+
+class _MultipartReader:
+    def __init__(self, file_field: str, max_bytes: int, spool_bytes: int):
+        self.file_field = file_field
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self.upload: Optional[SpooledUpload] = None
+        self.fields = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._target = None
+        self._field_name = None
+
+    def close(self):
+        if self.upload is not None:
+            self.upload.close()
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": lambda data, start, end: self._append("_header_field", data[start:end]),
+            "on_header_value": lambda data, start, end: self._append("_header_value", data[start:end]),
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+        }
+
+    def _append(self, attr: str, data: bytes):
+        setattr(self, attr, getattr(self, attr) + data)
+
+    def _part_begin(self):
+        self._headers, self._target, self._field_name = {}, None, None
+
+    def _header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field, self._header_value = b"", b""
+
+    def _headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" in options and name == self.file_field:
+            if self.upload is not None:
+                raise UploadFormatError(f"Only one '{self.file_field}' part is allowed")
+            self.upload = SpooledUpload(
+                os.path.basename(options[b"filename"].decode("utf-8", "replace")), self.max_bytes, self.spool_bytes
+            )
+            self._target = self.upload
+        elif name:
+            self._field_name = name
+            self.fields[name] = b""
+
+    def _part_data(self, data: bytes, start: int, end: int):
+        if self._target is not None:
+            self._target.write(data[start:end])
+        elif self._field_name is not None:
+            value = self.fields[self._field_name] + data[start:end]
+            if len(value) > _MAX_FIELD_BYTES:
+                raise UploadTooLargeError(f"Form field '{self._field_name}' is too large")
+            self.fields[self._field_name] = value
+
+
+async def receive_upload(request, file_field: str = "file", max_bytes: Optional[int] = None,
+                         spool_bytes: Optional[int] = None):
+    """Streams a multipart request; returns (SpooledUpload, {field: str}).
+
+    Raises UploadTooLargeError past ``max_bytes`` and UploadFormatError for
+    bodies that are not multipart or have no file in ``file_field``.
+    """
+    max_bytes = max_bytes or UPLOAD_MAX_BYTES
+    spool_bytes = spool_bytes or UPLOAD_SPOOL_BYTES
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise UploadFormatError("Expected a multipart/form-data upload")
+
+    # Reject on the declared size before reading anything.
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + _MULTIPART_OVERHEAD:
+        raise UploadTooLargeError(f"Upload exceeds the {max_bytes} byte limit")
+
+    reader = _MultipartReader(file_field, max_bytes, spool_bytes)
+    parser = MultipartParser(options[b"boundary"], reader.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except (UploadTooLargeError, UploadFormatError):
+        reader.close()
+        raise
+    except ValueError as e:
+        # python-multipart's parse errors are ValueErrors.
+        reader.close()
+        raise UploadFormatError(f"Malformed multipart body: {e}") from e
+    except BaseException:
+        reader.close()
+        raise
+
+    if reader.upload is None:
+        raise UploadFormatError(f"Missing file field '{file_field}'")
+    fields = {name: value.decode("utf-8", "replace") for name, value in reader.fields.items()}
+    return reader.upload, fields
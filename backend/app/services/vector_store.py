@@ -0,0 +1,342 @@
+import os
+import re
+import mmap
+import time
+import shutil
+import struct
+import hashlib
+import importlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from . import DATA_DIR
+from .lazy import LazyResource
+
+_FAISS = LazyResource("faiss", lambda: importlib.import_module("faiss"))
+
+
+def load_faiss():
+    """The faiss module, imported on first use and shared by every index."""
+    return _FAISS.get()
+
+# =========================================================
+# PER-RESUME INDEXES
+# =========================================================
+
+_RESUME_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def make_resume_id(resume_text: str) -> str:
+    # Content-addressed so re-uploading the same resume lands on the same index.
+    return hashlib.sha256(resume_text.encode("utf-8")).hexdigest()[:32]
+
+
+def is_valid_resume_id(resume_id: str) -> bool:
+    return bool(resume_id) and _RESUME_ID_RE.fullmatch(resume_id) is not None
+
+# =========================================================
+# ON-DISK FORMAT
+# =========================================================
+# <id>.faiss   FAISS index, reopened read-only with IO_FLAG_MMAP_IFC (IO_FLAG_MMAP
+#              would still copy a flat index's vectors into memory)
+# <id>.chunks  u32 count | u64 offsets[count + 1] | utf-8 blob
+#
+# Both live in a subdirectory named after the index ``version`` (embedding
+# model and chunker settings), so a change to either starts a fresh store
+# instead of serving chunks and vectors built the old way.
+
+_STORE_FILE_RE = re.compile(r"[0-9a-f]{32}\.(?:faiss|chunks)(?:\.tmp)?")
+
+_CHUNKS_HEADER = struct.Struct("<I")
+
+
+def write_chunks(path: str, chunks: list):
+    blobs = [c.encode("utf-8") for c in chunks]
+    offsets = np.zeros(len(blobs) + 1, dtype="<u8")
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_CHUNKS_HEADER.pack(len(blobs)))
+        f.write(offsets.tobytes())
+        for b in blobs:
+            f.write(b)
+    os.replace(tmp, path)
+
+
+class MappedChunks:
+    """Read-only sequence of chunk texts backed by a memory-mapped file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (count,) = _CHUNKS_HEADER.unpack_from(self._mm, 0)
+        self._offsets = np.frombuffer(self._mm, dtype="<u8", count=count + 1, offset=_CHUNKS_HEADER.size)
+        self._base = _CHUNKS_HEADER.size + self._offsets.nbytes
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._mm[self._base + start:self._base + end].decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._offsets[-1])
+
+
+class ResumeIndex:
+    def __init__(self, resume_id: str, dim: int):
+        self.resume_id = resume_id
+        self.index = _FAISS.get().IndexFlatL2(dim)
+        self.texts = []
+        self.last_access = time.monotonic()
+
+    def save(self, directory: str):
+        base = os.path.join(directory, self.resume_id)
+        _FAISS.get().write_index(self.index, base + ".faiss.tmp")
+        os.replace(base + ".faiss.tmp", base + ".faiss")
+        write_chunks(base + ".chunks", list(self.texts))
+
+    @classmethod
+    def load(cls, directory: str, resume_id: str):
+        base = os.path.join(directory, resume_id)
+        entry = cls.__new__(cls)
+        entry.resume_id = resume_id
+        faiss = _FAISS.get()
+        entry.index = faiss.read_index(base + ".faiss", faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        entry.texts = MappedChunks(base + ".chunks")
+        entry.last_access = time.monotonic()
+        return entry
+
+    @staticmethod
+    def exists(directory: str, resume_id: str) -> bool:
+        base = os.path.join(directory, resume_id)
+        return os.path.exists(base + ".faiss") and os.path.exists(base + ".chunks")
+
+    def add(self, embeddings: np.ndarray, chunks: list):
+        self.index.add(embeddings)
+        self.texts.extend(chunks)
+
+    def search(self, q_emb: np.ndarray, top_k: int):
+        k = min(top_k, self.index.ntotal)
+        if k <= 0:
+            return np.empty((1, 0), dtype="float32"), np.empty((1, 0), dtype="int64")
+        return self.index.search(q_emb, k)
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    @property
+    def nbytes(self) -> int:
+        vectors = self.index.ntotal * self.index.d * 4
+        if isinstance(self.texts, MappedChunks):
+            return vectors + self.texts.nbytes
+        return vectors + sum(len(t) for t in self.texts)
+
+
+class IndexRegistry:
+    """LRU registry of per-resume indexes with TTL expiry and a memory cap.
+
+    With a ``store_dir`` every index is also written to disk, under a
+    ``version`` subdirectory, and a lookup that misses memory reopens the saved
+    files memory-mapped instead of re-embedding. Eviction only drops the
+    in-memory handle. Files on disk are pruned separately: indexes unused for
+    ``store_ttl_seconds`` and the least recently used beyond
+    ``store_max_indexes`` are deleted, as are stores of other versions.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600, max_bytes: int = 256 * 1024 * 1024,
+                 store_dir: Optional[str] = None, version: str = "", store_max_indexes: int = 0,
+                 store_ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.root_dir = store_dir
+        self.version = version
+        self.store_dir = os.path.join(store_dir, version) if store_dir and version else store_dir
+        self.store_max_indexes = store_max_indexes
+        self.store_ttl_seconds = store_ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.evictions = 0
+        self.disk_loads = 0
+        self.disk_evictions = 0
+        if store_dir:
+            os.makedirs(self.store_dir, exist_ok=True)
+            self._drop_other_versions()
+            self.prune_store()
+
+    def get(self, resume_id: str):
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(resume_id)
+            if entry is None:
+                entry = self._load(resume_id)
+                if entry is None:
+                    return None
+                self._entries[resume_id] = entry
+                self._shrink(keep=resume_id)
+            entry.last_access = time.monotonic()
+            self._entries.move_to_end(resume_id)
+            return entry
+
+    def put(self, entry: ResumeIndex):
+        if self.store_dir:
+            entry.save(self.store_dir)
+        with self._lock:
+            entry.last_access = time.monotonic()
+            self._entries[entry.resume_id] = entry
+            self._entries.move_to_end(entry.resume_id)
+            self._expire()
+            self._shrink(keep=entry.resume_id)
+            self._puts += 1
+            prune = self._puts % _PRUNE_EVERY_PUTS == 0
+        if prune:
+            self.prune_store()
+
+    def stored_ids(self) -> list:
+        if not self.store_dir:
+            return []
+        return sorted(
+            name[:-len(".faiss")] for name in os.listdir(self.store_dir)
+            if name.endswith(".faiss") and is_valid_resume_id(name[:-len(".faiss")])
+        )
+
+    def _load(self, resume_id: str):
+        if not self.store_dir or not is_valid_resume_id(resume_id):
+            return None
+        if not ResumeIndex.exists(self.store_dir, resume_id):
+            return None
+        self.disk_loads += 1
+        entry = ResumeIndex.load(self.store_dir, resume_id)
+        # The .faiss mtime is the index's last use on disk (see prune_store).
+        os.utime(os.path.join(self.store_dir, resume_id + ".faiss"))
+        return entry
+
+    # ---------- on-disk cleanup ----------
+
+    def _drop_other_versions(self):
+        # Files from before versioned stores sit directly in the root; other
+        # versions are sibling directories holding nothing but index files.
+        if not self.version:
+            return
+        for name in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, name)
+            if name == self.version:
+                continue
+            if os.path.isfile(path) and _STORE_FILE_RE.fullmatch(name):
+                os.remove(path)
+            elif os.path.isdir(path) and all(_STORE_FILE_RE.fullmatch(f) for f in os.listdir(path)):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def prune_store(self) -> int:
+        """Deletes expired and least recently used index files; returns how many went."""
+        if not self.store_dir or not (self.store_max_indexes or self.store_ttl_seconds):
+            return 0
+        stored = []
+        for resume_id in self.stored_ids():
+            try:
+                stored.append((os.path.getmtime(os.path.join(self.store_dir, resume_id + ".faiss")), resume_id))
+            except FileNotFoundError:
+                continue
+        stored.sort(reverse=True)
+        with self._lock:
+            in_memory = set(self._entries)
+        cutoff = time.time() - self.store_ttl_seconds if self.store_ttl_seconds else None
+        removed = 0
+        for position, (mtime, resume_id) in enumerate(stored):
+            over_cap = self.store_max_indexes and position >= self.store_max_indexes
+            if resume_id in in_memory or not (over_cap or (cutoff is not None and mtime < cutoff)):
+                continue
+            for suffix in (".faiss", ".chunks"):
+                try:
+                    os.remove(os.path.join(self.store_dir, resume_id + suffix))
+                except FileNotFoundError:
+                    pass
+            removed += 1
+        with self._lock:
+            self.disk_evictions += removed
+        return removed
+
+    def most_recent(self):
+        with self._lock:
+            self._expire()
+            if not self._entries:
+                return None
+            return next(reversed(self._entries.values()))
+
+    def remove(self, resume_id: str):
+        with self._lock:
+            self._entries.pop(resume_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(e.nbytes for e in self._entries.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "indexes": len(self._entries),
+                "bytes": self.nbytes,
+                "evictions": self.evictions,
+                "disk_loads": self.disk_loads,
+                "disk_evictions": self.disk_evictions
+            }
+
+    def _expire(self):
+        if not self.ttl_seconds:
+            return
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Entries are kept in access order, so stale ones sit at the front.
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.last_access >= cutoff:
+                break
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _shrink(self, keep: str):
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.nbytes > self.max_bytes
+        ):
+            oldest_id = next(iter(self._entries))
+            if oldest_id == keep:
+                break
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+_DEFAULT_STORE_DIR = os.path.join(DATA_DIR, "vector_store")
+_PRUNE_EVERY_PUTS = 256
+
+
+def registry_from_env(version: str = "") -> IndexRegistry:
+    # RAG_STORE_DIR="" keeps everything in memory only. ``version`` names what
+    # the stored indexes were built with (see available_tools).
+    return IndexRegistry(
+        max_entries=int(os.getenv("RAG_MAX_INDEXES", "256")),
+        ttl_seconds=float(os.getenv("RAG_INDEX_TTL_SECONDS", "3600")),
+        max_bytes=int(float(os.getenv("RAG_MAX_MEMORY_MB", "256")) * 1024 * 1024),
+        store_dir=os.getenv("RAG_STORE_DIR", _DEFAULT_STORE_DIR) or None,
+        version=version,
+        store_max_indexes=int(os.getenv("RAG_STORE_MAX_INDEXES", "10000")),
+        store_ttl_seconds=float(os.getenv("RAG_STORE_TTL_DAYS", "30")) * 86400
+    )
@@ -0,0 +1,16 @@
+import zlib
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def bag_of_words():
+    """A deterministic stand-in for the embedding model: hashed word counts, unit length."""
+    def encode(texts):
+        out = np.zeros((len(texts), 384), dtype="float32")
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                out[row, zlib.crc32(word.strip(":,.?").encode()) % 384] += 1
+        return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+    return encode
@@ -1,6 +1,15 @@
 from fastapi.testclient import TestClient
 from app.main import app
+from app.services import available_tools
+from app.services.vector_store import IndexRegistry, ResumeIndex
 import os
+import sys
+import json
+import subprocess
+
+# Importing app.main must not pull in the embedding model, the ADK or parsers.
+IMPORT_BUDGET_SECONDS = 3.0
+HEAVY_MODULES = ["sentence_transformers", "torch", "google.adk", "google.genai", "faiss", "pdfplumber", "docx"]
 
 client = TestClient(app)
 
@@ -9,6 +18,38 @@ def test_read_main():
     assert response.status_code == 200
     assert response.json() == {"message": "Resumini API is running"}
 
+def test_ready_without_warmup():
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert "embedding_model" in response.json()["resources"]
+
+def test_import_time_budget():
+    code = (
+        "import json, sys, time; t = time.perf_counter(); import app.main; "
+        "print(json.dumps({'seconds': time.perf_counter() - t, "
+        f"'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+    )
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result["loaded"] == []
+    assert result["seconds"] < IMPORT_BUDGET_SECONDS
+
+class EchoLLM:
+    async def agenerate(self, prompt, **kwargs):
+        return "ok"
+
+def test_chat_requires_resume_id(monkeypatch):
+    # Another user's upload must never be answered from by default.
+    monkeypatch.setattr(available_tools, "_INDEX_REGISTRY", IndexRegistry())
+    monkeypatch.setattr(available_tools.rag_query, "llm", EchoLLM(), raising=False)
+    available_tools._INDEX_REGISTRY.put(ResumeIndex("someone-else", 384))
+
+    assert client.post("/chat", json={"query": "What degree?"}).status_code == 400
+    assert client.post("/chat/stream", json={"query": "What degree?"}).status_code == 400
+    assert client.post("/chat/sessions", json={}).status_code == 422
+
 def test_ats_score():
     # Mocking behavior might be needed if dependencies fail, 
     # but strictly checking structure here.
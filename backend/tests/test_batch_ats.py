@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import asyncio
+import warnings
+import subprocess
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import available_tools
+from app.services.available_tools import ats_report, batch_ats_report
+
+client = TestClient(app)
+
+STRONG = "Skills: Python, Django, PostgreSQL, Redis, Docker, Kubernetes, REST. Experience. Education. Projects."
+WEAK = "Hobbies: painting and hiking."
+
+
+def _resumes(n):
+    return [(f"r{i}", STRONG if i % 3 == 0 else WEAK) for i in range(n)]
+
+
+def test_batch_matches_single_reports_and_ranks():
+    result = batch_ats_report([("weak", WEAK), ("strong", STRONG)], "Backend Developer")
+    assert [r["id"] for r in result["report"]] == ["strong", "weak"]
+    assert [r["rank"] for r in result["report"]] == [1, 2]
+    assert result["report"][0]["ats_report"] == ats_report(STRONG, "Backend Developer")["ats_report"]
+
+
+def test_process_pool_path_matches_inline(monkeypatch):
+    inline = batch_ats_report(_resumes(10), "Backend Developer")
+    monkeypatch.setattr(available_tools, "_ATS_BATCH_INLINE_MAX", 0)
+    monkeypatch.setattr(available_tools, "_ATS_BATCH_CHUNK_SIZE", 3)
+    pooled = batch_ats_report(_resumes(10), "Backend Developer", top_k=4)
+    assert pooled["scored"] == 10
+    assert pooled["report"] == inline["report"][:4]
+
+
+def test_async_batch_cancels_inline_chunks_when_input_fails(monkeypatch):
+    # Chunks no larger than ATS_BATCH_INLINE_MAX are scored on a thread.
+    monkeypatch.setattr(available_tools, "_ATS_BATCH_CHUNK_SIZE", 2)
+
+    async def broken():
+        for item in _resumes(3):
+            yield item
+        raise ValueError("bad line")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no "coroutine was never awaited"
+        with pytest.raises(ValueError, match="bad line"):
+            asyncio.run(available_tools.batch_ats_report_async(broken(), "Backend Developer"))
+
+
+def test_batch_endpoint_json_and_ndjson():
+    body = {"role": "Backend Developer", "resumes": [{"id": i, "resume_text": t} for i, t in _resumes(4)]}
+    response = client.post("/analyze/ats/batch", json=body)
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["rank"] for r in rows] == [1, 2, 3, 4]
+    assert response.headers["x-taxonomy-role"] == "backend_developer"
+
+    ndjson = "\n".join(json.dumps({"id": i, "resume_text": t}) for i, t in _resumes(4))
+    response = client.post(
+        "/analyze/ats/batch?role=Backend%20Developer&top_k=2", content=ndjson,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == rows[:2]
+
+
+def test_batch_endpoint_rejects_bad_ndjson():
+    response = client.post(
+        "/analyze/ats/batch?role=Backend%20Developer", content='{"id": "a"}\nnot json',
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid NDJSON line 1: expected an object with a resume_text string"
+
+    response = client.post(
+        "/analyze/ats/batch?role=Backend%20Developer", content='{"resume_text": "a"}\nnot json',
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 400 and response.json()["detail"].startswith("Invalid NDJSON line 2: Expecting value")
+
+
+def test_batch_scoring_errors_are_not_reported_as_bad_input(monkeypatch):
+    def broken(role):
+        raise KeyError(role)
+
+    monkeypatch.setattr(available_tools, "_resolve_role", broken)
+    body = {"role": "Backend Developer", "resumes": [{"id": "a", "resume_text": STRONG}]}
+    response = TestClient(app, raise_server_exceptions=False).post("/analyze/ats/batch", json=body)
+    assert response.status_code == 500
+
+
+def test_pool_workers_only_import_the_scorer():
+    code = ("import sys, app.services.ats_scoring; "
+            "assert 'app.services.available_tools' not in sys.modules, 'available_tools imported'")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
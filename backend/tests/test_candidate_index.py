@@ -0,0 +1,142 @@
+import numpy as np
+
+from app.services.candidate_index import CandidateIndex, pool_embeddings
+
+DIM = 16
+
+
+def _vectors(n, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype("float32")
+
+
+def _fill(index, vectors):
+    for i, v in enumerate(vectors):
+        index.upsert(f"r{i}", v, {"city": "Pune" if i % 2 else "Chennai", "skills": ["python"] if i % 3 == 0 else []})
+
+
+def test_pool_embeddings_is_unit_mean():
+    pooled = pool_embeddings(np.array([[1, 0], [0, 1]], dtype="float32"))
+    assert np.allclose(pooled, [2 ** -0.5, 2 ** -0.5])
+
+
+def test_search_ranks_and_filters():
+    vectors = _vectors(50)
+    index = CandidateIndex(DIM)
+    _fill(index, vectors)
+
+    hits = index.search(vectors[7], top_k=3)
+    assert hits[0][0] == "r7" and abs(hits[0][1] - 1) < 1e-5
+    assert [h[1] for h in hits] == sorted((h[1] for h in hits), reverse=True)
+
+    filtered = index.search(vectors[7], top_k=5, filters={"city": "chennai", "skills": ["Python"]})
+    assert filtered and all(int(rid[1:]) % 6 == 0 for rid, _, _ in filtered)
+
+
+def test_ivf_threshold_counts_live_rows_only():
+    vectors = _vectors(80)
+    index = CandidateIndex(DIM, kind="ivf")
+    for v in vectors:
+        index.upsert("same", v)  # 80 rows, only one of them live
+    index.search(vectors[-1], top_k=1)
+    index.wait_for_rebuild(10)
+    assert index.stats()["rows"] == 80 and index.stats()["index_kind"] == "flat"
+
+    _fill(index, vectors)
+    index.search(vectors[0], top_k=1)
+    assert index.wait_for_rebuild(10)
+    index.search(vectors[0], top_k=1)
+    assert index.stats()["index_kind"] == "ivf"
+
+
+def test_upsert_replaces_and_remove_hides():
+    vectors = _vectors(10)
+    index = CandidateIndex(DIM)
+    _fill(index, vectors)
+    index.upsert("r1", vectors[2], {"city": "Delhi"})
+    index.remove("r3")
+
+    assert len(index) == 9
+    top = index.search(vectors[2], top_k=2)
+    assert {rid for rid, _, _ in top} == {"r1", "r2"}
+    assert "r3" not in [rid for rid, _, _ in index.search(vectors[3], top_k=10)]
+
+
+def test_switches_to_ann_index_past_flat_limit():
+    vectors = _vectors(300, seed=1)
+    index = CandidateIndex(DIM, flat_max=100)
+    _fill(index, vectors[:50])
+    index.search(vectors[0], top_k=1)
+    assert index.stats()["index_kind"] == "flat"
+
+    _fill(index, vectors)
+    # Served exactly while the HNSW graph is built in the background.
+    assert index.search(vectors[250], top_k=1)[0][0] == "r250"
+    assert index.wait_for_rebuild(timeout=10)
+    assert index.stats()["index_kind"] == "hnsw"
+    assert index.search(vectors[250], top_k=1)[0][0] == "r250"
+
+
+def test_persists_across_restarts(tmp_path):
+    vectors = _vectors(20)
+    index = CandidateIndex(DIM, store_dir=str(tmp_path))
+    _fill(index, vectors)
+    index.remove("r4")
+
+    reopened = CandidateIndex(DIM, store_dir=str(tmp_path))
+    assert len(reopened) == 19
+    assert reopened.search(vectors[5], top_k=1)[0][0] == "r5"
+    assert reopened.metadata("r5")["city"] == "Pune"
+
+
+def test_recovers_from_torn_tail(tmp_path):
+    vectors = _vectors(5)
+    index = CandidateIndex(DIM, store_dir=str(tmp_path))
+    _fill(index, vectors[:4])
+    # Crash mid-append: part of a vector row and part of its log line.
+    with open(tmp_path / "candidates.f32", "ab") as f:
+        f.write(vectors[4].tobytes()[:10])
+    with open(tmp_path / "candidates.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"id": "r4", "ro')
+
+    reopened = CandidateIndex(DIM, store_dir=str(tmp_path))
+    assert len(reopened) == 4
+    reopened.upsert("r4", vectors[4])
+    again = CandidateIndex(DIM, store_dir=str(tmp_path))
+    assert len(again) == 5
+    assert again.search(vectors[4], top_k=1)[0][0] == "r4"
+    assert again.search(vectors[2], top_k=1)[0][0] == "r2"
+
+
+def test_upload_then_search_candidates(monkeypatch, bag_of_words):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services import available_tools
+    from app.services.embeddings import EmbeddingBatcher
+    from app.services.lazy import LazyResource
+    from app.services.vector_store import IndexRegistry
+
+    monkeypatch.setattr(available_tools, "_EMBED_BATCHER", EmbeddingBatcher(bag_of_words, max_wait_ms=1))
+    monkeypatch.setattr(available_tools, "_INDEX_REGISTRY", IndexRegistry())
+    candidates = LazyResource("test-candidates", lambda: CandidateIndex(384), register=False)
+    monkeypatch.setattr(available_tools, "_CANDIDATES", candidates)
+    client = TestClient(app)
+
+    uploaded = client.post(
+        "/upload/text", json={"text": "python django postgresql backend apis", "metadata": {"city": "Pune"}}
+    ).json()["resume_id"]
+    client.post("/upload/text", json={"text": "figma sketch user research design", "metadata": {"city": "Pune"}})
+    client.post("/upload/text", json={"text": "python flask backend services", "metadata": {"city": "Delhi"}})
+
+    response = client.post("/search/candidates", json={"job_description": "backend python apis", "top_k": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_candidates"] == 3
+    assert [r["metadata"]["city"] for r in body["results"]] == ["Pune", "Delhi"]
+    assert "python" in body["results"][0]["metadata"]["skills"]
+    # Results never hand out resume IDs, and their candidate IDs do not open a chat.
+    found = body["results"][0]["candidate_id"]
+    assert "resume_id" not in body["results"][0] and found != uploaded
+    assert client.post("/chat", json={"query": "skills?", "resume_id": found}).status_code == 400
+
+    response = client.post("/search/candidates", json={"job_description": "backend python", "filters": {"city": "Delhi"}})
+    assert [r["metadata"]["city"] for r in response.json()["results"]] == ["Delhi"]
@@ -0,0 +1,96 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import available_tools
+from app.services.candidate_index import CandidateIndex
+from app.services.chat_sessions import ChatSession, SessionStore
+from app.services.embeddings import EmbeddingBatcher
+from app.services.lazy import LazyResource
+from app.services.vector_store import IndexRegistry
+
+
+def test_history_is_bounded_and_older_turns_summarized():
+    session = ChatSession("s", "r", max_turns=2, summary_tokens=40)
+    for i in range(6):
+        session.record(f"Question {i}?", f"Answer {i}. More detail that is not kept.")
+    assert [q for q, _ in session.turns] == ["Question 4?", "Question 5?"]
+    assert session.summary and all("not kept" not in line for line in session.summary)
+    assert session.summary[-1] == "- Asked: Question 3? Answer: Answer 3."
+    assert len(session.summary) < 4
+
+
+def test_context_working_set_appends_and_evicts_oldest():
+    session = ChatSession("s", "r", context_tokens=10)
+    assert session.add_context([1, 2], ["a", "b"], [4, 4]) == [1, 2]
+    assert session.add_context([2, 3], ["b", "c"], [4, 4]) == [3]
+    assert list(session.context) == [2, 3]
+    assert session.context_size == 8
+    # A turn's token budget trims the working set further, keeping its own chunks.
+    assert session.add_context([3, 4], ["c", "d"], [4, 4], budget=8) == [4]
+    assert list(session.context) == [3, 4]
+    assert ChatSession("s", "r").context_tokens == 512
+
+
+def test_similar_follow_up_reuses_context():
+    session = ChatSession("s", "r", reuse_similarity=0.9)
+    session.add_context([0], ["x"], [1])
+    assert not session.can_reuse(np.array([1.0, 0.0]))
+    assert session.can_reuse(np.array([0.99, 0.05]))
+    assert not session.can_reuse(np.array([0.0, 1.0]))
+
+
+def test_store_evicts_least_recent():
+    store = SessionStore(max_sessions=2)
+    a, b = store.create("r"), store.create("r")
+    store.get(a.session_id)
+    store.create("r")
+    assert store.get(b.session_id) is None and store.get(a.session_id) is a
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def agenerate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return f"Answer number {len(self.prompts)}."
+
+
+def test_multi_turn_chat(monkeypatch, bag_of_words):
+    llm = RecordingLLM()
+    monkeypatch.setattr(available_tools, "_EMBED_BATCHER", EmbeddingBatcher(bag_of_words, max_wait_ms=1))
+    monkeypatch.setattr(available_tools, "_INDEX_REGISTRY", IndexRegistry())
+    candidates = LazyResource("test-session-candidates", lambda: CandidateIndex(384), register=False)
+    monkeypatch.setattr(available_tools, "_CANDIDATES", candidates)
+    monkeypatch.setattr(available_tools, "_CHAT_SESSIONS", SessionStore(max_turns=1, reuse_similarity=0.6))
+    monkeypatch.setattr(available_tools.rag_query, "llm", llm, raising=False)
+    client = TestClient(app)
+
+    resume = "Experience\n- Built REST APIs with FastAPI\n\nEducation\nB.Tech in Computer Science\n"
+    resume_id = client.post("/upload/text", json={"text": resume}).json()["resume_id"]
+    session_id = client.post("/chat/sessions", json={"resume_id": resume_id}).json()["session_id"]
+
+    def ask(query):
+        response = client.post("/chat", json={"query": query, "top_k": 1, "session_id": session_id},
+                               params={"use_cache": "false"})
+        assert response.status_code == 200
+        return response.json()
+
+    first = ask("Which APIs were built with FastAPI?")
+    assert not first["reused_context"] and first["new_chunk_ids"] == first["chunk_ids"]
+
+    second = ask("Which APIs were built with FastAPI exactly?")
+    assert second["reused_context"] and second["new_chunk_ids"] == []
+    assert "Answer number 1." in llm.prompts[1]
+
+    third = ask("What degree in Computer Science?")
+    assert not third["reused_context"]
+    assert llm.prompts[2].count("Q:") == 1 and "Earlier in this conversation" in llm.prompts[2]
+
+    described = client.get(f"/chat/sessions/{session_id}").json()["report"]
+    assert described["turns"] == 3 and described["resume_id"] == resume_id
+
+    assert client.delete(f"/chat/sessions/{session_id}").status_code == 200
+    assert client.post("/chat", json={"query": "hi", "session_id": session_id}).status_code == 404
+    assert client.post("/chat/stream", json={"query": "hi", "session_id": session_id}).status_code == 404
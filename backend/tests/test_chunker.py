@@ -0,0 +1,47 @@
+from app.services.chunker import MODEL_MAX_TOKENS, chunk_resume, estimate_tokens
+
+RESUME = """Jane Doe
+jane@example.com
+
+PROFESSIONAL SUMMARY
+Backend engineer with six years of experience.
+
+Work Experience
+Acme Corp - Senior Engineer
+- Built REST APIs with FastAPI serving 10k requests per second
+- Led the migration to Kubernetes
+  across three regions
+• Mentored four engineers
+
+EDUCATION
+B.Tech Computer Science, 2018
+
+Skills: Python, Go, PostgreSQL
+"""
+
+
+def test_chunks_follow_sections_and_keep_bullets_whole():
+    chunks = chunk_resume(RESUME)
+    assert [c.section for c in chunks] == ["General", "Summary", "Experience", "Education", "Skills"]
+    experience = chunks[2]
+    assert experience.text.startswith("Experience: Acme Corp")
+    assert "Led the migration to Kubernetes across three regions" in experience.text
+    assert RESUME[experience.start:].startswith("Acme Corp")
+    assert chunks[4].text == "Skills: Python, Go, PostgreSQL"
+
+
+def test_chunks_respect_token_budget():
+    bullets = "\n".join(f"- Delivered project {i} using Python, Docker and AWS for client {i}" for i in range(60))
+    text = "Experience\n" + bullets + "\n\nSummary\n" + " ".join(["word"] * 2000)
+    chunks = chunk_resume(text, max_tokens=64)
+    assert len(chunks) > 10
+    assert all(c.tokens <= 64 for c in chunks)
+    assert all(c.text.count("Delivered project") == c.text.count("for client") for c in chunks)
+
+    capped = chunk_resume(text, max_tokens=10_000)
+    assert all(c.tokens <= MODEL_MAX_TOKENS for c in capped)
+
+
+def test_estimate_tokens_counts_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Python, Go.") > estimate_tokens("Python Go")
@@ -0,0 +1,62 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import available_tools
+from app.services.candidate_index import CandidateIndex
+from app.services.context_builder import build_context
+from app.services.embeddings import EmbeddingBatcher
+from app.services.lazy import LazyResource
+from app.services.vector_store import IndexRegistry
+
+TEXTS = [
+    "Experience: Built REST APIs with FastAPI and PostgreSQL",
+    "Experience: Built REST APIs with FastAPI and PostgreSQL at Acme",
+    "Education: B.Tech in Computer Science",
+    "Skills: Python, Docker, Kubernetes " + "filler " * 200,
+]
+
+
+def test_drops_invalid_duplicate_and_overlapping_hits():
+    hits = [(0, 0.2), (-1, 0.0), (0, 0.2), (1, 0.3), (2, 0.9), (7, 0.1)]
+    selection = build_context(hits, TEXTS, "Which APIs were built?", token_budget=500)
+    assert selection["chunk_ids"] == [0, 2]
+    assert selection["dropped"] == {"invalid": 2, "duplicate": 2, "over_budget": 0}
+    assert selection["tokens"] == sum(selection["chunk_tokens"])
+
+
+def test_fills_token_budget_and_keeps_document_order():
+    hits = [(3, 0.1), (2, 0.2), (0, 0.3)]
+    selection = build_context(hits, TEXTS, "education", token_budget=40, rerank=False)
+    assert selection["chunk_ids"] == [0, 2]
+    assert selection["tokens"] <= 40
+    assert selection["dropped"]["over_budget"] == 1
+    assert selection["context"].index("Built REST") < selection["context"].index("B.Tech")
+
+
+def test_rerank_prefers_lexical_match():
+    hits = [(0, 0.50), (2, 0.52)]
+    top = build_context(hits, TEXTS, "What degree in computer science?", max_chunks=1)
+    assert top["chunk_ids"] == [2]
+    assert build_context(hits, TEXTS, "What degree in computer science?", max_chunks=1, rerank=False)["chunk_ids"] == [0]
+
+
+class EchoLLM:
+    async def agenerate(self, prompt, **kwargs):
+        return "ok"
+
+
+def test_chat_returns_chosen_chunks(monkeypatch, bag_of_words):
+    monkeypatch.setattr(available_tools, "_EMBED_BATCHER", EmbeddingBatcher(bag_of_words, max_wait_ms=1))
+    monkeypatch.setattr(available_tools, "_INDEX_REGISTRY", IndexRegistry())
+    candidates = LazyResource("test-chat-candidates", lambda: CandidateIndex(384), register=False)
+    monkeypatch.setattr(available_tools, "_CANDIDATES", candidates)
+    monkeypatch.setattr(available_tools.rag_query, "llm", EchoLLM(), raising=False)
+    client = TestClient(app)
+
+    resume = "Experience\n- Built REST APIs with FastAPI\n\nEducation\nB.Tech in Computer Science\n"
+    resume_id = client.post("/upload/text", json={"text": resume}).json()["resume_id"]
+    response = client.post("/chat", json={"query": "What degree?", "top_k": 10, "resume_id": resume_id})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["chunk_ids"] == [0, 1]
+    assert 0 < body["context_tokens"] <= 512
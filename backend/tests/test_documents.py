@@ -0,0 +1,146 @@
+import io
+import sys
+import shutil
+import textwrap
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import available_tools
+from app.services.documents import (
+    DocumentRenderError, DocumentStore, PdfRenderer, document_id, render_basic_pdf
+)
+from app.services.latex import LatexCompiler
+
+RESUME = "Jane Doe\n\nExperience\n- Built (fast) APIs in Python\\Go\n- Café ordering system"
+UNICODE = "नमस्ते 你好 — 100% C# & {Go}"
+
+# Stands in for lualatex: copies the body of the document into the "PDF", and
+# fails like fontspec when asked for "Missing Font".
+FAKE_TEX = textwrap.dedent("""
+    import sys
+    source = open(sys.argv[-1], encoding="utf-8").read()
+    if "Missing Font" in source:
+        print('! Package fontspec Error: The font "Missing Font" cannot be')
+        print("(fontspec)                found.")
+        sys.exit(1)
+    body = source.split("\\\\begin{document}")[1].split("\\\\end{document}")[0]
+    open(sys.argv[-1].replace(".tex", ".pdf"), "wb").write(b"%PDF-" + body.encode("utf-8"))
+""")
+
+
+@pytest.fixture
+def fake_renderer(tmp_path):
+    script = tmp_path / "fake_tex.py"
+    script.write_text(FAKE_TEX)
+    return PdfRenderer(LatexCompiler([sys.executable, str(script)], cache_entries=0))
+
+
+def test_pdf_source_escapes_text_and_keeps_unicode(fake_renderer):
+    source = fake_renderer.source(UNICODE + "\n\n\\input{/etc/passwd}\tx")
+    assert "नमस्ते 你好 — 100\\% C\\# \\& \\{Go\\}\\par" in source
+    assert "\\textbackslash{}input\\{/etc/passwd\\} x\\par" in source
+    assert '"Noto Sans CJK SC:mode=harf;"' in source
+
+    pdf = fake_renderer.render(UNICODE)
+    assert pdf.startswith(b"%PDF-") and "नमस्ते 你好".encode("utf-8") in pdf
+    with pytest.raises(ValueError):
+        PdfRenderer(fake_renderer.compiler, font="Evil}\\input{x")
+
+
+@pytest.mark.skipif(shutil.which("lualatex") is None, reason="lualatex is not installed")
+def test_pdf_round_trips_non_latin_text():
+    pdfplumber = pytest.importorskip("pdfplumber")
+    renderer = PdfRenderer(LatexCompiler(["lualatex"], timeout_seconds=120, memory_mb=4096, cache_entries=0))
+    with pdfplumber.open(io.BytesIO(renderer.render(RESUME + "\n" + UNICODE))) as pdf:
+        text = "\n".join(page.extract_text() for page in pdf.pages)
+    assert "Built (fast) APIs in Python\\Go" in text and "Café" in text
+    assert "你好" in text and "?" not in text
+    assert any("\u0900" <= c <= "\u097f" for c in text)
+
+
+def test_store_renders_on_demand_and_caches_by_content():
+    docx = pytest.importorskip("docx")
+    store = DocumentStore(max_documents=2, max_rendered_bytes=10 ** 6)
+    doc_id = store.register(RESUME, "Backend Developer")
+    assert doc_id == document_id(RESUME) and store.stats()["renders"] == 0
+
+    data = store.render(doc_id, "docx")
+    assert store.render(doc_id, "docx") is data and store.stats() == {
+        "documents": 1, "rendered": 1, "rendered_bytes": len(data), "renders": 1, "hits": 1,
+        "pdf_fallbacks": 0, "pdf": None
+    }
+    assert [p.text for p in docx.Document(io.BytesIO(data)).paragraphs] == RESUME.splitlines()
+
+    store.register("b")
+    store.register("c")  # evicts RESUME and its rendered bytes
+    assert store.render(doc_id, "docx") is None and store.stats()["rendered_bytes"] == 0
+    assert store.render("not-an-id", "pdf") is None
+    # Without a PDF renderer the built-in writer is used.
+    assert store.render(store.register("no renderer"), "pdf").startswith(b"%PDF-1.4")
+
+
+def test_pdf_falls_back_without_tex_or_fonts(fake_renderer):
+    text = "Jane Doe\n" + "Built (fast) APIs " * 200
+    basic = render_basic_pdf(text)
+    assert basic.startswith(b"%PDF-1.4") and basic.rstrip().endswith(b"%%EOF")
+
+    no_tex = DocumentStore(pdf_renderer=PdfRenderer(LatexCompiler(["no-such-tex"])))
+    assert no_tex.render(no_tex.register(text), "pdf") == basic
+    assert no_tex.stats()["pdf_fallbacks"] == 1
+
+    no_font = PdfRenderer(fake_renderer.compiler, font="Missing Font")
+    store = DocumentStore(pdf_renderer=no_font)
+    assert store.render(store.register(text), "pdf") == basic
+    assert no_font.fonts_missing and not no_font.available
+    with pytest.raises(DocumentRenderError) as raised:
+        no_font.render(text)
+    assert raised.value.status == "unavailable"
+
+    # A compile that fails for any other reason is still an error.
+    failing = DocumentStore(pdf_renderer=PdfRenderer(LatexCompiler([sys.executable, "-c", "raise SystemExit(1)"])))
+    with pytest.raises(DocumentRenderError) as raised:
+        failing.render(failing.register(text), "pdf")
+    assert raised.value.status == "failed"
+
+
+def test_optimize_returns_text_and_serves_downloads(monkeypatch, tmp_path, fake_renderer):
+    class FakeLLM:
+        async def agenerate(self, prompt, tool=None, use_cache=True):
+            return "  Optimized resume\n- Led migrations  "
+
+    monkeypatch.setattr(available_tools.optimize_resume, "llm", FakeLLM(), raising=False)
+    monkeypatch.setattr(available_tools, "_DOCUMENTS", DocumentStore(pdf_renderer=fake_renderer))
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    client = TestClient(app)
+
+    body = client.post("/optimize", json={"request": {"text": "cv"}, "role": "Data / ML Engineer"}).json()
+    assert body["optimized_content"] == "Optimized resume\n- Led migrations"
+    assert body["downloads"]["pdf"] == f"/optimize/{body['document_id']}.pdf"
+    assert available_tools._DOCUMENTS.stats()["renders"] == 0
+    assert list(home.iterdir()) == []
+
+    docx = client.get(body["downloads"]["docx"])
+    assert docx.status_code == 200 and docx.content.startswith(b"PK")
+    assert docx.headers["content-disposition"] == 'attachment; filename="optimized_resume_Data_ML_Engineer.docx"'
+    pdf = client.get(body["downloads"]["pdf"])
+    assert pdf.headers["content-type"] == "application/pdf" and b"Led migrations" in pdf.content
+
+    # Without a TeX installation the built-in writer still serves the PDF.
+    available_tools._DOCUMENTS.pdf_renderer = PdfRenderer(LatexCompiler(["no-such-tex"]))
+    other = available_tools._DOCUMENTS.register("Another resume", "QA")
+    fallback = client.get(f"/optimize/{other}.pdf")
+    assert fallback.status_code == 200 and fallback.content == render_basic_pdf("Another resume")
+
+    # A timed-out compile is temporary.
+    available_tools._DOCUMENTS.pdf_renderer = PdfRenderer(
+        LatexCompiler([sys.executable, "-c", "import time; time.sleep(5)"], timeout_seconds=0.5)
+    )
+    slow = available_tools._DOCUMENTS.register("Slow resume", "QA")
+    assert client.get(f"/optimize/{slow}.pdf").status_code == 503
+
+    assert client.get(f"/optimize/{'0' * 64}.pdf").status_code == 404
+    assert client.get(f"/optimize/{body['document_id']}.exe").status_code == 404
@@ -0,0 +1,92 @@
+import asyncio
+
+import numpy as np
+
+from app.services.embeddings import EmbeddingBatcher, EmbeddingCache, encode_cached
+
+
+class CountingModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.array([[len(t), 1.0] for t in texts], dtype="float32")
+
+
+def test_duplicate_chunks_skip_the_model():
+    model = CountingModel()
+    cache = EmbeddingCache("fake-model")
+
+    first = encode_cached(model, ["a", "bb", "a"], cache)
+    assert model.encoded == ["a", "bb"]
+    assert first.shape == (3, 2)
+
+    second = encode_cached(model, ["bb", "a"], cache)
+    assert model.encoded == ["a", "bb"]
+    assert np.array_equal(second, first[[1, 0]])
+    assert cache.stats()["hits"] >= 2
+
+
+def test_cache_key_includes_model_name():
+    assert EmbeddingCache("m1").key("x") != EmbeddingCache("m2").key("x")
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    db = str(tmp_path / "cache.sqlite")
+    encode_cached(CountingModel(), ["persist me"], EmbeddingCache("fake-model", db_path=db))
+
+    model = CountingModel()
+    cache = EmbeddingCache("fake-model", db_path=db)
+    vec = encode_cached(model, ["persist me"], cache)
+    assert model.encoded == []
+    assert vec[0].tolist() == [10.0, 1.0]
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_batcher_coalesces_concurrent_requests():
+    model = CountingModel()
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return model.encode(texts)
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=100, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.encode(["one"]),
+            batcher.encode(["two", "three"]),
+            batcher.encode(["four"])
+        )
+
+    results = asyncio.run(run())
+    assert calls == [["one", "two", "three", "four"]]
+    assert [r[:, 0].tolist() for r in results] == [[3.0], [3.0, 5.0], [4.0]]
+    assert batcher.stats()["batches"] == 1
+
+
+def test_batcher_flushes_at_max_batch_size_and_propagates_errors():
+    calls = []
+
+    def encode(texts):
+        calls.append(len(texts))
+        if "boom" in texts:
+            raise ValueError("boom")
+        return np.zeros((len(texts), 2), dtype="float32")
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=2, max_wait_ms=1000)
+
+    async def run():
+        ok = await asyncio.wait_for(batcher.encode(["a", "b"]), timeout=1)
+        try:
+            await asyncio.wait_for(batcher.encode(["boom", "c"]), timeout=1)
+        except ValueError:
+            return ok, True
+        return ok, False
+
+    ok, raised = asyncio.run(run())
+    assert ok.shape == (2, 2)
+    assert raised
+    assert calls == [2, 2]
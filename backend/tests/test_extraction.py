@@ -0,0 +1,96 @@
+import io
+import time
+import asyncio
+
+import pytest
+
+from app.services.extraction import ExtractionService, ExtractionTimeout, _time_limited, extract_document
+
+
+def _pdf(page_texts) -> bytes:
+    """A minimal text PDF, one line of Helvetica per page."""
+    n = len(page_texts)
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(n))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {n} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 3 0 R >> >> >>".encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+@pytest.fixture
+def service():
+    service = ExtractionService(workers=2, timeout_seconds=30, pages_per_task=4, parallel_min_pages=8)
+    yield service
+    service.shutdown()
+
+
+def test_large_pdf_is_split_into_page_ranges_and_kept_in_order(service):
+    data = _pdf([f"Page {i} Python" for i in range(20)])
+    result = asyncio.run(service.extract(data, "cv.pdf"))
+    assert result["status"] == "success" and result["pages"] == 20
+    assert result["report"].splitlines() == [f"Page {i} Python" for i in range(20)]
+    assert extract_document(io.BytesIO(data), ".pdf") == result["report"]
+
+
+def test_repeated_and_concurrent_uploads_share_one_extraction(service):
+    data = _pdf(["Experience", "Education"])
+
+    async def run():
+        first = await asyncio.gather(service.extract(data, "a.pdf"), service.extract(data, "b.pdf"))
+        return first, await service.extract(data, "c.pdf")
+
+    (a, b), c = asyncio.run(run())
+    assert a["report"] == b["report"] == c["report"] == "Experience\nEducation"
+    assert not a["cached"] and c["cached"]
+    assert service.stats()["misses"] == 1 and service.stats()["hits"] == 1
+
+
+def test_broken_document_fails_alone(service):
+    bad = asyncio.run(service.extract(b"%PDF-1.4 not really a pdf", "bad.pdf"))
+    assert bad["status"] == "error" and service.failures == 1
+    good = asyncio.run(service.extract(_pdf(["Skills"]), "cv.pdf"))
+    assert good["report"] == "Skills"
+
+
+def test_docx_and_plain_text(service):
+    docx = pytest.importorskip("docx")
+    doc = docx.Document()
+    doc.add_paragraph("Built data pipelines")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    assert asyncio.run(service.extract(buffer.getvalue(), "cv.docx"))["report"] == "Built data pipelines"
+    assert asyncio.run(service.extract(b"plain resume", "cv.txt"))["report"] == "plain resume"
+
+
+def test_time_limit_interrupts_work():
+    start = time.monotonic()
+    with pytest.raises(ExtractionTimeout):
+        _time_limited(0.05, time.sleep, 5)
+    assert time.monotonic() - start < 1
+
+
+def test_recycle_only_replaces_the_failed_calls_pool(service):
+    failed = service._executor()
+    service._recycle(failed)
+    current = service._executor()
+    assert current is not failed
+
+    # A second call that failed on the old pool must not kill the new one.
+    service._recycle(failed)
+    assert service._executor() is current
@@ -0,0 +1,155 @@
+import time
+import threading
+import urllib.request
+from concurrent.futures import wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.services.job_search import BrowserPool, JobSearcher, parse_job_cards
+
+pytest.importorskip("selenium")
+
+RESULTS_PAGE = """
+<html><body>
+<ul class="jobs-search__results-list">
+  <li><div class="base-card">
+    <a class="base-card__full-link" href="https://example.com/jobs/1">
+      <span>{role}</span></a>
+    <h3 class="base-search-card__title">
+        {role} Engineer
+    </h3>
+    <h4><a href="https://example.com/acme">Acme</a></h4>
+  </div></li>
+  <li><h3>Data Engineer</h3><h4>Globex</h4><a href="https://example.com/jobs/2">view</a></li>
+  <li><h4>No title, skipped</h4></li>
+</ul>
+<ul class="footer"><li><h3>Not a job</h3></li></ul>
+</body></html>
+"""
+
+
+class FixtureServer:
+    def __init__(self, delay: float = 0):
+        self.hits = 0
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                outer.hits += 1
+                time.sleep(delay)
+                query = parse_qs(urlparse(self.path).query)
+                role = query.get("keywords", [""])[0]
+                body = (RESULTS_PAGE.format(role=role) if role != "nothing" else "<html></html>").encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/jobs/search/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+class FakeDriver:
+    """The slice of the WebDriver API the searcher uses, over plain HTTP."""
+
+    def __init__(self):
+        self.page_source = ""
+        self.healthy = True
+        self.quit_called = False
+
+    def get(self, url):
+        self.page_source = urllib.request.urlopen(url).read().decode()
+
+    def find_elements(self, by, selector):
+        return ["card"] if "jobs-search__results-list" in self.page_source else []
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("session deleted")
+        return "complete" if "readyState" in script else 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def server():
+    server = FixtureServer()
+    yield server
+    server.close()
+
+
+def test_parse_job_cards_reads_only_result_cards():
+    jobs = parse_job_cards(RESULTS_PAGE.format(role="Python"))
+    assert jobs == [
+        {"title": "Python Engineer", "company": "Acme", "link": "https://example.com/jobs/1"},
+        {"title": "Data Engineer", "company": "Globex", "link": "https://example.com/jobs/2"},
+    ]
+
+
+def test_browser_is_reused_and_results_cached(server):
+    searcher = JobSearcher(BrowserPool(FakeDriver, size=2), base_url=server.url, cache_ttl=60)
+    first = searcher.search("Python Developer", "India")
+    assert first["jobs"][0]["title"] == "Python Developer Engineer" and not first["cached"]
+    assert searcher.search("  python   developer", "INDIA")["cached"]
+    assert searcher.search("Go", "India")["jobs"][0]["title"] == "Go Engineer"
+    assert searcher.search("nothing", "India")["jobs"] == []
+    assert server.hits == 3
+    assert searcher.pool.started == 1
+
+
+def test_empty_results_are_cached_briefly(server):
+    searcher = JobSearcher(BrowserPool(FakeDriver, size=1), base_url=server.url, cache_ttl=60, empty_ttl=0)
+    assert searcher.search("nothing", "India")["jobs"] == []
+    assert not searcher.search("nothing", "India")["cached"]
+    assert server.hits == 2
+
+    searcher.empty_ttl = 60
+    searcher.search("nothing", "India")
+    assert searcher.search("nothing", "India")["cached"]
+    assert server.hits == 3
+
+
+def test_identical_inflight_searches_are_coalesced():
+    server = FixtureServer(delay=0.3)
+    try:
+        searcher = JobSearcher(BrowserPool(FakeDriver, size=4), base_url=server.url)
+        futures = [searcher.submit("Python", "Remote") for _ in range(5)]
+        wait(futures)
+        assert all(f.result()["jobs"] for f in futures)
+        assert server.hits == 1
+    finally:
+        server.close()
+
+
+def test_unhealthy_and_failing_sessions_are_replaced(server):
+    drivers = []
+
+    def factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    searcher = JobSearcher(BrowserPool(factory, size=1, max_uses=2), base_url=server.url, cache_ttl=0)
+    searcher.search("A", "X")
+    drivers[0].healthy = False
+    searcher.search("A", "X")
+    assert drivers[0].quit_called and len(drivers) == 2
+
+    # Second use of drivers[1] reaches max_uses and retires it.
+    searcher.search("A", "X")
+    assert drivers[1].quit_called
+
+    broken = JobSearcher(BrowserPool(factory, size=1), base_url="http://127.0.0.1:1/")
+    with pytest.raises(Exception):
+        broken.search("A", "X")
+    assert drivers[-1].quit_called and broken.stats()["errors"] == 1
+    assert broken.stats()["cache_entries"] == 0
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import available_tools
+from app.services.job_sources import FeedJobSource, FileJobSource, JobAggregator, dedupe_listings
+
+
+class StaticSource:
+    def __init__(self, name, jobs, delay=0.0, deadline=1.0, error=None):
+        self.name, self.jobs, self.delay, self.deadline, self.error = name, jobs, delay, deadline, error
+
+    async def search(self, role, location, limit):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return [dict(job, source=self.name) for job in self.jobs][:limit]
+
+
+def _job(title, company, link=""):
+    return {"title": title, "company": company, "link": link}
+
+
+def test_dedupe_by_link_and_by_title_company():
+    jobs = dedupe_listings([
+        _job("Python Developer", "Acme", "https://www.example.com/jobs/1?trk=a"),
+        _job("Python developer (Remote)", "ACME Inc", "https://example.com/jobs/1/"),
+        _job("python  developer", "acme", "https://other.example/42"),
+        _job("Go Developer", "Acme"),
+    ])
+    assert [j["title"] for j in jobs] == ["Python Developer", "Go Developer"]
+
+
+def test_slow_and_failing_sources_do_not_hold_up_the_others():
+    aggregator = JobAggregator([
+        StaticSource("fast", [_job("Python Developer", "Acme", "https://a.example/1")]),
+        StaticSource("slow", [_job("Data Engineer", "Globex")], delay=5, deadline=0.2),
+        StaticSource("broken", [], error="feed down"),
+        StaticSource("dupes", [_job("Python Developer", "Acme", "https://b.example/9")]),
+    ])
+    start = time.monotonic()
+    result = asyncio.run(aggregator.search("python", "india"))
+    assert time.monotonic() - start < 1
+    assert [j["source"] for j in result["jobs"]] == ["fast"]
+    assert result["partial"]
+    assert result["sources"]["slow"]["status"] == "timeout"
+    assert result["sources"]["broken"] == {"status": "error", "count": 0, "error": "feed down",
+                                           "ms": result["sources"]["broken"]["ms"]}
+    assert result["sources"]["dupes"]["count"] == 1
+
+
+def test_file_source_filters_and_reloads(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("\n".join(json.dumps(j) for j in [
+        {"position": "Senior Python Developer", "employer": "Acme", "url": "https://a/1", "location": "Pune"},
+        {"title": "Python Developer", "company": {"name": "Initech"}, "link": "https://a/2", "location": "Remote"},
+        {"title": "Java Developer", "company": "Globex", "link": "https://a/3"},
+    ]))
+    source = FileJobSource(str(path))
+    jobs = asyncio.run(source.search("python developer", "Bengaluru", 10))
+    assert [(j["title"], j["company"]) for j in jobs] == [("Python Developer", "Initech")]
+    assert len(asyncio.run(source.search("python developer", "pune", 10))) == 2
+
+    path.write_text(json.dumps({"title": "Python Developer", "company": "New"}))
+    # A distinct mtime, even on coarse-grained filesystems.
+    later = path.stat().st_mtime + 1
+    os.utime(path, (later, later))
+    assert [j["company"] for j in asyncio.run(source.search("python", "", 10))] == ["New"]
+
+
+def test_feed_source_reads_json_over_http():
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requested.append(self.path)
+            body = json.dumps({"results": [{"job_title": "Python Developer", "company_name": "Acme",
+                                            "apply_url": "https://feed.example/7"}, {"company": "no title"}]})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        source = FeedJobSource(f"http://127.0.0.1:{server.server_port}/api?q={{role}}&l={{location}}")
+        async def fetch():
+            try:
+                return await source.search("python dev", "New York", 10)
+            finally:
+                await source.aclose()
+
+        jobs = asyncio.run(fetch())
+    finally:
+        server.shutdown()
+    assert requested == ["/api?q=python%20dev&l=New%20York"]
+    assert jobs == [{"source": "feed", "title": "Python Developer", "company": "Acme",
+                     "link": "https://feed.example/7", "location": ""}]
+
+
+def test_jobs_endpoint_returns_partial_results(monkeypatch):
+    monkeypatch.setattr(available_tools, "_JOB_SOURCES", JobAggregator([
+        StaticSource("file", [_job("Python Developer", "Acme", "https://a.example/1")]),
+        StaticSource("linkedin", [], delay=5, deadline=0.1),
+    ]))
+    client = TestClient(app)
+    body = client.post("/jobs", json={"role": "Python", "location": "India"}).json()
+    assert body["jobs"][0]["source"] == "file" and body["partial"]
+    assert body["sources"]["linkedin"]["status"] == "timeout"
+
+    monkeypatch.setattr(available_tools, "_JOB_SOURCES", JobAggregator([StaticSource("x", [], error="down")]))
+    assert client.post("/jobs", json={"role": "Python", "location": "India"}).status_code == 500
+
+
+def test_slow_feed_is_cancelled_at_its_deadline():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(3)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    source = FeedJobSource(f"http://127.0.0.1:{server.server_port}/api", deadline=0.3)
+    aggregator = JobAggregator([source])
+
+    async def search():
+        try:
+            return await aggregator.search("python", "india")
+        finally:
+            await aggregator.aclose()
+
+    try:
+        # asyncio.run also waits for worker threads, so a request left running
+        # in one would hold this up until the server answered.
+        start = time.monotonic()
+        result = asyncio.run(search())
+        assert time.monotonic() - start < 2
+    finally:
+        server.shutdown()
+    assert result["sources"]["feed"]["status"] == "timeout"
+
+
+def test_browser_deadline_covers_the_scraper_wait():
+    from app.services.job_search import BrowserPool, JobSearcher
+    from app.services.job_sources import BrowserJobSource, job_aggregator_from_env
+
+    searcher = JobSearcher(BrowserPool(size=1), wait_seconds=10)
+    assert BrowserJobSource(searcher).deadline > searcher.wait_seconds
+    assert job_aggregator_from_env(searcher).sources[0].deadline > searcher.wait_seconds
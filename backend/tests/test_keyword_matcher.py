@@ -0,0 +1,25 @@
+from app.services.keyword_matcher import KeywordMatcher
+
+
+def test_word_boundaries_prevent_substring_false_positives():
+    matcher = KeywordMatcher(["java", "git", "sql", "c++", "c"])
+    found = matcher.matches("JavaScript on GitHub with MySQL")
+    assert found == {}
+
+
+def test_synonyms_map_to_canonical_keywords_with_positions():
+    matcher = KeywordMatcher({"kubernetes": ["k8s"], "machine learning": ["ml"]})
+    text = "Ran K8s clusters; machine-learning and ML pipelines"
+    assert matcher.matches(text) == {"kubernetes": [4], "machine learning": [18, 39]}
+
+
+def test_longest_keyword_wins():
+    matcher = KeywordMatcher(["github", "github actions", "c", "c++"])
+    assert [k for k, _, _ in matcher.find("GitHub Actions, C++ and C")] == ["github actions", "c++", "c"]
+
+
+def test_large_lexicon_compiles_into_one_pattern():
+    keywords = [f"skill{i}" for i in range(5000)]
+    matcher = KeywordMatcher(keywords)
+    assert matcher.matches("skill42 and skill4999 but not skill42x") == {"skill42": [0], "skill4999": [12]}
+    assert matcher.coverage("skill1") == 1 / 5000
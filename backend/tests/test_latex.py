@@ -0,0 +1,134 @@
+import sys
+import asyncio
+import textwrap
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import available_tools
+from app.services.latex import LatexCompiler, latex_id
+
+# Stands in for pdflatex: "writes" the .tex source out as the PDF, fails on
+# \fail, hangs on \hang, reports its resource limits on \limits, and counts
+# its runs in calls.txt next to itself.
+FAKE_TEX = textwrap.dedent("""
+    import os, sys, time, resource
+    counter = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calls.txt")
+    with open(counter, "a") as f:
+        f.write("x")
+    source = open(sys.argv[-1]).read()
+    if "\\\\hang" in source:
+        time.sleep(30)
+    if "\\\\limits" in source:
+        time.sleep(0.2)  # limits are applied by the parent just after spawn
+        source = str([resource.getrlimit(r)[0] for r in (resource.RLIMIT_CPU, resource.RLIMIT_AS, resource.RLIMIT_FSIZE)])
+    if "\\\\fail" in source:
+        print("! Undefined control sequence.")
+        print("l.1 \\\\fail")
+        sys.exit(1)
+    open(sys.argv[-1].replace(".tex", ".pdf"), "wb").write(b"%PDF-" + source.encode())
+""")
+
+
+@pytest.fixture
+def fake_tex(tmp_path):
+    script = tmp_path / "fake_tex.py"
+    script.write_text(FAKE_TEX)
+    return [sys.executable, str(script)], tmp_path / "calls.txt"
+
+
+def _calls(counter) -> int:
+    return len(counter.read_text()) if counter.exists() else 0
+
+
+def test_compiles_once_per_source_and_serves_by_id(fake_tex, tmp_path):
+    command, counter = fake_tex
+    compiler = LatexCompiler(command, workers=2, store_dir=str(tmp_path / "pdfs"))
+    first = compiler.compile("hello")
+    second = compiler.compile("hello")
+    assert first["status"] == "ok" and first["pdf"] == b"%PDF-hello" and not first["cached"]
+    assert second["cached"] and second["id"] == first["id"] == latex_id("hello")
+    assert _calls(counter) == 1
+
+    # A fresh compiler sharing the directory still serves the PDF.
+    reopened = LatexCompiler(command, store_dir=str(tmp_path / "pdfs"))
+    assert reopened.get_pdf(first["id"]) == b"%PDF-hello"
+    assert reopened.get_pdf("../etc/passwd") is None
+
+
+def test_limits_apply_to_the_compiler_process(fake_tex):
+    command, _ = fake_tex
+    compiler = LatexCompiler(command, timeout_seconds=5, memory_mb=2048, max_output_mb=3)
+    result = compiler.compile("\\limits")
+    assert result["pdf"] == b"%PDF-" + str([6, 2048 * 1024 * 1024, 3 * 1024 * 1024]).encode()
+
+
+def test_concurrent_identical_sources_share_one_job(fake_tex):
+    command, counter = fake_tex
+    compiler = LatexCompiler(command, workers=4)
+    futures = [compiler.submit("same") for _ in range(5)]
+    assert {f.result()["status"] for f in futures} == {"ok"}
+    assert _calls(counter) == 1
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_job(fake_tex, monkeypatch):
+    command, counter = fake_tex
+
+    class FakeLLM:
+        async def agenerate(self, prompt, tool=None, use_cache=True):
+            await asyncio.sleep(0)
+            return "\\limits"  # the fake compiler sleeps on this, so both wait on one job
+
+    monkeypatch.setattr(available_tools, "_LATEX", LatexCompiler(command))
+    monkeypatch.setattr(available_tools.latex_resume_preview, "llm", FakeLLM(), raising=False)
+
+    async def run():
+        gone = asyncio.create_task(available_tools.latex_resume_preview_async("cv", "Engineer", use_cache=False))
+        kept = asyncio.create_task(available_tools.latex_resume_preview_async("cv", "Engineer", use_cache=False))
+        await asyncio.sleep(0.05)
+        gone.cancel()
+        return await kept
+
+    assert asyncio.run(run())["compile_status"] == "ok"
+    assert _calls(counter) == 1
+
+
+def test_failures_report_the_error_and_timeouts_are_killed(fake_tex):
+    command, counter = fake_tex
+    compiler = LatexCompiler(command, timeout_seconds=1)
+    failed = compiler.compile("\\fail")
+    assert failed["status"] == "failed" and failed["log"].startswith("! Undefined control sequence.")
+    assert compiler.compile("\\fail")["cached"]
+
+    hung = compiler.compile("\\hang")
+    assert hung["status"] == "timeout" and hung["pdf"] is None
+    assert compiler.stats()["timeouts"] == 1
+    # Timeouts are not cached.
+    assert not compiler.compile("\\hang")["cached"]
+
+
+def test_missing_compiler_is_reported():
+    result = LatexCompiler(["definitely-not-pdflatex"]).compile("x")
+    assert result["status"] == "unavailable" and result["pdf"] is None
+
+
+def test_preview_endpoint_returns_pdf_url(fake_tex, monkeypatch):
+    command, _ = fake_tex
+
+    class FakeLLM:
+        async def agenerate(self, prompt, tool=None, use_cache=True):
+            return "\\section{Experience}"
+
+    monkeypatch.setattr(available_tools, "_LATEX", LatexCompiler(command))
+    monkeypatch.setattr(available_tools.latex_resume_preview, "llm", FakeLLM(), raising=False)
+    client = TestClient(app)
+
+    body = client.post("/preview/latex", json={"request": {"text": "cv"}, "role": "Engineer"}).json()
+    assert body["compile_status"] == "ok" and "pdf_base64" not in body
+    assert body["pdf_url"] in body["html_preview"]
+
+    pdf = client.get(body["pdf_url"])
+    assert pdf.status_code == 200 and pdf.headers["content-type"] == "application/pdf"
+    assert pdf.content.startswith(b"%PDF-") and b"\\section{Experience}" in pdf.content
+    assert client.get(f"/preview/latex/{'0' * 64}.pdf").status_code == 404
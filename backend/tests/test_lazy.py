@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+from app.services.lazy import LazyResource, resource_status, warm_up
+
+
+@pytest.fixture
+def registered():
+    # Resources made by a test must not linger in /ready, /stats or warm_up().
+    resources = []
+    yield resources
+    for resource in resources:
+        resource.unregister()
+
+
+def test_lazy_resource_builds_once_across_threads(registered):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    resource = LazyResource("test-once", factory)
+    registered.append(resource)
+    assert not resource.loaded
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resource.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert resource_status()["test-once"]["loaded"]
+
+
+def test_warm_up_collects_errors(registered):
+    def broken():
+        raise RuntimeError("no model")
+
+    registered.append(LazyResource("test-broken", broken))
+    assert warm_up(["test-broken"]) == {"test-broken": "no model"}
+
+
+def test_unregistered_resources_are_not_reported():
+    hidden = LazyResource("test-hidden", object, register=False)
+    assert hidden.get() is hidden.get()
+    assert "test-hidden" not in resource_status()
+
+    shown = LazyResource("test-shown", object)
+    shown.unregister()
+    assert "test-shown" not in resource_status()
@@ -0,0 +1,127 @@
+import json
+import time
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import available_tools
+
+
+class SlowAsyncLLM:
+    """Local stand-in for the Gemini wrapper with a fixed generation delay."""
+
+    def __init__(self, delay=0.2, text="ATS Match Score: 77\nLooks good."):
+        self.delay = delay
+        self.text = text
+        self.calls = 0
+
+    def generate(self, prompt, **kwargs):
+        raise AssertionError("async endpoints must not call the blocking path")
+
+    async def agenerate(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.text
+
+
+def _use_llm(monkeypatch, llm):
+    for tool in (available_tools.summarize_resume, available_tools.ats_ai_feedback, available_tools.rag_query,
+                 available_tools.optimize_resume, available_tools.latex_resume_preview):
+        monkeypatch.setattr(tool, "llm", llm, raising=False)
+
+
+def test_concurrent_generation_does_not_serialize(monkeypatch):
+    llm = SlowAsyncLLM(delay=0.3)
+    _use_llm(monkeypatch, llm)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.post("/analyze/summary", json={"text": f"resume {i}"}) for i in range(5)
+            ])
+            return responses, time.perf_counter() - start
+
+    responses, elapsed = asyncio.run(run())
+    assert all(r.status_code == 200 for r in responses)
+    assert llm.calls == 5
+    # Five sequential calls would take 1.5s.
+    assert elapsed < 1.0
+
+
+def test_ats_feedback_async_parses_score(monkeypatch):
+    _use_llm(monkeypatch, SlowAsyncLLM(delay=0))
+    result = asyncio.run(available_tools.ats_ai_feedback_async("resume", "job"))
+    assert result["score"] == 77
+
+
+def test_sync_only_llm_falls_back_to_thread(monkeypatch):
+    class SyncLLM:
+        def generate(self, prompt, **kwargs):
+            return " summary "
+
+    _use_llm(monkeypatch, SyncLLM())
+    result = asyncio.run(available_tools.summarize_resume_async("resume"))
+    assert result == {"status": "success", "report": "summary"}
+
+
+class StreamingLLM(SlowAsyncLLM):
+    async def agenerate_stream(self, prompt, **kwargs):
+        for delta in ["Hello", ", ", "world"]:
+            yield delta
+
+
+def _sse_payloads(body):
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+def test_summary_stream_emits_deltas(monkeypatch):
+    _use_llm(monkeypatch, StreamingLLM())
+    with TestClient(app) as client:
+        response = client.post("/analyze/summary/stream", json={"text": "resume"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_payloads(response.text)
+    assert "".join(e["delta"] for e in events if "delta" in e) == "Hello, world"
+    assert events[-1] == {"done": True}
+
+
+def test_chat_stream_unknown_resume_is_a_client_error(monkeypatch):
+    _use_llm(monkeypatch, StreamingLLM())
+    with TestClient(app) as client:
+        response = client.post("/chat/stream", json={"query": "hi", "resume_id": "0" * 32})
+    assert response.status_code == 400
+
+
+def test_full_analysis_runs_parts_concurrently(monkeypatch):
+    _use_llm(monkeypatch, SlowAsyncLLM(delay=0.3))
+    payload = {"resume_text": "Python developer with AWS experience", "role": "Python Developer", "job_description": "Python and AWS"}
+
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        response = client.post("/analyze/full", json=payload, params={"use_cache": "false"})
+        elapsed = time.perf_counter() - start
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["status"] == "success"
+    assert body["match_score"] == 77
+    assert body["summary"] and body["ats_report"]["overall_score"] >= 0
+    # Summary and AI feedback overlap instead of taking 0.6s back to back.
+    assert elapsed < 0.55
+
+
+def test_full_analysis_streams_parts_as_they_complete(monkeypatch):
+    _use_llm(monkeypatch, SlowAsyncLLM(delay=0.05))
+    payload = {"resume_text": "resume", "role": "Engineer", "job_description": "job"}
+    with TestClient(app) as client:
+        response = client.post("/analyze/full", json=payload, params={"stream": "true"})
+
+    events = _sse_payloads(response.text)
+    # The heuristic score needs no LLM call, so it arrives first.
+    assert events[0]["part"] == "ats_report"
+    assert {e["part"] for e in events[:-1]} == {"ats_report", "summary", "ai_feedback"}
+    assert events[-1] == {"done": True}
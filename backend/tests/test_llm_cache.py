@@ -0,0 +1,76 @@
+import time
+import asyncio
+from types import SimpleNamespace
+
+from app.services.agent import AgentLLMWrapper
+from app.services.llm_cache import LLMResponseCache, MemoryBackend, SQLiteBackend, ttl_for
+
+
+class FakeModels:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, model, contents):
+        self.calls += 1
+        return SimpleNamespace(text=f"answer {self.calls}")
+
+
+def _wrapper(cache):
+    models = FakeModels()
+
+    async def agenerate_content(model, contents):
+        return models.generate_content(model, contents)
+
+    client = SimpleNamespace(models=models, aio=SimpleNamespace(models=SimpleNamespace(generate_content=agenerate_content)))
+    agent = SimpleNamespace(canonical_model=SimpleNamespace(model="fake-model", api_client=client))
+    return AgentLLMWrapper(agent, cache=cache), models
+
+
+def test_wrapper_serves_repeated_prompts_from_cache():
+    cache = LLMResponseCache(MemoryBackend())
+    llm, models = _wrapper(cache)
+
+    assert llm.generate("Summarize  this\n", tool="summarize_resume") == "answer 1"
+    # Whitespace-only differences normalize to the same key.
+    assert llm.generate("Summarize this", tool="summarize_resume") == "answer 1"
+    assert asyncio.run(llm.agenerate("Summarize this", tool="summarize_resume")) == "answer 1"
+    assert models.calls == 1
+    assert cache.stats()["hits"] == 2
+
+
+def test_wrapper_opt_out_bypasses_cache():
+    llm, models = _wrapper(LLMResponseCache(MemoryBackend()))
+    llm.generate("prompt")
+    assert llm.generate("prompt", use_cache=False) == "answer 2"
+    assert models.calls == 2
+
+
+def test_zero_ttl_disables_caching_for_a_tool(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_TTL_RAG_QUERY", "0")
+    assert ttl_for("rag_query") == 0
+    llm, models = _wrapper(LLMResponseCache(MemoryBackend()))
+    llm.generate("q", tool="rag_query")
+    llm.generate("q", tool="rag_query")
+    assert models.calls == 2
+
+
+def test_memory_backend_expires_and_bounds_size():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", "1", ttl=60)
+    backend.set("b", "2", ttl=60)
+    backend.set("c", "3", ttl=60)
+    assert backend.get("a") is None
+    backend.set("d", "4", ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get("d") is None
+
+
+def test_sqlite_backend_persists_and_bounds_size(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    backend = SQLiteBackend(path, max_entries=2)
+    for key in ("a", "b", "c"):
+        backend.set(key, key.upper(), ttl=60)
+    reopened = SQLiteBackend(path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.get("c") == "C"
+    assert reopened.get("a") is None
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from app.services.rate_limit import LLMDeadlineExceeded, LLMLimiter, LLMOverloadedError
+
+
+class ProviderError(Exception):
+    def __init__(self, code):
+        super().__init__(f"provider returned {code}")
+        self.code = code
+
+
+class FakeLLM:
+    """Local stand-in for the provider: fails `failures` times, then answers."""
+
+    def __init__(self, failures=0, code=429, delay=0.0):
+        self.failures = failures
+        self.code = code
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    def generate(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ProviderError(self.code)
+        return "ok"
+
+    async def agenerate(self):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return "ok"
+
+
+def _limiter(**kwargs):
+    options = dict(rate=1000, burst=1000, retry_base=0.001, retry_max=0.01)
+    options.update(kwargs)
+    return LLMLimiter(**options)
+
+
+def test_retries_retryable_errors_then_succeeds():
+    llm = FakeLLM(failures=2, code=429)
+    limiter = _limiter()
+    assert limiter.call(llm.generate) == "ok"
+    assert llm.calls == 3
+    assert limiter.stats()["retries"] == 2
+
+
+def test_non_retryable_errors_fail_immediately():
+    llm = FakeLLM(failures=5, code=400)
+    with pytest.raises(ProviderError):
+        _limiter().call(llm.generate)
+    assert llm.calls == 1
+
+
+def test_concurrency_cap_holds_under_burst():
+    llm = FakeLLM(delay=0.02)
+    limiter = _limiter(max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(*[limiter.acall(llm.agenerate) for _ in range(8)])
+
+    assert asyncio.run(run()) == ["ok"] * 8
+    assert llm.peak == 2
+    assert limiter.stats()["max_queue_depth"] >= 1
+
+
+def test_full_queue_rejects_fast():
+    llm = FakeLLM(delay=0.05)
+    limiter = _limiter(max_concurrency=1, max_queue=1)
+
+    async def run():
+        return await asyncio.gather(*[limiter.acall(llm.agenerate) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert sum(isinstance(r, LLMOverloadedError) for r in results) == 1
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_deadline_cancels_slow_calls():
+    llm = FakeLLM(delay=1)
+    limiter = _limiter(deadline=0.05)
+    with pytest.raises(LLMDeadlineExceeded):
+        asyncio.run(limiter.acall(llm.agenerate))
+    assert limiter.stats()["deadline_exceeded"] == 1
+
+
+def test_token_bucket_paces_requests():
+    limiter = LLMLimiter(rate=50, burst=1)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*[limiter.acall(FakeLLM().agenerate) for _ in range(4)])
+        return loop.time() - start
+
+    # One token up front, then three more at 50/s.
+    assert asyncio.run(run()) >= 0.05
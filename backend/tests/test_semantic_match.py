@@ -0,0 +1,56 @@
+import zlib
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import available_tools
+from app.services.available_tools import _split_requirements, requirement_coverage
+from app.services.embeddings import EmbeddingBatcher
+
+client = TestClient(app)
+
+
+def _bag_of_words(texts):
+    # Deterministic stand-in for the sentence model: hashed word counts.
+    vectors = np.zeros((len(texts), 64), dtype="float32")
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, zlib.crc32(word.strip(".,").encode()) % 64] += 1
+    return vectors
+
+
+def test_split_requirements_strips_bullets_and_short_lines():
+    jd = "About us\n- 5+ years of Python experience\n* Build REST APIs with FastAPI. Own deployments end to end."
+    assert _split_requirements(jd) == [
+        "5+ years of Python experience", "Build REST APIs with FastAPI.", "Own deployments end to end."
+    ]
+
+
+def test_requirement_coverage_picks_best_chunk_and_scores():
+    reqs = np.array([[1, 0, 0], [0, 1, 0]], dtype="float32")
+    chunks = np.array([[0.1, 1, 0], [1, 0, 0]], dtype="float32")
+    best, best_idx, score = requirement_coverage(reqs, chunks, threshold=0.9, floor=0.1)
+    assert list(best_idx) == [1, 0]
+    assert np.allclose(best, [1.0, 0.995], atol=1e-3)
+    assert score == 100.0
+
+    _, _, none = requirement_coverage(reqs, np.array([[0, 0, 1]], dtype="float32"), threshold=0.9, floor=0.1)
+    assert none == 0.0
+
+
+def test_ats_endpoint_reports_semantic_coverage_without_llm(monkeypatch):
+    monkeypatch.setattr(available_tools, "_EMBED_BATCHER", EmbeddingBatcher(_bag_of_words, max_wait_ms=1))
+    payload = {
+        "resume_text": "I build REST APIs with FastAPI and Python.",
+        "role": "Backend Developer",
+        "job_description": "- Build REST APIs with FastAPI\n- Manage Kubernetes clusters on bare metal"
+    }
+    response = client.post("/analyze/ats?ai_feedback=false", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    coverage = {c["requirement"]: c for c in body["requirement_coverage"]}
+    assert coverage["Build REST APIs with FastAPI"]["covered"]
+    assert not coverage["Manage Kubernetes clusters on bare metal"]["covered"]
+    assert 0 < body["semantic_score"] < 100
+    assert body["ai_feedback"] is None
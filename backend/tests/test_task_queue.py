@@ -0,0 +1,133 @@
+import json
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services import available_tools
+from app.services.task_queue import (
+    IdempotencyConflict, MemoryTaskStore, QueueFullError, TaskQueue, FAILED, SUCCEEDED
+)
+
+
+async def _finished(queue, task_id):
+    async for record in queue.watch(task_id):
+        last = record
+    return last
+
+
+def test_tasks_run_in_background_on_bounded_workers():
+    running, peak, calls = 0, 0, []
+
+    async def handler(value):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return {"status": "success", "report": value * 2}
+
+    async def run():
+        queue = TaskQueue(MemoryTaskStore(), workers=2)
+        queue.register("double", handler)
+        records = [(await queue.submit("double", {"value": i}))[0] for i in range(5)]
+        assert {r["status"] for r in records} == {"queued"}
+        return [await _finished(queue, r["id"]) for r in records]
+
+    results = asyncio.run(run())
+    assert [r["result"]["report"] for r in results] == [0, 2, 4, 6, 8]
+    assert all(r["status"] == SUCCEEDED and r["finished_at"] >= r["started_at"] for r in results)
+    assert peak == 2 and sorted(calls) == [0, 1, 2, 3, 4]
+
+
+def test_idempotency_key_runs_work_once_and_rejects_other_payloads():
+    calls = []
+
+    async def handler(role):
+        calls.append(role)
+        return {"status": "success", "report": role}
+
+    async def run():
+        queue = TaskQueue(MemoryTaskStore())
+        queue.register("search", handler)
+        first, created = await queue.submit("search", {"role": "dev"}, "key-1")
+        again, created_again = await queue.submit("search", {"role": "dev"}, "key-1")
+        with pytest.raises(IdempotencyConflict):
+            await queue.submit("search", {"role": "ops"}, "key-1")
+        await _finished(queue, first["id"])
+        done, _ = await queue.submit("search", {"role": "dev"}, "key-1")
+        return first, created, again, created_again, done, queue
+
+    first, created, again, created_again, done, queue = asyncio.run(run())
+    assert created and not created_again and again["id"] == first["id"] == done["id"]
+    assert done["status"] == SUCCEEDED and calls == ["dev"]
+    assert queue.deduplicated == 2 and asyncio.run(queue.store.count()) == 1
+
+
+def test_failures_and_full_queue():
+    async def failing():
+        return {"status": "error", "error_message": "LLM unavailable"}
+
+    async def crashing():
+        raise RuntimeError("boom")
+
+    async def run():
+        queue = TaskQueue(MemoryTaskStore(), workers=1, max_pending=2)
+        queue.register("fail", failing)
+        queue.register("crash", crashing)
+        a, _ = await queue.submit("fail", {})
+        b, _ = await queue.submit("crash", {})
+        with pytest.raises(QueueFullError):
+            await queue.submit("fail", {})
+        with pytest.raises(LookupError):
+            await queue.submit("nope", {})
+        return await _finished(queue, a["id"]), await _finished(queue, b["id"])
+
+    failed, crashed = asyncio.run(run())
+    assert failed["status"] == crashed["status"] == FAILED
+    assert failed["error"] == "LLM unavailable" and crashed["error"] == "boom"
+
+
+def test_task_endpoints(monkeypatch):
+    calls = []
+
+    async def fake_optimize(resume_text, role, use_cache=True):
+        calls.append(role)
+        await asyncio.sleep(0.05)
+        return {"status": "success", "report": f"Optimized for {role}"}
+
+    monkeypatch.setattr(available_tools, "optimize_resume_async", fake_optimize)
+    queue = TaskQueue(MemoryTaskStore())
+    queue.register("optimize", lambda **params: available_tools.optimize_resume_async(**params))
+    monkeypatch.setattr(available_tools, "_TASKS", queue)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            body = {"request": {"text": "cv"}, "role": "Engineer"}
+            headers = {"Idempotency-Key": "abc"}
+            submitted = await client.post("/tasks/optimize", json=body, headers=headers)
+            replay = await client.post("/tasks/optimize", json=body, headers=headers)
+            conflict = await client.post("/tasks/optimize", json=dict(body, role="Manager"), headers=headers)
+
+            events = []
+            async with client.stream("GET", submitted.json()["events_url"]) as stream:
+                async for line in stream.aiter_lines():
+                    if line.startswith("data: "):
+                        events.append(json.loads(line[6:]))
+            status = await client.get(submitted.json()["status_url"])
+            missing = await client.get("/tasks/does-not-exist")
+            return submitted, replay, conflict, events, status, missing
+
+    submitted, replay, conflict, events, status, missing = asyncio.run(run())
+    assert submitted.status_code == 202 and replay.status_code == 200
+    assert replay.json()["task_id"] == submitted.json()["task_id"]
+    assert conflict.status_code == 409
+    # The subscription may start after the task has left "queued".
+    statuses = [e["delta"]["status"] for e in events if "delta" in e]
+    assert statuses[-1] == "succeeded" and statuses == [s for s in ("queued", "running", "succeeded") if s in statuses]
+    assert events[-1] == {"done": True}
+    assert status.json()["result"]["report"] == "Optimized for Engineer"
+    assert missing.status_code == 404 and calls == ["Engineer"]
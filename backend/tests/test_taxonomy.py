@@ -0,0 +1,49 @@
+import os
+import json
+
+from app.services.available_tools import ats_report
+from app.services.taxonomy import DEFAULT_ROLE, TaxonomyRegistry
+
+
+def _write(directory, roles):
+    path = os.path.join(directory, "roles.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"roles": roles}, f)
+    return path
+
+
+def test_shipped_taxonomies_resolve_common_titles():
+    registry = TaxonomyRegistry()
+    assert registry.resolve("Python Developer").name == "backend_developer"
+    assert registry.resolve("Senior ML Engineer").name == "machine_learning_engineer"
+    assert registry.resolve("Underwater Basket Weaver").name == DEFAULT_ROLE
+
+
+def test_keyword_score_reflects_target_role():
+    resume = "Skills: Python, Django, PostgreSQL, Redis, Docker, REST APIs. Experience. Education. Projects."
+    backend = ats_report(resume, "Backend Developer")
+    frontend = ats_report(resume, "Frontend Developer")
+    assert backend["taxonomy_role"] == "backend_developer"
+    assert backend["ats_report"]["keyword_score"] > frontend["ats_report"]["keyword_score"]
+    assert "postgresql" in backend["matched_keywords"]
+
+
+def test_weights_and_synonyms(tmp_path):
+    _write(str(tmp_path), {"chef": {"aliases": ["cook"], "keywords": {
+        "knife skills": 3, "plating": {"weight": 1, "synonyms": ["presentation"]}}}})
+    profile = TaxonomyRegistry(str(tmp_path)).resolve("cook")
+    matches = profile.matcher.matches("Great knife-skills")
+    assert profile.keyword_score(matches) == 0.75
+    assert "plating" in profile.matcher.matches("food presentation")
+
+
+def test_hot_reload_picks_up_changed_files(tmp_path):
+    path = _write(str(tmp_path), {"chef": {"keywords": {"plating": 1}}})
+    registry = TaxonomyRegistry(str(tmp_path), reload_interval=0.001)
+    assert registry.resolve("chef").name == "chef"
+
+    _write(str(tmp_path), {"baker": {"keywords": {"sourdough": 1}}})
+    os.utime(path, (os.path.getatime(path), os.path.getmtime(path) + 5))
+    registry._checked_at -= 1
+    assert registry.resolve("baker").name == "baker"
+    assert registry.get("chef") is None
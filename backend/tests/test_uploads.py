@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import available_tools, uploads
+from app.services.uploads import SpooledUpload, UploadFormatError, UploadTooLargeError, receive_upload
+
+
+class FakeRequest:
+    def __init__(self, body: bytes, content_type: str, chunk_size: int = 7):
+        self.headers = {"content-type": content_type}
+        self._body = body
+        self._chunk_size = chunk_size
+        self.consumed = 0
+
+    async def stream(self):
+        for i in range(0, len(self._body), self._chunk_size):
+            self.consumed = i + self._chunk_size
+            yield self._body[i:i + self._chunk_size]
+
+
+def _multipart(file_bytes: bytes, filename="resume.txt", metadata=None):
+    boundary = "xYzBoundary"
+    parts = []
+    if metadata is not None:
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="metadata"\r\n\r\n{metadata}\r\n'.encode())
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n".encode() + file_bytes + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def test_receive_upload_streams_hashes_and_spools():
+    data = b"Experience\n- Built APIs\n" * 10
+    body, content_type = _multipart(data, metadata='{"city": "Pune"}')
+    upload, fields = asyncio.run(receive_upload(FakeRequest(body, content_type), spool_bytes=1024))
+    assert upload.filename == "resume.txt"
+    assert upload.size == len(data) and upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert not upload.on_disk
+    assert upload.open().read() == data
+    assert fields == {"metadata": '{"city": "Pune"}'}
+
+
+def test_receive_upload_aborts_past_limit_without_reading_everything():
+    body, content_type = _multipart(b"x" * 10_000)
+    request = FakeRequest(body, content_type, chunk_size=100)
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(receive_upload(request, max_bytes=1_000))
+    assert request.consumed < 2_000
+
+
+def test_receive_upload_rejects_non_multipart_and_missing_file():
+    with pytest.raises(UploadFormatError):
+        asyncio.run(receive_upload(FakeRequest(b"{}", "application/json")))
+    body = b'--b\r\nContent-Disposition: form-data; name="metadata"\r\n\r\n{}\r\n--b--\r\n'
+    with pytest.raises(UploadFormatError):
+        asyncio.run(receive_upload(FakeRequest(body, "multipart/form-data; boundary=b")))
+
+
+def test_large_upload_rolls_to_disk():
+    upload = SpooledUpload("big.pdf", max_bytes=10_000, spool_bytes=100)
+    upload.write(b"a" * 500)
+    assert upload.on_disk and upload.open().read() == b"a" * 500
+    upload.close()
+
+
+def test_upload_endpoint(monkeypatch):
+    stored = {}
+
+    async def fake_store(text, metadata=None):
+        stored.update(text=text, metadata=metadata)
+        return {"status": "success", "resume_id": "abc", "chunks_added": 1, "total_vectors": 1}
+
+    monkeypatch.setattr("app.main.rag_store_resume_async", fake_store)
+    monkeypatch.setattr(uploads, "UPLOAD_MAX_BYTES", 64)
+    client = TestClient(app)
+
+    response = client.post("/upload/file", files={"file": ("cv.txt", b"Python developer")},
+                           data={"metadata": '{"city": "Pune"}'})
+    assert response.status_code == 200
+    assert response.json()["file_sha256"] == hashlib.sha256(b"Python developer").hexdigest()
+    assert stored == {"text": "Python developer", "metadata": {"city": "Pune"}}
+
+    assert client.post("/upload/file", files={"file": ("cv.txt", b"x" * 100)}).status_code == 413
+    assert client.post("/upload/file", data={"metadata": "{}"}).status_code == 400
+    assert client.post("/upload/file", files={"file": ("cv.txt", b"hi")}, data={"metadata": "[1]"}).status_code == 400
+    bad_json = client.post("/upload/file", files={"file": ("cv.txt", b"hi")}, data={"metadata": "{city"})
+    assert bad_json.status_code == 400 and "not valid JSON" in bad_json.json()["detail"]
@@ -0,0 +1,111 @@
+import numpy as np
+
+from app.services.vector_store import IndexRegistry, ResumeIndex, make_resume_id
+
+
+def _entry(resume_id, n=2, dim=4):
+    entry = ResumeIndex(resume_id, dim)
+    entry.add(np.random.rand(n, dim).astype("float32"), [f"{resume_id}-{i}" for i in range(n)])
+    return entry
+
+
+def test_resume_id_is_content_addressed():
+    assert make_resume_id("same text") == make_resume_id("same text")
+    assert make_resume_id("same text") != make_resume_id("other text")
+
+
+def test_search_is_scoped_and_clamped():
+    entry = _entry("a", n=2)
+    _, idxs = entry.search(np.random.rand(1, 4).astype("float32"), 10)
+    assert sorted(idxs[0].tolist()) == [0, 1]
+
+
+def test_registry_lru_eviction():
+    registry = IndexRegistry(max_entries=2, ttl_seconds=0)
+    registry.put(_entry("a"))
+    registry.put(_entry("b"))
+    registry.get("a")
+    registry.put(_entry("c"))
+    assert registry.get("b") is None
+    assert registry.get("a") is not None
+    assert registry.most_recent().resume_id == "a"
+    assert registry.stats()["evictions"] == 1
+
+
+def test_registry_ttl_and_memory_cap():
+    registry = IndexRegistry(max_entries=10, ttl_seconds=60, max_bytes=1)
+    registry.put(_entry("a"))
+    registry.put(_entry("b"))
+    # The newest entry is always kept even when it alone exceeds the cap.
+    assert registry.get("a") is None
+    assert registry.get("b") is not None
+
+    registry.get("b").last_access -= 120
+    assert registry.get("b") is None
+
+
+def test_registry_persists_and_reopens_mapped(tmp_path):
+    registry = IndexRegistry(store_dir=str(tmp_path))
+    resume_id = make_resume_id("persisted resume")
+    entry = ResumeIndex(resume_id, 4)
+    vectors = np.random.rand(3, 4).astype("float32")
+    entry.add(vectors, ["alpha", "beta", "gamma ünicode"])
+    registry.put(entry)
+
+    # A fresh registry (e.g. after a restart) finds the index on disk.
+    reopened = IndexRegistry(store_dir=str(tmp_path))
+    assert reopened.stored_ids() == [resume_id]
+    loaded = reopened.get(resume_id)
+    assert loaded.ntotal == 3
+    # The vectors are a view of the mapped file, not a copy owned by the index.
+    assert not loaded.index.codes.is_owned
+    assert list(loaded.texts) == ["alpha", "beta", "gamma ünicode"]
+    _, idxs = loaded.search(vectors[2:3], 1)
+    assert loaded.texts[idxs[0][0]] == "gamma ünicode"
+    assert reopened.stats()["disk_loads"] == 1
+
+
+def test_registry_rejects_path_like_ids(tmp_path):
+    registry = IndexRegistry(store_dir=str(tmp_path))
+    assert registry.get("../../etc/passwd") is None
+
+
+def test_store_is_versioned_and_drops_other_versions(tmp_path):
+    resume_id = make_resume_id("versioned resume")
+    old = IndexRegistry(store_dir=str(tmp_path), version="model.chunker1")
+    old.put(_entry(resume_id))
+    legacy = IndexRegistry(store_dir=str(tmp_path))  # the unversioned layout
+    legacy.put(_entry(resume_id))
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "keep.txt").write_text("not an index")
+
+    # Indexes built with other chunking or another model are never served.
+    current = IndexRegistry(store_dir=str(tmp_path), version="model.chunker2")
+    assert current.get(resume_id) is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["model.chunker2", "notes"]
+
+
+def test_store_prunes_unused_and_least_recent_files(tmp_path):
+    import os
+    import time
+
+    registry = IndexRegistry(store_dir=str(tmp_path), version="v", store_max_indexes=2, store_ttl_seconds=3600)
+    ids = [make_resume_id(f"resume {i}") for i in range(4)]
+    for age, resume_id in zip((7200, 300, 200, 100), ids):
+        registry.put(_entry(resume_id))
+        stamp = time.time() - age
+        os.utime(tmp_path / "v" / f"{resume_id}.faiss", (stamp, stamp))
+    registry.clear()
+
+    # ids[0] expired; ids[1] is the least recently used beyond the cap.
+    assert registry.prune_store() == 2
+    assert registry.stored_ids() == sorted(ids[2:])
+    assert sorted(os.listdir(tmp_path / "v")) == sorted(f"{i}{s}" for i in ids[2:] for s in (".chunks", ".faiss"))
+    assert registry.stats()["disk_evictions"] == 2
+
+    # Loading an index from disk counts as a use.
+    os.utime(tmp_path / "v" / f"{ids[2]}.faiss", (time.time() - 500, time.time() - 500))
+    registry.get(ids[2])
+    registry.clear()
+    registry.store_max_indexes = 1
+    assert registry.prune_store() == 1 and registry.stored_ids() == [ids[2]]
@@ -45,6 +45,7 @@ export const Home = () => {
       if (res.data.status === 'success') {
         // Store resume data context (using local storage for simplicity for now)
         localStorage.setItem('resumeText', res.data.extracted_text);
+        localStorage.setItem('resumeId', res.data.resume_id);
         navigate('/dashboard');
       }
     } catch (error) {
@@ -6,6 +6,7 @@ const api = axios.create({
 
 export interface UploadResponse {
   status: string;
+  resume_id: string;
   extracted_text: string;
   rag_status: Record<string, any>;
   message: string;
@@ -48,7 +49,8 @@ export const getATSScore = async (resume_text: string, role: string, job_descrip
 };
 
 export const chatWithResume = async (query: string) => {
-  return api.post<ChatResponse>('/chat', { query, top_k: 4 });
+  const resume_id = localStorage.getItem('resumeId') ?? undefined;
+  return api.post<ChatResponse>('/chat', { query, top_k: 4, resume_id });
 };
 
 export default api;